@@ -1,18 +1,26 @@
 # Audion – Ultimate Playlist Analyzer
 import os
-import re
 import sys
 import time
-import random
+import base64
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pandas as pd
+from tkinter import ttk, messagebox, filedialog
 import numpy as np
-import matplotlib
-matplotlib.use("TkAgg")
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+import audion_core
+import audion_search
+import audion_facets
+import audion_table
+import audion_playlist
+import audion_recommend
+import audion_dashboard
+import audion_ingest
+import audion_loader
+import audion_refresh
+import audion_store
+import audion_instrument
+import audion_autoplaylist
+import audion_export
+from audion_core import format_minutes
 # ----------------------- THEME / CONSTANTS (must be defined before window) -----------------------
 BG_MAIN = "#0F172A"
 BG_PANEL = "#020617"
@@ -26,130 +34,32 @@ FONT_TITLE = ("Segoe UI", 18, "bold")
 FONT_SUB = ("Segoe UI", 14, "bold")
 FONT_TEXT = ("Segoe UI", 10)
 FONT_SMALL = ("Segoe UI", 9)
-plt.rcParams.update({
-    'text.color': FG_TEXT,
-    'axes.labelcolor': FG_TEXT,
-    'axes.titlecolor': FG_TEXT,
-    'xtick.color': FG_TEXT,
-    'ytick.color': FG_TEXT,
-    'figure.facecolor': BG_MAIN,
-    'axes.facecolor': BG_MAIN,
-    'axes.edgecolor': '#334155'
-})
-# ----------------------- Mood detection maps -----------------------
-MOOD_KEYWORDS = {
-    "Happy": ["happy", "joy", "sun", "sunshine", "smile", "bright", "good", "fun", "dance", "party", "better", "alive", "smiling", "golden"],
-    "Sad": ["sad", "lonely", "cry", "tears", "heartbreak", "broken", "miss", "lost", "blue", "alone"],
-    "Energetic": ["fire", "power", "wild", "run", "loud", "fast", "hype", "energy", "rock", "boom", "beat", "crazy"],
-    "Calm": ["calm", "soft", "slow", "chill", "lofi", "peace", "relax", "quiet", "soothing", "sleep"],
-    "Romantic": ["love", "lover", "heart", "kiss", "romantic", "baby", "sweet", "darling", "mine", "forever"]
-}
-GENRE_MOOD = {
-    "lofi": "Calm", "lo-fi": "Calm", "lo fi": "Calm", "indie": "Calm",
-    "romantic": "Romantic", "pop": "Happy", "sad": "Sad", "classical": "Calm",
-    "edm": "Energetic", "dance": "Energetic", "rock": "Energetic",
-    "r&b": "Romantic", "soul": "Romantic"
-}
-YEAR_RE = re.compile(r"(19|20)\d{2}")
-# ----------------------- Data loading (safe fallback) -----------------------
-def safe_load_excel(path="Copy of audion.xlsx"):
-    try:
-        df_local = pd.read_excel(path)
-        df_local = df_local.dropna(how="all")
-        if "Name" not in df_local.columns:
-            raise ValueError("Excel missing required 'Name' column.")
-        return df_local
-    except Exception as e:
-        # Fallback sample dataset to keep the program runnable
-        sample = [
-            {"Name": "Unstoppable", "Artist": "Sia", "Genre": "Pop", "Language": "English", "Duration": "03:02"},
-            {"Name": "Faded", "Artist": "Alan Walker", "Genre": "EDM", "Language": "English", "Duration": "03:32"},
-            {"Name": "LoFi Nights", "Artist": "Indie Cafe with a very very long name that was cutting off", "Genre": "Lofi", "Language": "Instrumental", "Duration": "02:45"},
-            {"Name": "Melancholy Ballad", "Artist": "Heartstring", "Genre": "Ballad", "Language": "English", "Duration": "04:10"},
-            {"Name": "Dancefloor Dream", "Artist": "Neon Beats", "Genre": "Dance", "Language": "English", "Duration": "03:21"},
-        ]
-        return pd.DataFrame(sample)
-df = safe_load_excel("Copy of audion.xlsx")
-# Normalize basic columns
-df = df.fillna("")
-if "index" in df.columns:
-    try:
-        df.set_index("index", inplace=True)
-    except Exception:
-        pass
-df["Language"] = df.get("Language", "").astype(str).fillna("Unknown").str.strip()
-df["Genre"] = df.get("Genre", "").astype(str).fillna("Unknown").str.strip()
-df["Duration"] = df.get("Duration", "").astype(str).fillna("").str.strip()
-def parse_duration(duration_str):
-    """''''''Convert 'mm:ss' or 'hh:mm:ss' to minutes (float).''''''"""
-    if pd.isna(duration_str) or not str(duration_str).strip():
-        return 0.0
-    s = str(duration_str).strip()
-    parts = s.split(":")
-    try:
-        parts = [int(p) for p in parts]
-    except:
-        nums = re.findall(r"\d+", s)
-        if len(nums) >= 2:
-            parts = [int(n) for n in nums[-2:]]
-        else:
-            return 0.0
-    if len(parts) == 2:
-        minutes, seconds = parts
-        return minutes + seconds / 60.0
-    elif len(parts) == 3:
-        hours, minutes, seconds = parts
-        return hours * 60 + minutes + seconds / 60.0
-    else:
-        return 0.0
-df["Duration_min"] = df["Duration"].apply(parse_duration)
-def detect_mood(title, genre):
-    title = str(title or "").lower()
-    genre = str(genre or "").lower()
-    for g in GENRE_MOOD:
-        if g in genre:
-            return GENRE_MOOD[g]
-    for mood, words in MOOD_KEYWORDS.items():
-        for w in words:
-            if w in title:
-                return mood
-    return "Unknown"
-def infer_mood_fallback(genre):
-    genre_lower = str(genre).lower()
-    MOOD_MAP = {
-        "pop": "Happy", "dance": "Party", "edm": "Energetic", "rock": "Intense",
-        "indie": "Chill", "folk": "Calm", "ballad": "Romantic", "romantic": "Romantic",
-        "hip hop": "Confident", "r&b": "Smooth", "k-pop": "Energetic", "bollywood": "Romantic"
-    }
-    for key, mood in MOOD_MAP.items():
-        if key in genre_lower:
-            return mood
-    return "Mixed"
-def detect_or_infer_mood(row):
-    mood = detect_mood(row.get("Name", ""), row.get("Genre", ""))
-    if mood == "Unknown":
-        return infer_mood_fallback(row.get("Genre", ""))
-    return mood
-
-df["Mood"] = df.apply(detect_or_infer_mood, axis=1)
-# Simulate simple audio features so charts look interesting
-def simulate_audio_features(row):
-    genre = str(row["Genre"]).lower()
-    duration = row["Duration_min"]
-    energy = 0.7 if ("edm" in genre or "dance" in genre) else 0.5
-    danceability = 0.8 if ("pop" in genre or "dance" in genre) else 0.4
-    valence = 0.6 if ("happy" in str(row["Mood"]).lower() or "party" in str(row["Mood"]).lower()) else 0.4
-    tempo = max(60, int(np.random.normal(128 if energy > 0.6 else 100, 15)))
-    return pd.Series({"energy": energy, "danceability": danceability, "valence": valence, "tempo": tempo})
-
-audio_features = df.apply(simulate_audio_features, axis=1)
-df = pd.concat([df, audio_features], axis=1)
+# ----------------------- Catalog (headless core) -----------------------
+# The window opens on an empty catalog; a worker thread loads the real one and
+# install_catalog() swaps it in on the Tk thread.
+# Pass --rebuild-cache to ignore the on-disk catalog cache and re-enrich from the source file
+df = audion_core.empty_catalog()
+catalog_fingerprint = None   # audion_store snapshot key of df, hashed on the loader thread (None for partial catalogs)
+catalog_loader = audion_loader.CatalogLoader(audion_core.CATALOG_PATH, rebuild_cache="--rebuild-cache" in sys.argv)
+catalog_ready = False
+catalog_refresher = None   # set while a Reload is diffing the source file
+playlist_exporter = None   # set while an export is being written
+EXPORT_FILETYPES = [("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet"), ("M3U playlist", "*.m3u"),
+                    ("Text summary", "*.txt"), ("TSV", "*.tsv")]
+LOAD_POLL_MS = 100
 # ----------------------- GLOBALS & STATE -----------------------
-selected_songs = {}      # playlist (by dataframe index)
-current_filtered_df = df.copy()
+playlist = audion_playlist.PlaylistStats(df)   # running totals / top values for the stats cards
+selected_songs = queue = playlist.queue   # playlist: ordered set of df indices in play order (ids only)
+queue_dirty_from = None  # first queue_listbox line to redraw on the next refresh
+playlist_refresh_job = None
+current_filtered_rows = np.arange(len(df))   # catalog row positions of the filtered view (no frame copy)
+search_index = audion_search.SearchIndex.from_frame(df)
+facet_index = audion_facets.FacetIndex(df)
+recommender = audion_recommend.Recommender(df)
+filter_job = None        # pending debounced apply_filters() call
+FILTER_DEBOUNCE_MS = 150
 card_total = card_selected = card_duration = card_moods = card_languages = None
 card_pl_total_duration = card_pl_avg_length = card_pl_top_artist = card_pl_top_genre = None
-queue = []               # list of df indices in play order
 current_track_idx = None
 is_playing = False
 play_position_seconds = 0
@@ -186,14 +96,21 @@ search_bar.pack(fill="x", pady=(0, 8))
 search_var = tk.StringVar()
 search_entry = tk.Entry(search_bar, textvariable=search_var, font=FONT_TEXT, bg="white", fg="black", insertbackground=FG_TEXT, relief="flat")
 search_entry.pack(side="left", fill="x", expand=True, padx=(0, 8), ipady=6)
-languages = sorted(df["Language"].unique())
+languages = facet_index.values["Language"]
 selected_language = tk.StringVar(value="All")
-language_combo = ttk.Combobox(search_bar, textvariable=selected_language, values=["All"] + languages, state="readonly", width=12)
+language_combo = ttk.Combobox(search_bar, textvariable=selected_language, values=["All"] + languages, state="readonly", width=16)
 language_combo.pack(side="right", padx=(8, 0))
-genres = ["All"] + sorted(df["Genre"].unique())
+genres = ["All"] + facet_index.values["Genre"]
 selected_genre = tk.StringVar(value="All")
-genre_combo = ttk.Combobox(search_bar, textvariable=selected_genre, values=genres, state="readonly", width=14)
+genre_combo = ttk.Combobox(search_bar, textvariable=selected_genre, values=genres, state="readonly", width=18)
 genre_combo.pack(side="right")
+moods = ["All"] + facet_index.values["Mood"]
+selected_mood = tk.StringVar(value="All")
+mood_combo = ttk.Combobox(search_bar, textvariable=selected_mood, values=moods, state="readonly", width=14)
+mood_combo.pack(side="right", padx=(0, 8))
+# Combobox entries read "English (101)"; map labels back to facet values
+facet_combos = {"Language": (language_combo, selected_language), "Genre": (genre_combo, selected_genre), "Mood": (mood_combo, selected_mood)}
+facet_labels = {col: {} for col in facet_combos}
 # Song table
 table_frame = tk.Frame(left_frame, bg=BG_MAIN)
 table_frame.pack(fill="both", expand=True)
@@ -213,12 +130,17 @@ table_scroll_h = ttk.Scrollbar(table_frame, orient="horizontal", command=tree.xv
 tree.configure(yscrollcommand=table_scroll_v.set, xscrollcommand=table_scroll_h.set)
 table_scroll_v.grid(row=0, column=1, sticky="ns")
 table_scroll_h.grid(row=1, column=0, sticky="ew")
+# Only the rows around the viewport live in the Treeview; the vertical scrollbar tracks the full result set
+song_table = audion_table.VirtualTable(tree, table_scroll_v, audion_core.table_display_columns(df), df.index, rowheight=28)
 table_frame.grid_rowconfigure(0, weight=1)
 table_frame.grid_columnconfigure(0, weight=1)
 # Right sidebar stats
 stats_panel = tk.Frame(right_frame, bg=BG_MAIN)
 stats_panel.pack(fill="both", expand=True)
-tk.Label(stats_panel, text="📊 Live Stats", bg=BG_MAIN, fg=ACCENT, font=("Segoe UI", 12, "bold")).pack(anchor="w", padx=10, pady=(6, 6))
+stats_header = tk.Frame(stats_panel, bg=BG_MAIN)
+stats_header.pack(fill="x")
+tk.Label(stats_header, text="📊 Live Stats", bg=BG_MAIN, fg=ACCENT, font=("Segoe UI", 12, "bold")).pack(side="left", padx=10, pady=(6, 6))
+tk.Button(stats_header, text="🩺", command=lambda: toggle_diagnostics(), bg=BG_MAIN, fg=FG_MUTED, relief="flat", bd=0).pack(side="right", padx=6)
 def create_stat_line(parent, label_text):
     f = tk.Frame(parent, bg=BG_CARD, relief="flat", bd=0)
     f.pack(fill="x", padx=8, pady=6)
@@ -238,112 +160,260 @@ card_pl_top_genre = create_stat_line(stats_panel, "Top Genre")
 # Controls
 controls_frame = tk.Frame(right_frame, bg=BG_MAIN)
 controls_frame.pack(fill="x", padx=8, pady=(6, 10))
-ttk.Button(controls_frame, text="💾 Export CSV", command=lambda: export_playlist_csv()).pack(side="left", padx=6)
+ttk.Button(controls_frame, text="💾 Export", command=lambda: export_playlist_csv()).pack(side="left", padx=6)
 ttk.Button(controls_frame, text="📝 Export Summary", command=lambda: export_playlist_summary_txt()).pack(side="left", padx=6)
 ttk.Button(controls_frame, text="✨ Recommend", command=lambda: show_mood_recommendations()).pack(side="left", padx=6)
 ttk.Button(controls_frame, text="🎨 Wrapped", command=lambda: open_ultimate_dashboard()).pack(side="left", padx=6)
+ttk.Button(controls_frame, text="🗂 Playlists", command=lambda: open_playlist_manager()).pack(side="left", padx=6)
+ttk.Button(controls_frame, text="⚡ Auto Build", command=lambda: open_auto_builder()).pack(side="left", padx=6)
+reload_button = ttk.Button(controls_frame, text="🔄 Reload", command=lambda: reload_catalog())
+reload_button.pack(side="left", padx=6)
 queue_toggle = tk.BooleanVar(value=True)
 tk.Checkbutton(controls_frame, text="Show Queue", variable=queue_toggle, bg=BG_MAIN, fg=FG_TEXT, selectcolor=BG_PANEL).pack(side="right")
+# Diagnostics (hidden until 🩺 or Ctrl+Shift+D): latency percentiles from audion_instrument
+DIAGNOSTICS_REFRESH_MS = 1000
+diag_frame = tk.Frame(right_frame, bg=BG_MAIN)
+diag_enabled = tk.BooleanVar(value=audion_instrument.ENABLED)
+diag_buttons = tk.Frame(diag_frame, bg=BG_MAIN)
+diag_buttons.pack(fill="x")
+tk.Checkbutton(diag_buttons, text="Record latencies", variable=diag_enabled, command=lambda: audion_instrument.set_enabled(diag_enabled.get()),
+               bg=BG_MAIN, fg=FG_TEXT, selectcolor=BG_PANEL).pack(side="left")
+for text, command in (("Profile next", lambda: arm_capture("cprofile")), ("Trace memory next", lambda: arm_capture("tracemalloc")),
+                      ("Dump", lambda: dump_diagnostics()), ("Reset", lambda: audion_instrument.reset())):
+    tk.Button(diag_buttons, text=text, command=command, bg=BG_CARD, fg=FG_TEXT, font=FONT_SMALL).pack(side="left", padx=2)
+diag_text = tk.Text(diag_frame, bg=BG_CARD, fg=FG_TEXT, height=12, font=("Consolas", 9), wrap="none")
+diag_text.pack(fill="both", expand=True, pady=(4, 0))
+diag_job = None   # pending refresh_diagnostics, cancelled when the panel is hidden
+def toggle_diagnostics(event=None):
+    global diag_job
+    if diag_frame.winfo_manager():
+        diag_frame.pack_forget()
+        if diag_job is not None:
+            window.after_cancel(diag_job)
+            diag_job = None
+    else:
+        diag_frame.pack(fill="both", expand=False, padx=8, pady=(4, 0), after=stats_panel)
+        refresh_diagnostics()
+def refresh_diagnostics():
+    global diag_job
+    diag_job = None
+    if not diag_frame.winfo_manager():
+        return
+    lines = audion_instrument.report_lines()
+    if not audion_instrument.ENABLED:
+        lines.insert(0, "(recording is off)")
+    capture = audion_instrument.last_capture()
+    if capture is not None:
+        lines += ["", f"Last capture: {capture[0]} → {capture[1]}", capture[2]]
+    diag_text.delete("1.0", tk.END)
+    diag_text.insert(tk.END, "\n".join(lines))
+    diag_job = window.after(DIAGNOSTICS_REFRESH_MS, refresh_diagnostics)
+def arm_capture(kind):
+    audion_instrument.arm_capture(kind)
+    status_bar.config(text=f"Diagnostics: the next action runs under {kind}")
+def dump_diagnostics():
+    try:
+        path = audion_instrument.dump()
+    except OSError as e:
+        messagebox.showerror("Diagnostics", f"Could not write {audion_instrument.DUMP_PATH}:\n{e}")
+        return
+    status_bar.config(text=f"Latency histograms written to {path}")
+window.bind("<Control-Shift-D>", toggle_diagnostics)
 queue_frame = tk.Frame(right_frame, bg=BG_MAIN)
 queue_frame.pack(fill="both", expand=False, padx=8, pady=(8, 0))
 queue_listbox = tk.Listbox(queue_frame, bg=BG_CARD, fg=FG_TEXT, height=6, activestyle="none", selectbackground=ACCENT)
 queue_listbox.pack(fill="both", expand=True, pady=(6,0))
-# ----------------------- CORE FUNCTIONS -----------------------
-def format_minutes(mins_float):
-    if mins_float is None or (isinstance(mins_float, float) and np.isnan(mins_float)):
-        return "0:00"
-    total_seconds = int(round(mins_float * 60))
-    hours, remainder = divmod(total_seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    if hours > 0:
-        return f"{hours}:{minutes:02d}:{seconds:02d}"
-    else:
-        return f"{minutes}:{seconds:02d}"
-def compute_playlist_summary(pl_df):
-    if pl_df.empty:
-        return {"total_min": 0.0, "avg_min": 0.0, "top_artist": "N/A", "top_genre": "N/A", "top_language": "N/A"}
-    total_min = pl_df["Duration_min"].sum()
-    avg_min = pl_df["Duration_min"].mean()
-    top_artist = pl_df["Artist"].value_counts().idxmax() if "Artist" in pl_df.columns and not pl_df["Artist"].isna().all() else "Unknown"
-    top_genre = pl_df["Genre"].value_counts().idxmax() if "Genre" in pl_df.columns and not pl_df["Genre"].isna().all() else "Unknown"
-    top_language = pl_df["Language"].value_counts().idxmax() if "Language" in pl_df.columns and not pl_df["Language"].isna().all() else "Unknown"
-    return {"total_min": total_min, "avg_min": avg_min, "top_artist": top_artist, "top_genre": top_genre, "top_language": top_language}
-def generate_text_insight(pl_df, summary):
-    if pl_df.empty:
-        return "No songs selected. Add some tracks to see a playlist summary and insights."
-    lines = []
-    lines.append(f"Total duration: {format_minutes(summary['total_min'])} • Avg length: {format_minutes(summary['avg_min'])}")
-    lines.append(f"Top artist: {summary['top_artist']} • Top genre: {summary['top_genre']} • Top language: {summary.get('top_language', 'N/A')}")
-    dominant_mood = pl_df["Mood"].value_counts().idxmax() if "Mood" in pl_df.columns and not pl_df["Mood"].isna().all() else None
-    if dominant_mood:
-        lines.append(f"Dominant mood: {dominant_mood}. Try adding a contrasting track to vary the vibe.")
-    else:
-        lines.append("Mood info unavailable.")
-    return "\n".join(lines)
+# ----------------------- PLAYLIST HELPERS (thin wrappers over audion_core) -----------------------
 def get_playlist_df():
-    if not selected_songs:
-        return pd.DataFrame(columns=df.columns)
-    indices = list(selected_songs.keys())
-    # Some indices might not exist in df if df was reloaded; filter
-    indices = [i for i in indices if i in df.index]
-    pl_df = df.loc[indices].copy()
-    pl_df.reset_index(drop=True, inplace=True)
-    return pl_df
-def export_playlist_csv():
-    pl_df = get_playlist_df()
-    if pl_df.empty:
+    return audion_core.playlist_df(df, list(selected_songs.keys()))
+# Exports are written on a worker thread straight from the playlist's ids; the format follows the file extension
+def start_export(exports):
+    """exports: {output path: labels}. Returns False if another export is still running."""
+    global playlist_exporter
+    if playlist_exporter is not None:
+        messagebox.showwarning("Export", "An export is already running.")
+        return False
+    playlist_exporter = audion_loader.PlaylistExporter(df, exports).start()
+    status_bar.config(text="Exporting…")
+    window.after(LOAD_POLL_MS, poll_playlist_exporter)
+    return True
+def poll_playlist_exporter():
+    global playlist_exporter
+    for kind, payload in playlist_exporter.poll():
+        if kind == "progress":
+            done, total = payload
+            status_bar.config(text=f"Exporting… {done:,} / {total:,} tracks")
+            continue
+        playlist_exporter = None
+        if kind == "failed":
+            messagebox.showerror("Export failed", str(payload))
+            status_bar.config(text="Export failed")
+            return
+        written, errors = payload
+        if written:
+            where = next(iter(written)) if len(written) == 1 else f"{len(written)} files"
+            status_bar.config(text=f"Exported {sum(written.values()):,} tracks to {where}")
+        if errors:
+            messagebox.showerror("Export failed", "\n".join(f"{os.path.basename(path)}: {message}" for path, message in errors))
+        return
+    window.after(LOAD_POLL_MS, poll_playlist_exporter)
+@audion_instrument.timed()
+def export_playlist_csv(initialfile="audion_playlist.csv"):
+    if not queue:
         messagebox.showwarning("No data", "No playlist to export.")
         return
-    pl_df.to_csv("audion_playlist.csv", index=False)
-    messagebox.showinfo("Exported", "Saved as audion_playlist.csv")
+    ext = os.path.splitext(initialfile)[1]
+    # The suggested file's format is listed first
+    filetypes = sorted(EXPORT_FILETYPES, key=lambda ft: ft[1] != "*" + ext)
+    path = filedialog.asksaveasfilename(title="Export playlist", initialfile=initialfile, defaultextension=ext, filetypes=filetypes)
+    if not path:
+        return
+    try:
+        audion_export.writer_for(path)
+    except ValueError as e:
+        messagebox.showwarning("Export", str(e))
+        return
+    start_export({path: list(queue)})
+@audion_instrument.timed()
 def export_playlist_summary_txt():
-    pl_df = get_playlist_df()
-    summary = compute_playlist_summary(pl_df)
-    if pl_df.empty:
-        messagebox.showwarning("No data", "No playlist to export.")
+    export_playlist_csv("audion_playlist_summary.txt")
+# Saved playlists (SQLite store, opened on first use)
+playlist_store = None
+def get_playlist_store():
+    global playlist_store
+    if playlist_store is None:
+        playlist_store = audion_store.PlaylistStore()
+    return playlist_store
+def open_playlist_manager():
+    try:
+        store = get_playlist_store()
+    except Exception as e:
+        messagebox.showerror("Playlists", f"Could not open {audion_store.STORE_PATH}:\n{e}")
         return
-    text = []
-    text.append(f"Playlist Summary - {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    text.append(f"Tracks: {len(pl_df)}")
-    text.append(f"Total duration: {format_minutes(summary['total_min'])}")
-    text.append(f"Average track length: {format_minutes(summary['avg_min'])}")
-    text.append(f"Top artist: {summary['top_artist']}")
-    text.append(f"Top genre: {summary['top_genre']}")
-    text.append("")
-    text.append("Track list:")
-    for i, r in pl_df.iterrows():
-        text.append(f"{i+1}. {r.get('Name','')} | {r.get('Artist','')} ({format_minutes(r.get('Duration_min',0.0))})")
-    fname = "audion_playlist_summary.txt"
-    with open(fname, "w", encoding="utf-8") as f:
-        f.write("\n".join(text))
-    messagebox.showinfo("Exported", f"Saved summary as {fname}")
+    top = tk.Toplevel(window)
+    top.title("Saved Playlists")
+    top.geometry("480x420")
+    top.configure(bg=BG_MAIN)
+    name_var = tk.StringVar()
+    entry_row = tk.Frame(top, bg=BG_MAIN)
+    entry_row.pack(fill="x", padx=8, pady=8)
+    tk.Label(entry_row, text="Name:", bg=BG_MAIN, fg=FG_TEXT).pack(side="left")
+    ttk.Entry(entry_row, textvariable=name_var).pack(side="left", fill="x", expand=True, padx=6)
+    listbox = tk.Listbox(top, bg=BG_CARD, fg=FG_TEXT, selectbackground=ACCENT, selectmode="extended")
+    listbox.pack(fill="both", expand=True, padx=8)
+    names = []
+    def refresh():
+        names[:] = []
+        listbox.delete(0, tk.END)
+        for name, count, updated in store.list_playlists():
+            names.append(name)
+            listbox.insert(tk.END, f"{name}  •  {count} songs  •  {time.strftime('%Y-%m-%d %H:%M', time.localtime(updated))}")
+    def chosen():
+        sel = listbox.curselection()
+        return names[sel[0]] if sel else None
+    def on_pick(event=None):
+        if chosen() is not None:
+            name_var.set(chosen())
+    def save():
+        name = name_var.get().strip()
+        if not name:
+            messagebox.showwarning("Playlists", "Enter a name for the playlist.", parent=top)
+            return
+        if not queue:
+            messagebox.showwarning("Playlists", "The playlist is empty.", parent=top)
+            return
+        store.save_playlist(name, list(queue), df, audion_core.CATALOG_PATH, fingerprint=catalog_fingerprint)
+        refresh()
+    def load():
+        name = chosen()
+        if name is None:
+            return
+        labels = store.load_playlist(name)
+        replace_playlist(labels)
+        if len(queue) < len(labels):
+            messagebox.showinfo("Playlists", f"{len(labels) - len(queue)} track(s) of '{name}' are not in the current catalog.", parent=top)
+        top.destroy()
+    def delete():
+        name = chosen()
+        if name is not None and messagebox.askyesno("Playlists", f"Delete '{name}'?", parent=top):
+            store.delete_playlist(name)
+            refresh()
+    def export():
+        # Every selected playlist goes into one folder, one file each, in the chosen format
+        picked = [names[i] for i in listbox.curselection()]
+        if not picked:
+            messagebox.showwarning("Playlists", "Select the playlists to export.", parent=top)
+            return
+        folder = filedialog.askdirectory(title="Export playlists to", parent=top)
+        if not folder:
+            return
+        ext = export_format.get()
+        safe = lambda name: "".join(ch if ch.isalnum() or ch in " -_" else "_" for ch in name).strip() or "playlist"
+        if start_export({os.path.join(folder, safe(name) + ext): store.load_playlist(name) for name in picked}):
+            top.destroy()
+    listbox.bind("<<ListboxSelect>>", on_pick)
+    listbox.bind("<Double-1>", lambda e: load())
+    buttons = tk.Frame(top, bg=BG_MAIN)
+    buttons.pack(fill="x", padx=8, pady=8)
+    for text, command in (("💾 Save current", save), ("📂 Open", load), ("🗑 Delete", delete), ("📤 Export", export)):
+        tk.Button(buttons, text=text, command=command, bg=BG_CARD, fg=FG_TEXT).pack(side="left", padx=4)
+    export_format = tk.StringVar(value=".csv")
+    ttk.Combobox(buttons, textvariable=export_format, values=[".csv", ".jsonl", ".parquet", ".m3u", ".txt"], state="readonly", width=8).pack(side="left", padx=4)
+    refresh()
+def open_auto_builder():
+    top = tk.Toplevel(window)
+    top.title("Auto Build Playlist")
+    top.geometry("400x460")
+    top.configure(bg=BG_MAIN)
+    fields = {}
+    for key, text, default in (("target", "Minutes:", "60"), ("tolerance", "Tolerance (min):", "2"), ("cap", "Max songs per artist:", "2")):
+        row = tk.Frame(top, bg=BG_MAIN)
+        row.pack(fill="x", padx=8, pady=4)
+        tk.Label(row, text=text, bg=BG_MAIN, fg=FG_TEXT, width=20, anchor="w").pack(side="left")
+        fields[key] = tk.StringVar(value=default)
+        ttk.Entry(row, textvariable=fields[key], width=8).pack(side="left")
+    scope = {c: facet_value(c) for c in ("Language", "Genre") if facet_value(c) != "All"}
+    scope_text = ", ".join(scope.values()) if scope else "the whole catalog"
+    tk.Label(top, text=f"Moods (none selected = any), from {scope_text}:", bg=BG_MAIN, fg=FG_TEXT).pack(anchor="w", padx=8, pady=(8, 2))
+    mood_list = tk.Listbox(top, selectmode="multiple", bg=BG_CARD, fg=FG_TEXT, selectbackground=ACCENT, exportselection=False)
+    mood_list.pack(fill="both", expand=True, padx=8)
+    mood_values = facet_index.values.get("Mood", [])
+    for mood in mood_values:
+        mood_list.insert(tk.END, mood)
+    if facet_value("Mood") in mood_values:
+        mood_list.selection_set(mood_values.index(facet_value("Mood")))
+    def build():
+        try:
+            target = float(fields["target"].get())
+            tolerance = float(fields["tolerance"].get())
+            cap = int(fields["cap"].get())
+        except ValueError:
+            messagebox.showwarning("Auto Build", "Minutes, tolerance and songs per artist must be numbers.", parent=top)
+            return
+        if target <= 0 or tolerance < 0 or cap < 1:
+            messagebox.showwarning("Auto Build", "Minutes and songs per artist must be positive.", parent=top)
+            return
+        chosen = [mood_values[i] for i in mood_list.curselection()]
+        result = audion_autoplaylist.build_playlist(df, facet_index, target, moods=chosen, filters=scope,
+                                                    tolerance_min=tolerance, artist_cap=cap)
+        if not result["labels"]:
+            messagebox.showinfo("Auto Build", "No songs match these moods and filters.", parent=top)
+            return
+        replace_playlist(result["labels"])
+        status_bar.config(text=f"Auto-built {len(result['labels'])} songs · {format_minutes(result['total_min'])} "
+                               f"(target {format_minutes(target)})")
+        if not result["ok"]:
+            messagebox.showinfo("Auto Build", f"Only {format_minutes(result['total_min'])} could be filled within the "
+                                              f"artist limit; try more moods or a higher limit.", parent=top)
+        top.destroy()
+    tk.Button(top, text="⚡ Build", command=build, bg=BG_CARD, fg=FG_TEXT).pack(pady=8)
 # Recommendation helpers
-def generate_mood_recommendations(pl_df, n=8):
-    if pl_df.empty:
-        return pd.DataFrame()
-    dominant = pl_df["Mood"].value_counts().idxmax()
-    contrast_map = {
-        "Happy": ["Sad", "Calm", "Romantic"],
-        "Sad": ["Happy", "Energetic"],
-        "Energetic": ["Calm", "Romantic"],
-        "Calm": ["Energetic", "Happy"],
-        "Romantic": ["Energetic", "Happy"],
-        "Mixed": ["Calm", "Happy"]
-    }
-    candidates = contrast_map.get(dominant, ["Calm", "Happy"])
-    available = df.drop(index=list(selected_songs.keys()), errors="ignore").copy()
-    recs = available[available["Mood"].isin(candidates)]
-    if recs.empty:
-        recs = available.sample(min(n, len(available))) if len(available) > 0 else pd.DataFrame()
-    else:
-        recs = recs.sample(min(n, len(recs)))
-    return recs
+@audion_instrument.timed()
 def show_mood_recommendations():
-    pl_df = get_playlist_df()
-    if pl_df.empty:
+    if not queue:
         messagebox.showwarning("No playlist", "Select songs first to get recommendations.")
         return
-    recs = generate_mood_recommendations(pl_df, n=8)
+    recs = audion_core.generate_mood_recommendations(queue, n=8, recommender=recommender)
     if recs.empty:
         messagebox.showinfo("Recommendations", "No recommendations available.")
         return
@@ -359,9 +429,7 @@ def show_mood_recommendations():
         listbox.insert(tk.END, f"{r.get('Name','')} | {r.get('Artist','')} • {r.get('Mood','')}")
     def add_selected_recs():
         sel = listbox.curselection()
-        for s in sel:
-            idx = int(recs.loc[s, "index"])
-            add_to_playlist(idx)
+        add_many(recs.loc[list(sel), "index"].astype(int).tolist())
         top.destroy()
     tk.Button(top, text="Add selected", command=add_selected_recs, bg=BG_CARD, fg=FG_TEXT).pack(pady=8)
 # ----------------------- TABLE & PLAYLIST UI functions -----------------------
@@ -371,33 +439,38 @@ def update_library_stats():
     card_total.config(text=str(len(df)))
     card_duration.config(text=f"{mins}:{secs:02d}")
     card_languages.config(text=str(df["Language"].nunique()))
+def facet_value(col):
+    label = facet_combos[col][1].get()
+    return facet_labels[col].get(label, label)
+def refresh_facet_counts(selections, search_rows):
+    counts = facet_index.facet_counts(selections, rows=search_rows)
+    for col, (combo, var) in facet_combos.items():
+        labels = {"All": "All"}
+        for value in facet_index.values[col]:
+            labels[f"{value} ({counts[col][value]})"] = value
+        facet_labels[col] = labels
+        combo.configure(values=list(labels))
+        current = selections.get(col, "All")
+        for label, value in labels.items():
+            if value == current:
+                var.set(label)
+                break
+@audion_instrument.timed()
 def apply_filters(event=None):
-    global current_filtered_df
-    lang = selected_language.get()
-    genre = selected_genre.get()
-    query = search_var.get().strip().lower()
-    current_filtered_df = df.copy()
-    if lang and lang != "All":
-        current_filtered_df = current_filtered_df[current_filtered_df["Language"] == lang]
-    if genre and genre != "All":
-        current_filtered_df = current_filtered_df[current_filtered_df["Genre"] == genre]
-    if query:
-        mask = current_filtered_df["Name"].str.lower().str.contains(query, na=False) | current_filtered_df["Artist"].str.lower().str.contains(query, na=False)
-        current_filtered_df = current_filtered_df[mask]
+    global current_filtered_rows
+    selections = {col: facet_value(col) for col in facet_combos}
+    search_rows = search_index.search(search_var.get())
+    rows = facet_index.resolve(selections, rows=search_rows)
+    current_filtered_rows = np.arange(len(df)) if rows is None else rows
+    refresh_facet_counts(selections, search_rows)
     populate_table()
     update_status_bar()
+@audion_instrument.timed()
 def populate_table():
-    for i in tree.get_children():
-        tree.delete(i)
-    for idx, row in current_filtered_df.iterrows():
-        display_title = row["Name"]
-        display_artist = row.get("Artist", "")
-        dur = format_minutes(row.get("Duration_min", 0.0))
-        artist_cell = f"{display_title} | {display_artist}"
-        tree.insert("", "end", iid=str(idx), values=(artist_cell, row.get("Genre", ""), dur))
+    song_table.set_rows(current_filtered_rows)
     update_library_stats()
 def update_status_bar():
-    shown = len(current_filtered_df)
+    shown = len(current_filtered_rows)
     selected = len(selected_songs)
     status_bar.config(text=f"Showing {shown} songs · {selected} selected")
 def on_song_click(event):
@@ -409,49 +482,60 @@ def on_song_click(event):
     except:
         pass
 tree.bind("<Double-1>", on_song_click)
+# Playlist mutations validate ids in bulk and schedule a single widget refresh per event-loop turn
+def add_many(indices):
+    schedule_playlist_refresh(playlist.add_many(indices))
+def remove_many(indices):
+    schedule_playlist_refresh(playlist.remove_many(indices))
+def replace_playlist(indices):
+    schedule_playlist_refresh(playlist.replace(indices))
 def add_to_playlist(index):
-    index = int(index)
-    if index not in df.index:
-        return
-    selected_songs[index] = df.loc[index].to_dict()
-    if index not in queue:
-        queue.append(index)
-    update_playlist_widgets()
+    add_many([int(index)])
 def remove_from_playlist(index):
-    index = int(index)
-    selected_songs.pop(index, None)
-    try:
-        queue.remove(index)
-    except ValueError:
-        pass
-    update_playlist_widgets()
-def update_playlist_widgets():
+    remove_many([int(index)])
+def selected_tree_ids():
+    return [int(s) for s in tree.selection()]
+def schedule_playlist_refresh(changed_from):
+    global queue_dirty_from, playlist_refresh_job
+    if changed_from is not None:
+        queue_dirty_from = changed_from if queue_dirty_from is None else min(queue_dirty_from, changed_from)
+    if playlist_refresh_job is None:
+        playlist_refresh_job = window.after_idle(refresh_playlist_widgets)
+@audion_instrument.timed()
+def refresh_playlist_widgets():
+    global queue_dirty_from, playlist_refresh_job
+    playlist_refresh_job = None
+    if queue_dirty_from is not None:
+        # Patch the queue widget: only lines from the first changed position down are redrawn
+        queue_listbox.delete(queue_dirty_from, tk.END)
+        for i, idx in enumerate(list(queue)[queue_dirty_from:], start=queue_dirty_from):
+            queue_listbox.insert(tk.END, queue_line(i, idx))
+        queue_dirty_from = None
+    update_playlist_cards()
+def queue_line(position, idx):
+    name = df.loc[idx, "Name"]
+    artist = df.loc[idx, "Artist"] if "Artist" in df.columns else ""
+    return f"{position+1}. {name} | {artist}"
+def update_playlist_cards():
     card_selected.config(text=str(len(selected_songs)))
-    pl_df = get_playlist_df()
-    card_moods.config(text=str(pl_df["Mood"].nunique() if not pl_df.empty else 0))
-    summary = compute_playlist_summary(pl_df)
+    card_moods.config(text=str(playlist.distinct("Mood")))
+    summary = playlist.summary()
     card_pl_total_duration.config(text=format_minutes(summary["total_min"]))
     card_pl_avg_length.config(text=format_minutes(summary["avg_min"]))
     card_pl_top_artist.config(text=summary["top_artist"])
     card_pl_top_genre.config(text=summary["top_genre"])
-    queue_listbox.delete(0, tk.END)
-    for i, idx in enumerate(queue):
-        if idx in df.index:
-            name = df.loc[idx, "Name"]
-            artist = df.loc[idx, "Artist"] if "Artist" in df.columns else ""
-            queue_listbox.insert(tk.END, f"{i+1}. {name} | {artist}")
     update_status_bar()
+@audion_instrument.timed()
+def update_playlist_widgets():
+    # Full redraw of the queue; mutations patch it instead
+    schedule_playlist_refresh(0)
 # Right-click menu
 menu = tk.Menu(window, tearoff=0)
 def on_add_selected():
-    sel = tree.selection()
-    for s in sel:
-        add_to_playlist(int(s))
+    add_many(selected_tree_ids())
 menu.add_command(label="Add to Playlist", command=on_add_selected)
 def on_remove_selected():
-    sel = tree.selection()
-    for s in sel:
-        remove_from_playlist(int(s))
+    remove_many(selected_tree_ids())
 menu.add_command(label="Remove from Playlist", command=on_remove_selected)
 def on_show_menu(event):
     rowid = tree.identify_row(event.y)
@@ -463,70 +547,42 @@ tree.bind("<Button-3>", on_show_menu)  # right click
 bottom_action_frame = tk.Frame(bg=BG_MAIN)
 bottom_action_frame.pack(fill="x", pady=(8, 6))
 tk.Button(bottom_action_frame, text="➕ Add Selected to Playlist", bg=BG_CARD, fg=FG_TEXT, relief="flat",
-          command=lambda: [add_to_playlist(int(s)) for s in tree.selection()]).pack(side="left", padx=6)
+          command=on_add_selected).pack(side="left", padx=6)
 tk.Button(bottom_action_frame, text="➖ Remove Selected", bg=BG_CARD, fg=FG_TEXT, relief="flat",
-          command=lambda: [remove_from_playlist(int(s)) for s in tree.selection()]).pack(side="left", padx=6)
-# ----------------------- Dashboard charts helpers -----------------------
-def create_donut_chart(parent, dfc, column, title, row, col, colors=None):
-    # Slightly nudge the pie right so labels (if long) don't overlap
-    fig = Figure(figsize=(4.2, 3.2), facecolor=BG_MAIN)
-    ax = fig.add_subplot(111)
-    counts = dfc[column].value_counts().head(6)
-    if len(counts) > 0:
-        wedges, texts, autotexts = ax.pie(counts.values, labels=counts.index, autopct='%1.1f%%', startangle=90, wedgeprops=dict(width=0.4))
-        # make sure labels don't overlap with left edge
-        fig.subplots_adjust(left=0.18, right=0.98)
-    ax.set_title(title, fontsize=10, pad=12)
-    fig.patch.set_facecolor(BG_MAIN)
-    canvas = FigureCanvasTkAgg(fig, master=parent)
-    canvas.draw()
-    canvas.get_tk_widget().grid(row=row, column=col, padx=6, pady=6, sticky="nsew")
-def create_horizontal_bar(parent, series, title, row, col, color=None):
-    # make the figure wider and shift content to the right so y-labels (artists) are fully visible
-    fig = Figure(figsize=(6.5, 2.6), facecolor=BG_MAIN)
-    ax = fig.add_subplot(111)
-    if not series.empty:
-        y_pos = np.arange(len(series))
-        ax.barh(y_pos, series.values)
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels(series.index, fontsize=8)
-        ax.invert_yaxis()
-        # increase left margin so long artist names fit | moves bars to the right
-        fig.subplots_adjust(left=0.38, right=0.98, top=0.9, bottom=0.12)
-    else:
-        fig.subplots_adjust(left=0.12, right=0.98)
-    ax.set_title(title, fontsize=10)
-    fig.patch.set_facecolor(BG_MAIN)
-    canvas = FigureCanvasTkAgg(fig, master=parent)
-    canvas.draw()
-    canvas.get_tk_widget().grid(row=row, column=col, padx=6, pady=6, sticky="nsew")
-def create_pie_chart(parent, series, title, row, col):
-    fig = Figure(figsize=(4.2, 3.2), facecolor=BG_MAIN)
-    ax = fig.add_subplot(111)
-    if not series.empty:
-        ax.pie(series.values, labels=series.index, autopct='%1.1f%%')
-        fig.subplots_adjust(left=0.18, right=0.98)
-    ax.set_title(title, fontsize=10)
-    fig.patch.set_facecolor(BG_MAIN)
-    canvas = FigureCanvasTkAgg(fig, master=parent)
-    canvas.draw()
-    canvas.get_tk_widget().grid(row=row, column=col, padx=6, pady=6, sticky="nsew")
-def create_histogram(parent, series, title, row, col, span=1):
-    fig = Figure(figsize=(8.6, 3.2), facecolor=BG_MAIN)
-    ax = fig.add_subplot(111)
-    ax.hist(series.dropna(), bins=15)
-    ax.set_title(title, fontsize=10)
-    # nudge histogram right a little so axis labels are not clipped
-    fig.subplots_adjust(left=0.12, right=0.98)
-    fig.patch.set_facecolor(BG_MAIN)
-    canvas = FigureCanvasTkAgg(fig, master=parent)
-    canvas.draw()
-    canvas.get_tk_widget().grid(row=row, column=col, columnspan=span, padx=6, pady=6, sticky="nsew")
+          command=on_remove_selected).pack(side="left", padx=6)
+# ----------------------- Dashboard (off-thread rendering) -----------------------
+dashboard_renderer = audion_dashboard.DashboardRenderer()   # Agg PNGs cached per playlist signature
+DASHBOARD_POLL_MS = 50
+DASHBOARD_SLOTS = {
+    # chart key: (row, column, columnspan)
+    "genres": (0, 0, 1),
+    "artists": (0, 1, 1),
+    "languages": (1, 0, 1),
+    "moods": (1, 1, 1),
+    "lengths": (3, 0, 2),
+}
+def poll_dashboard_charts(win, slots, futures):
+    if not win.winfo_exists():
+        return
+    for key in [k for k, f in futures.items() if f.done()]:
+        future = futures.pop(key)
+        label = slots[key]
+        try:
+            image = tk.PhotoImage(master=win, data=base64.b64encode(future.result()))
+        except Exception as e:
+            label.config(text=f"Chart failed: {e}")
+            continue
+        label.config(image=image, text="")
+        label.image = image   # keep a reference or Tk drops the image
+    if futures:
+        win.after(DASHBOARD_POLL_MS, poll_dashboard_charts, win, slots, futures)
+@audion_instrument.timed()
 def open_ultimate_dashboard():
     pl_df = get_playlist_df()
     if pl_df.empty:
         messagebox.showwarning("No Playlist", "Select songs atleast one song!")
         return
+    agg = audion_dashboard.dashboard_aggregates(pl_df)
     win = tk.Toplevel(window)
     win.title("🎨 Audion Wrapped – Ultimate Analysis")
     win.configure(bg=BG_MAIN)
@@ -534,10 +590,8 @@ def open_ultimate_dashboard():
     win.state("zoomed")
     header = tk.Frame(win, bg=BG_PANEL, height=90)
     header.grid(row=0, column=0, sticky="ew", padx=0, pady=(0, 10))
-    total_min = pl_df["Duration_min"].sum()
-    primary_mood = pl_df["Mood"].value_counts().idxmax() if not pl_df.empty else "Mixed"
     tk.Label(header, text="🎵 Your Playlist Wrapped", bg=BG_PANEL, fg=FG_TEXT, font=("Segoe UI", 18, "bold")).pack(side="left", padx=18, pady=18)
-    tk.Label(header, text=f"{len(pl_df)} songs • {format_minutes(total_min)} • {primary_mood} vibes", bg=BG_PANEL, fg=ACCENT, font=("Segoe UI", 10, "bold")).pack(side="right", padx=18, pady=18)
+    tk.Label(header, text=f"{agg['tracks']} songs • {format_minutes(agg['total_min'])} • {agg['primary_mood']} vibes", bg=BG_PANEL, fg=ACCENT, font=("Segoe UI", 10, "bold")).pack(side="right", padx=18, pady=18)
     notebook = ttk.Notebook(win)
     notebook.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 12))
     overview_frame = tk.Frame(notebook, bg=BG_MAIN)
@@ -548,21 +602,112 @@ def open_ultimate_dashboard():
         charts_layout.grid_rowconfigure(r, weight=1, pad=4)
     for c in range(2):
         charts_layout.grid_columnconfigure(c, weight=1, pad=4)
-    create_donut_chart(charts_layout, pl_df, "Genre", "Genres", 0, 0)
-    # pass top 8 artists to make space for names
-    create_horizontal_bar(charts_layout, pl_df["Artist"].value_counts().head(8), "Top Artists", 0, 1)
-    create_pie_chart(charts_layout, pl_df["Language"].value_counts().head(5), "Languages", 1, 0)
-    create_donut_chart(charts_layout, pl_df, "Mood", "Mood Distribution", 1, 1)
-    summary = compute_playlist_summary(pl_df)
-    tk.Label(charts_layout, text=generate_text_insight(pl_df, summary), justify="left", bg=BG_CARD2, fg=FG_TEXT, wraplength=900).grid(row=2, column=0, columnspan=2, sticky="nsew", padx=6, pady=6)
-    create_histogram(charts_layout, pl_df["Duration_min"], "Song Lengths (min)", 3, 0, span=2)
+    # Placeholders hold each chart's grid cell until its PNG arrives from the render thread
+    slots = {}
+    for key, (row, col, span) in DASHBOARD_SLOTS.items():
+        slots[key] = tk.Label(charts_layout, text=f"Rendering {agg['charts'][key]['title']}…", bg=BG_MAIN, fg=FG_MUTED, font=FONT_SMALL)
+        slots[key].grid(row=row, column=col, columnspan=span, padx=6, pady=6, sticky="nsew")
+    tk.Label(charts_layout, text=agg["insight"], justify="left", bg=BG_CARD2, fg=FG_TEXT, wraplength=900).grid(row=2, column=0, columnspan=2, sticky="nsew", padx=6, pady=6)
+    futures = dashboard_renderer.submit(audion_dashboard.playlist_signature(pl_df), agg["charts"])
+    poll_dashboard_charts(win, slots, futures)
+# ----------------------- Background catalog loading -----------------------
+def set_filter_controls(enabled):
+    search_entry.config(state="normal" if enabled else "disabled")
+    for combo, var in facet_combos.values():
+        combo.config(state="readonly" if enabled else "disabled")
+@audion_instrument.timed()
+def install_catalog(state, final):
+    """Swap in a catalog and the structures the loader thread built for it (Tk thread only)."""
+    global df, catalog_fingerprint, search_index, facet_index, recommender, playlist, selected_songs, queue
+    queued = list(queue)
+    df = state["df"]
+    catalog_fingerprint = state.get("fingerprint")
+    audion_instrument.set_catalog_size(len(df))
+    search_index = state["search_index"]
+    facet_index = state["facet_index"]
+    recommender = state["recommender"]
+    song_table.set_data(state["display"], df.index)
+    playlist = audion_playlist.PlaylistStats(df)
+    playlist.replace(queued)   # tracks picked from a partial catalog keep their ids in the full one
+    selected_songs = queue = playlist.queue
+    apply_filters()
+    update_playlist_widgets()
+    set_filter_controls(True)
+    if final and df.attrs.get("load_errors"):
+        # Partial load: say which chunks were skipped instead of hiding it
+        messagebox.showwarning("Catalog partly loaded", f"{len(df)} tracks loaded; these parts were skipped:\n\n" + "\n".join(df.attrs["load_errors"][:20]))
+def poll_catalog_loader():
+    global catalog_ready
+    for kind, payload in catalog_loader.poll():
+        if kind == "progress" and not catalog_ready:
+            status_bar.config(text=f"Loading catalog… {payload:,} tracks so far")
+        elif kind == "partial" and not catalog_ready:
+            install_catalog(payload, final=False)
+        elif kind == "ready":
+            catalog_ready = True
+            install_catalog(payload, final=True)
+        elif kind == "failed":
+            errors = payload.errors if isinstance(payload, audion_ingest.CatalogLoadError) else []
+            detail = "\n".join(audion_ingest.format_chunk_error(err) for err in errors) or str(payload)
+            messagebox.showerror("Catalog not loaded", "No tracks could be loaded:\n\n" + detail)
+            window.destroy()
+            return
+    if not catalog_ready:
+        window.after(LOAD_POLL_MS, poll_catalog_loader)
+@audion_instrument.timed()
+def reload_catalog():
+    """Pick up edits to the source file: only new or changed rows are re-enriched."""
+    global catalog_refresher
+    if not catalog_ready or catalog_refresher is not None:
+        return
+    state = {"df": df, "search_index": search_index, "facet_index": facet_index, "recommender": recommender}
+    catalog_refresher = audion_loader.CatalogRefresher(state, audion_core.CATALOG_PATH).start()
+    reload_button.config(state="disabled")
+    status_bar.config(text="Reloading catalog…")
+    window.after(LOAD_POLL_MS, poll_catalog_refresher)
+def poll_catalog_refresher():
+    global catalog_refresher
+    messages = catalog_refresher.poll()
+    if not messages:
+        window.after(LOAD_POLL_MS, poll_catalog_refresher)
+        return
+    catalog_refresher = None
+    reload_button.config(state="normal")
+    kind, payload = messages[0]
+    if kind == "failed":
+        errors = payload.errors if isinstance(payload, audion_ingest.CatalogLoadError) else []
+        detail = "\n".join(audion_ingest.format_chunk_error(err) for err in errors) or str(payload)
+        messagebox.showerror("Catalog not reloaded", detail + "\n\nThe current catalog is kept.")
+        return
+    state, changes = payload
+    queued = len(queue)
+    install_catalog(state, final=True)
+    note = audion_refresh.describe_changes(changes)
+    if len(queue) < queued:
+        note += f"; {queued - len(queue)} deleted track(s) left the playlist"
+    status_bar.config(text=f"Catalog reloaded: {note}")
 # ----------------------- Events, initialization -----------------------
-search_var.trace_add("write", lambda *args: apply_filters())
+def schedule_filters(*args):
+    # Debounce keystrokes: only filter once typing pauses for FILTER_DEBOUNCE_MS
+    global filter_job
+    if filter_job is not None:
+        window.after_cancel(filter_job)
+    filter_job = window.after(FILTER_DEBOUNCE_MS, run_scheduled_filters)
+def run_scheduled_filters():
+    global filter_job
+    filter_job = None
+    apply_filters()
+search_var.trace_add("write", schedule_filters)
 language_combo.bind("<<ComboboxSelected>>", apply_filters)
 genre_combo.bind("<<ComboboxSelected>>", apply_filters)
+mood_combo.bind("<<ComboboxSelected>>", apply_filters)
 status_bar = tk.Label(window, text="Ready • 0 selected", bg=BG_PANEL, fg=FG_MUTED, font=FONT_SMALL, anchor="w")
 status_bar.pack(side="bottom", fill="x")
 apply_filters()
 update_library_stats()
 update_playlist_widgets()
+set_filter_controls(False)
+status_bar.config(text="Loading catalog…")
+catalog_loader.start()
+window.after(LOAD_POLL_MS, poll_catalog_loader)
 window.mainloop()
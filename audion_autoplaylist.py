@@ -0,0 +1,169 @@
+# Audion – automatic playlist builder
+# "60 minutes of Calm + Romantic in Hindi": candidates come from the facet
+# index, each mood gets its share of the target minutes, and a seeded random
+# sample of every mood's candidates is filled greedily (vectorized prefix sums
+# under the per-artist cap). A repair pass then closes the gap to the target
+# with best-fit additions and single-track swaps found by binary search over
+# sorted durations, so the work is bounded by the sample size, not the catalog.
+# Versions of one song (rows sharing a Track_id) are picked at most once.
+import numpy as np
+from audion_core import TRACK_ID, column_codes
+from audion_instrument import timed
+
+POOL_SIZE = 20000        # candidates sampled per mood
+REPAIR_ROUNDS = 8
+def mood_shares(moods):
+    """{mood: weight} normalized to 1; a list means equal shares, None or empty means any mood ({None: 1})."""
+    if not moods:
+        return {None: 1.0}
+    if not isinstance(moods, dict):
+        moods = {m: 1.0 for m in moods}
+    moods = {m: float(w) for m, w in moods.items() if w > 0}
+    total = sum(moods.values())
+    return {m: w / total for m, w in moods.items()} if total else {None: 1.0}
+def _occurrence(codes):
+    """For each element, how many earlier elements share its code."""
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    rank = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+    out = np.empty(len(codes), dtype=np.int64)
+    out[order] = rank
+    return out
+def _song_positions(catalog, rows):
+    """Position of each row's canonical version (the row its Track_id names); without Track_id, the row itself."""
+    if TRACK_ID not in catalog.columns:
+        return rows
+    songs = catalog.index.get_indexer(catalog[TRACK_ID].to_numpy()[rows])
+    return np.where(songs >= 0, songs, rows)
+class _MoodPool:
+    """A mood's sampled candidates: positions, durations, artist and song codes, plus which are taken."""
+    def __init__(self, rows, durations, artists, songs, rng, size):
+        self.available = len(rows)
+        if len(rows) > size:
+            rows = rows[np.sort(rng.choice(len(rows), size=size, replace=False))]
+        rows = rows[rng.permutation(len(rows))]
+        self.rows = rows
+        self.durations = durations[rows].astype(np.float64)
+        self.artists = artists[rows]
+        self.tracks = songs(rows)
+        self.taken = np.zeros(len(rows), dtype=bool)
+    def fill(self, target, artist_used, track_used, cap):
+        """Greedy: take candidates in sample order while the running total stays within target."""
+        allowed = _occurrence(self.artists) + artist_used[self.artists] < cap
+        allowed &= (_occurrence(self.tracks) + track_used[self.tracks] == 0) & (self.durations > 0)
+        idx = np.flatnonzero(allowed)
+        within = np.cumsum(self.durations[idx]) <= target
+        # Stop at the first track that would overshoot; repair fills the rest
+        stop = np.argmin(within) if not within.all() else len(within)
+        chosen = idx[:stop]
+        self.taken[chosen] = True
+        np.add.at(artist_used, self.artists[chosen], 1)
+        track_used[self.tracks[chosen]] = 1
+        return float(self.durations[chosen].sum())
+    def free(self, artist_used, track_used, cap):
+        """Sample indices still available under the artist cap whose song is not picked yet."""
+        return np.flatnonzero(~self.taken & (artist_used[self.artists] < cap) & (track_used[self.tracks] == 0) & (self.durations > 0))
+@timed()
+def build_playlist(catalog, facet_index, target_min, moods=None, filters=None, tolerance_min=2.0, artist_cap=2,
+                   exclude=(), seed=None, pool_size=POOL_SIZE):
+    """Pick tracks totalling target_min ± tolerance_min.
+
+    moods: {mood: weight}, a list of moods (equal shares) or None (any mood);
+    filters: facet selections such as {"Language": "Hindi"}; at most
+    artist_cap tracks per artist; labels in exclude are never picked.
+    Returns a dict with labels (interleaved by mood), total_min, per-mood
+    minutes, and ok (whether the total is within tolerance).
+    """
+    rng = np.random.default_rng(seed)
+    filters = {c: v for c, v in (filters or {}).items() if c != "Mood"}
+    durations = catalog["Duration_min"].to_numpy()
+    artists = column_codes(catalog["Artist"])[0] if "Artist" in catalog.columns else np.zeros(len(catalog), dtype=np.int32)
+    artists = np.where(artists < 0, artists.max(initial=0) + 1, artists)
+    artist_used = np.zeros(int(artists.max(initial=0)) + 2, dtype=np.int64)
+    excluded = catalog.index.get_indexer(list(exclude)) if len(exclude) else np.empty(0, dtype=np.int64)
+    excluded = excluded[excluded >= 0]
+    # Songs are looked up for sampled rows only; excluding a version excludes the whole song
+    def songs(rows):
+        return _song_positions(catalog, rows)
+    track_used = np.zeros(len(catalog), dtype=np.int8)
+    track_used[songs(excluded)] = 1
+    shares = mood_shares(moods)
+    pools = {}
+    for mood, share in shares.items():
+        rows = facet_index.resolve({**filters, **({"Mood": mood} if mood is not None else {})})
+        rows = np.arange(len(catalog)) if rows is None else rows
+        if len(excluded):
+            rows = rows[~np.isin(rows, excluded)]
+        pools[mood] = _MoodPool(rows, durations, artists, songs, rng, pool_size)
+    totals = {mood: pool.fill(target_min * shares[mood], artist_used, track_used, artist_cap) for mood, pool in pools.items()}
+    # ---- Repair: best-fit additions, then single swaps, always in the mood furthest below its share ----
+    for _ in range(REPAIR_ROUNDS):
+        gap = target_min - sum(totals.values())
+        if abs(gap) <= tolerance_min:
+            break
+        improved = False
+        for mood in sorted(pools, key=lambda m: totals[m] - target_min * shares[m]):
+            pool = pools[mood]
+            free = pool.free(artist_used, track_used, artist_cap)
+            if gap > 0 and len(free):
+                # Add the free track closest in length to the gap, overshooting by at most the tolerance
+                order = free[np.argsort(pool.durations[free], kind="stable")]
+                free_d = pool.durations[order]
+                # A gap longer than every free track takes the longest one
+                i = min(int(np.searchsorted(free_d, gap)), len(free_d) - 1)
+                if free_d[i] > gap + tolerance_min or (i > 0 and gap - free_d[i - 1] <= free_d[i] - gap):
+                    i -= 1
+                if i >= 0 and free_d[i] <= gap + tolerance_min:
+                    pick = order[i]
+                    pool.taken[pick] = True
+                    artist_used[pool.artists[pick]] += 1
+                    track_used[pool.tracks[pick]] = 1
+                    totals[mood] += pool.durations[pick]
+                    improved = True
+                    break
+            taken = np.flatnonzero(pool.taken)
+            if len(taken) and len(free):
+                # Swap one taken track for a free one that is longer (or shorter) by about the gap
+                order = free[np.argsort(pool.durations[free], kind="stable")]
+                free_d = pool.durations[order]
+                want = pool.durations[taken] + gap
+                pos = np.clip(np.searchsorted(free_d, want), 1, len(free_d)) - 1
+                best = np.where(np.abs(free_d[np.minimum(pos + 1, len(free_d) - 1)] - want) < np.abs(free_d[pos] - want),
+                                np.minimum(pos + 1, len(free_d) - 1), pos)
+                new_gap = np.abs(want - free_d[best])
+                # The incoming artist must still be under the cap once the outgoing track leaves
+                same = pool.artists[order[best]] == pool.artists[taken]
+                ok = same | (artist_used[pool.artists[order[best]]] < artist_cap)
+                new_gap[~ok] = np.inf
+                k = int(np.argmin(new_gap))
+                if new_gap[k] < abs(gap):
+                    out, into = taken[k], order[best[k]]
+                    pool.taken[out], pool.taken[into] = False, True
+                    artist_used[pool.artists[out]] -= 1
+                    artist_used[pool.artists[into]] += 1
+                    track_used[pool.tracks[out]], track_used[pool.tracks[into]] = 0, 1
+                    totals[mood] += pool.durations[into] - pool.durations[out]
+                    improved = True
+                    break
+        if not improved:
+            break
+    # Interleave moods so the queue alternates instead of playing each mood in a block
+    picked = []
+    for mood, pool in pools.items():
+        taken = pool.rows[np.flatnonzero(pool.taken)]
+        picked.append((np.arange(len(taken)) / max(len(taken), 1), taken))
+    if picked:
+        keys = np.concatenate([k for k, _ in picked])
+        rows = np.concatenate([r for _, r in picked])[np.argsort(keys, kind="stable")]
+    else:
+        rows = np.empty(0, dtype=np.int64)
+    total = float(durations[rows].astype(np.float64).sum())
+    return {
+        "labels": catalog.index[rows].tolist(),
+        "total_min": total,
+        "target_min": float(target_min),
+        "ok": abs(total - target_min) <= tolerance_min,
+        "moods": {("Any" if m is None else m): float(t) for m, t in totals.items()},
+        "candidates": {("Any" if m is None else m): p.available for m, p in pools.items()},
+    }
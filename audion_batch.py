@@ -0,0 +1,218 @@
+# Audion – headless batch Wrapped reports
+# Renders the dashboard charts, an HTML report and the text summary for many
+# playlist files. Playlists are spread over a process pool; each worker loads
+# the catalog once, memory-mapping the numeric columns of the on-disk cache so
+# workers share those pages instead of holding private copies.
+#
+#   python audion_batch.py playlists/*.csv --out reports --workers 8
+import os
+import sys
+import html
+import time
+import base64
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import audion_core
+import audion_cache
+import audion_dashboard
+from audion_search import fold_text
+
+ID_COLUMNS = ("index", "id", "track_id", "Track_id")
+NAME_COLUMNS = ("Name", "name", "title", "Title")
+ARTIST_COLUMNS = ("Artist", "artist")
+ERROR_LOG = "errors.tsv"
+# ----------------------- Track resolution -----------------------
+class TrackResolver:
+    """Maps playlist entries (catalog ids, names, or "Name | Artist") to catalog labels."""
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.labels = set(catalog.index.tolist())
+        names = [fold_text(n).strip() for n in catalog["Name"].tolist()]
+        artists = [fold_text(a).strip() for a in catalog["Artist"].tolist()] if "Artist" in catalog.columns else [""] * len(names)
+        self.by_name = {}
+        self.by_name_artist = {}
+        # First catalog row wins for duplicate titles, as in the song table order
+        for label, name, artist in zip(catalog.index.tolist(), names, artists):
+            self.by_name.setdefault(name, label)
+            self.by_name_artist.setdefault((name, artist), label)
+    def _id(self, value):
+        value = str(value).strip()
+        if value in self.labels:
+            return value
+        try:
+            label = int(float(value))
+        except (ValueError, OverflowError):
+            return None
+        return label if label in self.labels else None
+    def _name(self, name, artist=""):
+        name, artist = fold_text(name).strip(), fold_text(artist).strip()
+        if not artist and " | " in name:
+            name, artist = (part.strip() for part in name.split(" | ", 1))
+        if artist:
+            return self.by_name_artist.get((name, artist))
+        return self.by_name.get(name)
+    def resolve(self, entries):
+        """entries: DataFrame read from a playlist file. Returns (labels, unresolved entries)."""
+        cols = list(entries.columns)
+        id_col = next((c for c in ID_COLUMNS if c in cols), None)
+        name_col = next((c for c in NAME_COLUMNS if c in cols), None)
+        artist_col = next((c for c in ARTIST_COLUMNS if c in cols), None)
+        if id_col is None and name_col is None:
+            # Headerless file: one track per line, id or name
+            id_col = name_col = cols[0]
+        labels, missing = [], []
+        for _, row in entries.iterrows():
+            label = self._id(row[id_col]) if id_col is not None else None
+            if label is None and name_col is not None:
+                label = self._name(row[name_col], row[artist_col] if artist_col else "")
+            if label is None:
+                missing.append(" | ".join(str(row[c]) for c in dict.fromkeys((id_col, name_col, artist_col)) if c is not None))
+            else:
+                labels.append(label)
+        return list(dict.fromkeys(labels)), missing
+def read_playlist_file(path):
+    entries = pd.read_csv(path, dtype=str, keep_default_na=False)
+    known = set(ID_COLUMNS) | set(NAME_COLUMNS) | set(ARTIST_COLUMNS)
+    if not known & set(entries.columns):
+        # No recognised header: the first line is a track too
+        entries = pd.read_csv(path, dtype=str, keep_default_na=False, header=None)
+    return entries
+# ----------------------- Reports -----------------------
+def report_html(title, agg, chart_files, pl_df):
+    rows = "\n".join(
+        f"<tr><td>{i + 1}</td><td>{html.escape(str(r.get('Name', '')))}</td><td>{html.escape(str(r.get('Artist', '')))}</td>"
+        f"<td>{html.escape(str(r.get('Genre', '')))}</td><td>{audion_core.format_minutes(r.get('Duration_min', 0.0))}</td></tr>"
+        for i, r in pl_df.iterrows())
+    charts = "\n".join(f'<img src="{html.escape(f)}" alt="{html.escape(agg["charts"][k]["title"])}">' for k, f in chart_files.items())
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)} – Audion Wrapped</title>
+<style>
+body {{ background: {audion_dashboard.CHART_BG}; color: {audion_dashboard.CHART_FG}; font-family: "Segoe UI", sans-serif; margin: 24px; }}
+h1 {{ margin-bottom: 4px; }} .sub {{ color: #6366F1; font-weight: bold; }}
+pre {{ background: #0f172a; padding: 12px; white-space: pre-wrap; }}
+img {{ margin: 6px; max-width: 100%; }} table {{ border-collapse: collapse; }} td {{ padding: 2px 10px; }}
+</style></head><body>
+<h1>🎵 {html.escape(title)} – Wrapped</h1>
+<div class="sub">{agg["tracks"]} songs • {audion_core.format_minutes(agg["total_min"])} • {html.escape(agg["primary_mood"])} vibes</div>
+<pre>{html.escape(agg["insight"])}</pre>
+{charts}
+<h2>Track list</h2>
+<table>
+{rows}
+</table>
+</body></html>
+"""
+def render_report(catalog, resolver, path, out_dir, formats=("png", "html", "txt")):
+    """Write one playlist's report into out_dir; returns (track count, unresolved entries)."""
+    labels, missing = resolver.resolve(read_playlist_file(path))
+    if not labels:
+        raise ValueError("no tracks could be matched against the catalog")
+    pl_df = audion_core.playlist_df(catalog, labels)
+    agg = audion_dashboard.dashboard_aggregates(pl_df)
+    os.makedirs(out_dir, exist_ok=True)
+    chart_files = {}
+    for key, chart in agg["charts"].items():
+        png = audion_dashboard.render_chart_png(chart)
+        if "png" in formats:
+            chart_files[key] = f"{key}.png"
+            with open(os.path.join(out_dir, chart_files[key]), "wb") as f:
+                f.write(png)
+        else:
+            chart_files[key] = "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+    title = os.path.splitext(os.path.basename(path))[0]
+    if "html" in formats:
+        with open(os.path.join(out_dir, "report.html"), "w", encoding="utf-8") as f:
+            f.write(report_html(title, agg, chart_files, pl_df))
+    if "txt" in formats:
+        audion_core.write_playlist_summary_txt(pl_df, os.path.join(out_dir, "summary.txt"))
+    return len(labels), missing
+# ----------------------- Worker pool -----------------------
+_worker = {}
+def load_worker_catalog(cache_path, source_path):
+    """The catalog as a worker sees it: memory-mapped from the cache when there is one."""
+    if cache_path is not None:
+        return audion_cache.load_cache(cache_path, mmap_mode="r")
+    return audion_core.load_catalog(source_path)
+def _init_worker(cache_path, source_path, formats):
+    catalog = load_worker_catalog(cache_path, source_path)
+    _worker.update(catalog=catalog, resolver=TrackResolver(catalog), formats=formats)
+def _run_one(task):
+    path, out_dir = task
+    try:
+        count, missing = render_report(_worker["catalog"], _worker["resolver"], path, out_dir, _worker["formats"])
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}", []
+    return path, count, None, missing
+def output_dirs(paths, out_root):
+    """One report directory per playlist, named after the file (suffixed on name clashes)."""
+    seen = {}
+    dirs = []
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        dirs.append(os.path.join(out_root, stem if seen[stem] == 1 else f"{stem}-{seen[stem]}"))
+    return dirs
+def prepare_catalog(source_path, rebuild=False):
+    """Build or refresh the on-disk cache in the parent so workers only read it.
+
+    Returns (cache path, or None when there is no cache matching the source, load errors).
+    A partial load is not cached, so workers then parse the source themselves
+    rather than read an older cache.
+    """
+    catalog = audion_cache.load_catalog_cached(source_path, rebuild=rebuild)
+    errors = list(catalog.attrs.get("load_errors", ()))
+    if not isinstance(source_path, (str, os.PathLike)) or not os.path.exists(source_path):
+        return None, errors
+    cache_path = audion_cache.cache_path_for(source_path)
+    fresh = audion_cache.is_fresh(audion_cache.read_meta(cache_path), source_path)
+    return (cache_path if fresh else None), errors
+def run_batch(paths, out_root, workers=None, source_path=audion_core.CATALOG_PATH, formats=("png", "html", "txt"),
+              rebuild=False, chunksize=16, log=print):
+    """Render reports for every playlist file; failures are collected, not raised. Returns (ok, failed)."""
+    cache_path, load_errors = prepare_catalog(source_path, rebuild)
+    for message in load_errors:
+        log(f"catalog: skipped {message}")
+    os.makedirs(out_root, exist_ok=True)
+    tasks = list(zip(paths, output_dirs(paths, out_root)))
+    ok, failed = [], []
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_path, source_path, tuple(formats))) as pool:
+        for done, (path, count, error, missing) in enumerate(pool.map(_run_one, tasks, chunksize=chunksize), 1):
+            if error is None:
+                ok.append(path)
+                if missing:
+                    log(f"{path}: {len(missing)} entr{'y' if len(missing) == 1 else 'ies'} not found in the catalog")
+            else:
+                failed.append((path, error))
+                log(f"{path}: FAILED – {error}")
+            if done % 500 == 0:
+                log(f"{done}/{len(tasks)} playlists ({time.time() - started:.0f}s)")
+    if failed or load_errors:
+        with open(os.path.join(out_root, ERROR_LOG), "w", encoding="utf-8") as f:
+            f.writelines(f"{source_path}\t{message}\n" for message in load_errors)
+            f.writelines(f"{path}\t{error}\n" for path, error in failed)
+    return ok, failed
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Audion Wrapped reports for many playlist files.")
+    parser.add_argument("playlists", nargs="+", help="playlist CSV files (track ids, names, or Name/Artist columns) or directories of them")
+    parser.add_argument("--out", default="audion_reports", help="output directory (one sub-directory per playlist)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--catalog", default=audion_core.CATALOG_PATH, help="catalog workbook")
+    parser.add_argument("--formats", default="png,html,txt", help="comma-separated subset of png,html,txt")
+    parser.add_argument("--rebuild-cache", action="store_true", help="re-enrich the catalog instead of using the cache")
+    args = parser.parse_args(argv)
+    paths = []
+    for p in args.playlists:
+        if os.path.isdir(p):
+            paths.extend(sorted(os.path.join(p, f) for f in os.listdir(p) if f.lower().endswith(".csv")))
+        else:
+            paths.append(p)
+    formats = tuple(f.strip() for f in args.formats.split(",") if f.strip())
+    ok, failed = run_batch(paths, args.out, args.workers, args.catalog, formats, args.rebuild_cache,
+                           log=lambda msg: print(msg, file=sys.stderr))
+    print(f"{len(ok)} reports written to {args.out}, {len(failed)} failed")
+    return 1 if failed else 0
+if __name__ == "__main__":
+    sys.exit(main())
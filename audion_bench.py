@@ -0,0 +1,304 @@
+# Audion – benchmark harness
+# Generates a deterministic synthetic catalog of any size and times each
+# pipeline stage on its own (best / median of several runs), then measures the
+# stage's peak traced memory in one extra run. Results go to JSON so versions
+# can be compared; --compare flags stages that got slower.
+#
+#   python audion_bench.py --sizes 1000,100000,1000000 --out bench.json
+#   python audion_bench.py --sizes 100000 --compare bench.json
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+import audion_core
+import audion_dedup
+import audion_search
+import audion_facets
+import audion_recommend
+import audion_dashboard
+
+BENCH_FORMAT = 1
+DEFAULT_SIZES = (1000, 100000, 1000000)
+# Shares roughly follow the bundled workbook, widened to a larger label set
+GENRES = {
+    "Pop": 18, "Indie Pop": 14, "Bollywood Romantic": 8, "Hip Hop": 6, "Dance Pop": 5, "EDM": 5, "K-Pop": 4,
+    "Punjabi Pop": 4, "R&B / Pop": 4, "Rock / Alternative": 4, "Bollywood Dance": 3, "Tamil Pop / Dance": 3,
+    "Indie Folk": 3, "Pop Ballad": 3, "Lo-fi": 3, "Classical": 2, "Soul": 2, "Emo Rap": 2, "Sad Pop": 2,
+    "Malayalam Romantic": 1, "Latin Pop": 1, "Jazz": 1,
+}
+LANGUAGES = {
+    "English": 50, "Hindi": 20, "Tamil": 7, "Kannada": 5, "Punjabi": 5, "Telugu": 4, "Korean": 4,
+    "Malayalam": 2, "Spanish": 1.5, "Japanese": 1, "Urdu": 0.5,
+}
+TITLE_WORDS = ("Love", "Night", "City", "Heart", "Dream", "Fire", "Summer", "Rain", "Moon", "Dance", "Lonely", "Chill",
+               "Forever", "Road", "Golden", "Tears", "Wild", "Sunshine", "Echo", "River", "Slow", "Party", "Dil", "Ishq",
+               "Baby", "Lost", "Paradise", "Midnight", "Boom", "Señorita", "Café", "Stars", "Home", "Blue", "Run")
+FIRST_NAMES = ("Arijit", "Taylor", "Sid", "Shawn", "Anirudh", "Dua", "Ed", "Shreya", "Billie", "Diljit", "Selena",
+               "Harry", "Neha", "Justin", "Ariana", "Jubin", "Rosalía", "Bad", "Lana", "Beyoncé", "Armaan", "Karol", "Atif", "Olivia")
+LAST_NAMES = ("Singh", "Swift", "Sriram", "Mendes", "Ravichander", "Lipa", "Sheeran", "Ghoshal", "Eilish", "Dosanjh",
+              "Gomez", "Styles", "Kakkar", "Bieber", "Grande", "Nautiyal", "Bunny", "Del Rey", "Malik", "G", "Aslam", "Rodrigo")
+def _weighted(rng, table, n):
+    names = list(table)
+    p = np.array([table[k] for k in names], dtype=float)
+    return np.array(names, dtype=object)[rng.choice(len(names), size=n, p=p / p.sum())]
+def synthetic_catalog(n, seed=0):
+    """A raw catalog frame (Name, Artist, Genre, Language, Duration) that is the same for the same n and seed.
+
+    Artists follow a Zipf-like popularity curve, durations a log-normal around
+    3.4 minutes; about 1% of durations are blank or oddly formatted and titles
+    carry mood keywords and accents, so every parsing path is exercised.
+    """
+    rng = np.random.default_rng([seed, n])
+    words = np.array(TITLE_WORDS, dtype=object)
+    picks = words[rng.integers(0, len(words), size=(n, 3))]
+    lengths = rng.choice([1, 2, 3], size=n, p=[0.35, 0.45, 0.2])
+    names = [" ".join(row[:k]) for row, k in zip(picks.tolist(), lengths.tolist())]
+    pool = max(50, n // 25)
+    ranks = np.arange(1, pool + 1, dtype=float)
+    popularity = ranks ** -1.1
+    artist_ids = rng.choice(pool, size=n, p=popularity / popularity.sum())
+    combos = len(FIRST_NAMES) * len(LAST_NAMES)
+    artist_names = [f"{FIRST_NAMES[r % len(FIRST_NAMES)]} {LAST_NAMES[(r // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+                    + (f" {r // combos}" if r >= combos else "") for r in range(pool)]
+    artists = np.array(artist_names, dtype=object)[artist_ids]
+    minutes = np.clip(rng.lognormal(np.log(3.4), 0.28, size=n), 0.75, 12.0)
+    seconds = np.rint(minutes * 60).astype(np.int64)
+    durations = np.array([f"{s // 60}:{s % 60:02d}" for s in seconds.tolist()], dtype=object)
+    odd = rng.random(n)
+    durations[odd < 0.005] = ""
+    durations[(odd >= 0.005) & (odd < 0.01)] = [f"{s // 60} min {s % 60} sec" for s in seconds[(odd >= 0.005) & (odd < 0.01)].tolist()]
+    return pd.DataFrame({
+        "Name": names,
+        "Artist": artists,
+        "Genre": _weighted(rng, GENRES, n),
+        "Language": _weighted(rng, LANGUAGES, n),
+        "Duration": durations,
+    })
+# ----------------------- Stages -----------------------
+# Each stage takes the shared context and returns (callable to time, extra info for the report).
+# Setup done before the return is not timed.
+FILTER_QUERIES = [
+    ("", {}),
+    ("l", {}), ("lo", {}), ("lov", {}), ("love", {}),   # typing, narrowing as the GUI does
+    ("night", {"Language": "Hindi"}),
+    ("", {"Genre": "Pop", "Mood": "Happy"}),
+    ("singh", {"Language": "Punjabi"}),
+    ("beyonce", {}),
+    ("zzzz", {}),
+]
+PLAYLIST_SIZE = 200
+def _catalog(ctx):
+    if "catalog" not in ctx:
+        ctx["catalog"] = audion_core.compact_catalog(audion_core.enrich_catalog(audion_core.normalize_catalog(ctx["raw"].copy())))
+    return ctx["catalog"]
+def _playlist(ctx):
+    if "playlist" not in ctx:
+        catalog = _catalog(ctx)
+        rng = np.random.default_rng(len(catalog))
+        positions = rng.choice(len(catalog), size=min(PLAYLIST_SIZE, len(catalog)), replace=False)
+        ctx["playlist"] = catalog.index[np.sort(positions)].tolist()
+    return ctx["playlist"]
+def stage_load(ctx):
+    path = ctx["source_path"]
+    def run():
+        ctx["catalog"] = audion_core.load_catalog(path)
+    return run, {"format": os.path.splitext(path)[1].lstrip(".")}
+def stage_parse_duration(ctx):
+    durations = audion_core.normalize_catalog(ctx["raw"].copy())["Duration"]
+    return (lambda: audion_core.parse_duration_column(durations)), {}
+def stage_mood_detection(ctx):
+    normalized = audion_core.normalize_catalog(ctx["raw"].copy())
+    names, genres = normalized["Name"], normalized["Genre"]
+    return (lambda: audion_core.detect_mood_column(names, genres)), {}
+def stage_feature_simulation(ctx):
+    catalog = _catalog(ctx)
+    genres, moods = catalog["Genre"], catalog["Mood"]
+    return (lambda: audion_core.simulate_feature_columns(genres, moods)), {}
+def stage_dedup(ctx):
+    catalog = _catalog(ctx).drop(columns=[audion_core.TRACK_ID], errors="ignore")
+    return (lambda: audion_dedup.add_track_ids(catalog)), {}
+def stage_index_build(ctx):
+    catalog = _catalog(ctx)
+    def run():
+        ctx["search_index"] = audion_search.SearchIndex.from_frame(catalog)
+        ctx["facet_index"] = audion_facets.FacetIndex(catalog)
+    return run, {}
+def stage_apply_filters(ctx):
+    catalog = _catalog(ctx)
+    if "search_index" not in ctx:
+        stage_index_build(ctx)[0]()
+    search_index, facet_index = ctx["search_index"], ctx["facet_index"]
+    def run():
+        # apply_filters without the Tk table: search, facet intersection, facet counts
+        search_index._last_query, search_index._last_rows = "", None
+        for query, selections in FILTER_QUERIES:
+            search_rows = search_index.search(query)
+            rows = facet_index.resolve(selections, rows=search_rows)
+            rows = np.arange(len(catalog)) if rows is None else rows
+            facet_index.facet_counts(selections, rows=search_rows)
+    return run, {"queries": len(FILTER_QUERIES)}
+def stage_playlist_summary(ctx):
+    pl_df = audion_core.playlist_df(_catalog(ctx), _playlist(ctx))
+    return (lambda: audion_core.compute_playlist_summary(pl_df)), {"tracks": len(pl_df)}
+def stage_recommender_build(ctx):
+    catalog = _catalog(ctx)
+    def run():
+        ctx["recommender"] = audion_recommend.Recommender(catalog)
+    return run, {}
+def stage_recommendations(ctx):
+    if "recommender" not in ctx:
+        stage_recommender_build(ctx)[0]()
+    recommender, labels = ctx["recommender"], _playlist(ctx)
+    # generate_mood_recommendations in the GUI: contrast mode over the queue
+    return (lambda: recommender.recommend(labels, n=8, mode="contrast")), {"tracks": len(labels)}
+def stage_dashboard_aggregates(ctx):
+    pl_df = audion_core.playlist_df(_catalog(ctx), _playlist(ctx))
+    return (lambda: audion_dashboard.dashboard_aggregates(pl_df)), {"tracks": len(pl_df)}
+STAGES = {
+    "load": stage_load,
+    "parse_duration": stage_parse_duration,
+    "mood_detection": stage_mood_detection,
+    "feature_simulation": stage_feature_simulation,
+    "dedup": stage_dedup,
+    "index_build": stage_index_build,
+    "apply_filters": stage_apply_filters,
+    "playlist_summary": stage_playlist_summary,
+    "recommender_build": stage_recommender_build,
+    "recommendations": stage_recommendations,
+    "dashboard_aggregates": stage_dashboard_aggregates,
+}
+# ----------------------- Running -----------------------
+def measure(fn, repeat):
+    """Wall times of repeat runs, then the traced peak (bytes) of one more run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak
+def write_source(raw, directory, fmt):
+    path = os.path.join(directory, f"catalog.{fmt}")
+    if fmt == "csv":
+        raw.to_csv(path, index=False)
+    elif fmt == "xlsx":
+        raw.to_excel(path, index=False)
+    elif fmt == "parquet":
+        raw.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"unsupported load format '{fmt}'")
+    return path
+def run_size(n, stages=tuple(STAGES), repeat=3, seed=0, load_format="csv", log=print):
+    """Benchmark every stage at one catalog size; returns the JSON-ready result."""
+    started = time.perf_counter()
+    ctx = {"raw": synthetic_catalog(n, seed)}
+    result = {"size": n, "generate_seconds": round(time.perf_counter() - started, 4), "stages": {}}
+    with tempfile.TemporaryDirectory(prefix="audion-bench-") as tmp:
+        for name in stages:
+            entry = {}
+            try:
+                if name == "load":
+                    ctx["source_path"] = write_source(ctx["raw"], tmp, load_format)
+                fn, info = STAGES[name](ctx)
+                times, peak = measure(fn, repeat)
+                entry = {"best": min(times), "median": statistics.median(times), "runs": times,
+                         "peak_mib": round(peak / 2**20, 2), **info}
+                log(f"{n:>9,} {name:<22} best {entry['best'] * 1000:10.2f} ms   peak {entry['peak_mib']:9.2f} MiB")
+            except Exception as e:
+                # A stage that cannot run here (e.g. Parquet without pyarrow) is reported, not fatal
+                entry = {"skipped": f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else e}"}
+                log(f"{n:>9,} {name:<22} skipped: {entry['skipped']}")
+            result["stages"][name] = entry
+    return result
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+def _max_rss_mib():
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+def run_benchmarks(sizes=DEFAULT_SIZES, stages=tuple(STAGES), repeat=3, seed=0, load_format="csv", log=print):
+    report = {
+        "format": BENCH_FORMAT,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": _git_revision(),
+        "enrichment_version": audion_core.ENRICHMENT_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "seed": seed,
+        "results": [run_size(n, stages, repeat, seed, load_format, log) for n in sizes],
+    }
+    report["max_rss_mib"] = _max_rss_mib()
+    return report
+def compare(old, new, threshold=0.2, floor=0.005):
+    """Stages slower than old by more than threshold (and by at least floor seconds).
+
+    Returns a list of (size, stage, old best, new best).
+    """
+    old_by_size = {r["size"]: r["stages"] for r in old.get("results", [])}
+    regressions = []
+    for result in new["results"]:
+        for stage, entry in result["stages"].items():
+            before = old_by_size.get(result["size"], {}).get(stage, {})
+            if "best" not in entry or "best" not in before:
+                continue
+            if entry["best"] > before["best"] * (1 + threshold) and entry["best"] - before["best"] > floor:
+                regressions.append((result["size"], stage, before["best"], entry["best"]))
+    return regressions
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every Audion pipeline stage on synthetic catalogs.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated catalog sizes (1k to 5M tracks)")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best and median are reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--load-format", default="csv", choices=("csv", "xlsx", "parquet"), help="file type for the load stage")
+    parser.add_argument("--out", default="audion_bench.json", help="JSON results file")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file; exit 1 if a stage regressed")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown ratio counted as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    sizes = [int(float(s)) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    report = run_benchmarks(sizes, stages, args.repeat, args.seed, args.load_format, log=lambda msg: print(msg, file=sys.stderr))
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"results written to {args.out} (max RSS {report['max_rss_mib']} MiB)")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for size, stage, before, after in regressions:
+            print(f"REGRESSION {stage} at {size:,} tracks: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({after / before:.2f}x)")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
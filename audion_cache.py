@@ -0,0 +1,162 @@
+# Audion – on-disk column cache of the enriched catalog
+# Each column is stored as its own .npy file (strings as one UTF-8 blob), so a
+# cached catalog loads without openpyxl and without re-running enrichment.
+# The cache is keyed by the source file's size, mtime and SHA-256 and by
+# audion_core.MOOD_MAP_VERSION.
+import os
+import sys
+import json
+import shutil
+import hashlib
+import pandas as pd
+import numpy as np
+import audion_core
+
+CACHE_DIR = ".audion_cache"
+CACHE_FORMAT = 1
+STRING_SEP = "\x00"
+# ----------------------- Keys -----------------------
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+def cache_path_for(path, cache_dir=CACHE_DIR):
+    abspath = os.path.abspath(path)
+    stem = os.path.splitext(os.path.basename(abspath))[0].replace(" ", "_")
+    return os.path.join(cache_dir, f"{stem}-{hashlib.sha1(abspath.encode('utf-8')).hexdigest()[:8]}")
+def source_key(path, with_hash=True):
+    st = os.stat(path)
+    key = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "mood_map_version": audion_core.MOOD_MAP_VERSION}
+    if with_hash:
+        key["sha256"] = file_sha256(path)
+    return key
+# ----------------------- Column (de)serialization -----------------------
+def _save_strings(base, values):
+    values = ["" if v is None else str(v) for v in values]
+    if any(STRING_SEP in v for v in values):
+        raise ValueError("string column contains a NUL character")
+    np.save(base + ".npy", np.frombuffer(STRING_SEP.join(values).encode("utf-8"), dtype=np.uint8))
+def _load_strings(base, n, mmap_mode=None):
+    if n == 0:
+        return []
+    blob = np.load(base + ".npy", mmap_mode=mmap_mode)
+    return bytes(blob).decode("utf-8").split(STRING_SEP)
+def _is_string_column(col):
+    return pd.api.types.is_string_dtype(col.dtype) or pd.api.types.is_object_dtype(col.dtype)
+def _save_column(base, col):
+    """Write one column and return its meta entry."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        np.save(base + ".npy", col.cat.codes.to_numpy())
+        _save_strings(base + ".categories", col.cat.categories)
+        return {"kind": "cat", "n_categories": len(col.cat.categories), "ordered": bool(col.cat.ordered)}
+    if pd.api.types.is_bool_dtype(col.dtype) or pd.api.types.is_numeric_dtype(col.dtype):
+        np.save(base + ".npy", col.to_numpy())
+        return {"kind": "num"}
+    if _is_string_column(col):
+        # Mixed object columns (e.g. ints next to "" after fillna) are kept as text
+        _save_strings(base, col.tolist())
+        return {"kind": "str"}
+    raise ValueError(f"cannot cache column of dtype {col.dtype}")
+def _load_column(base, entry, n, mmap_mode=None):
+    kind = entry["kind"]
+    if kind == "cat":
+        codes = np.load(base + ".npy", mmap_mode=mmap_mode)
+        categories = _load_strings(base + ".categories", entry["n_categories"])
+        return pd.Categorical.from_codes(codes, categories=categories, ordered=entry["ordered"])
+    if kind == "num":
+        return np.load(base + ".npy", mmap_mode=mmap_mode)
+    return pd.Series(_load_strings(base, n)).array
+# ----------------------- Save / load -----------------------
+def save_cache(df_local, cache_path, key):
+    """Write the enriched frame; meta.json is written last and marks the cache complete."""
+    os.makedirs(cache_path, exist_ok=True)
+    meta_file = os.path.join(cache_path, "meta.json")
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+    columns = []
+    for i, name in enumerate(df_local.columns):
+        entry = _save_column(os.path.join(cache_path, f"col_{i}"), df_local[name])
+        entry["name"] = name
+        columns.append(entry)
+    idx = df_local.index
+    if isinstance(idx, pd.RangeIndex):
+        index_entry = {"kind": "range", "start": idx.start, "stop": idx.stop, "step": idx.step}
+    else:
+        index_entry = _save_column(os.path.join(cache_path, "index"), idx.to_series())
+    index_entry["name"] = idx.name
+    meta = {"format": CACHE_FORMAT, "key": key, "rows": len(df_local), "columns": columns, "index": index_entry}
+    tmp = meta_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_file)
+def read_meta(cache_path):
+    try:
+        with open(os.path.join(cache_path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format") == CACHE_FORMAT else None
+def load_cache(cache_path, meta=None, mmap_mode=None):
+    if meta is None:
+        meta = read_meta(cache_path)
+        if meta is None:
+            raise FileNotFoundError(f"no catalog cache in {cache_path}")
+    n = meta["rows"]
+    data = {}
+    for i, entry in enumerate(meta["columns"]):
+        data[entry["name"]] = _load_column(os.path.join(cache_path, f"col_{i}"), entry, n, mmap_mode)
+    index_entry = meta["index"]
+    if index_entry["kind"] == "range":
+        index = pd.RangeIndex(index_entry["start"], index_entry["stop"], index_entry["step"], name=index_entry["name"])
+    else:
+        index = pd.Index(_load_column(os.path.join(cache_path, "index"), index_entry, n, mmap_mode), name=index_entry["name"])
+    return pd.DataFrame(data, index=index, copy=False)
+def is_fresh(meta, path):
+    """Check a cache against the source: size+mtime first, content hash only if mtime moved."""
+    if meta is None:
+        return False
+    cached = meta["key"]
+    current = source_key(path, with_hash=False)
+    if cached["size"] != current["size"] or cached["mood_map_version"] != current["mood_map_version"]:
+        return False
+    if cached["mtime_ns"] == current["mtime_ns"]:
+        return True
+    return cached["sha256"] == file_sha256(path)
+def load_catalog_cached(path=audion_core.CATALOG_PATH, cache_dir=CACHE_DIR, rebuild=False, on_chunk=None):
+    """Return the enriched catalog, from the cache when it is still fresh."""
+    if not isinstance(path, (str, os.PathLike)) or not os.path.exists(path):
+        # Several sources (or the built-in sample) are loaded without the cache
+        return audion_core.load_catalog(path, on_chunk)
+    cache_path = cache_path_for(path, cache_dir)
+    meta = None if rebuild else read_meta(cache_path)
+    if is_fresh(meta, path):
+        try:
+            df_local = load_cache(cache_path, meta)
+            if meta["key"]["mtime_ns"] != os.stat(path).st_mtime_ns:
+                # Touched but unchanged: remember the new mtime so the next launch skips hashing
+                meta["key"]["mtime_ns"] = os.stat(path).st_mtime_ns
+                with open(os.path.join(cache_path, "meta.json"), "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+            return df_local
+        except (OSError, ValueError) as e:
+            print(f"Audion: ignoring unreadable cache {cache_path}: {e}", file=sys.stderr)
+    key = source_key(path)
+    df_local = audion_core.load_catalog(path, on_chunk)
+    if df_local.attrs.get("load_errors"):
+        # A partial load is not cached: the next launch retries (and reports) the failed chunks
+        return df_local
+    try:
+        save_cache(df_local, cache_path, key)
+    except (OSError, ValueError) as e:
+        print(f"Audion: could not write catalog cache: {e}", file=sys.stderr)
+    return df_local
+def clear_cache(cache_dir=CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
+if __name__ == "__main__":
+    # python audion_cache.py [catalog.xlsx] [--rebuild]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    src = args[0] if args else audion_core.CATALOG_PATH
+    df_cached = load_catalog_cached(src, rebuild="--rebuild" in sys.argv)
+    print(f"{len(df_cached)} tracks cached in {cache_path_for(src)}")
@@ -0,0 +1,443 @@
+# Audion – headless analysis core
+# Catalog loading, enrichment, playlist summary, recommendations and export.
+# Nothing here imports tkinter or matplotlib, so batch jobs and workers can
+# `import audion_core` without a display.
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import pandas as pd
+import numpy as np
+from audion_instrument import timed
+
+CATALOG_PATH = "Copy of audion.xlsx"
+# ----------------------- Mood detection maps -----------------------
+MOOD_KEYWORDS = {
+    "Happy": ["happy", "joy", "sun", "sunshine", "smile", "bright", "good", "fun", "dance", "party", "better", "alive", "smiling", "golden"],
+    "Sad": ["sad", "lonely", "cry", "tears", "heartbreak", "broken", "miss", "lost", "blue", "alone"],
+    "Energetic": ["fire", "power", "wild", "run", "loud", "fast", "hype", "energy", "rock", "boom", "beat", "crazy"],
+    "Calm": ["calm", "soft", "slow", "chill", "lofi", "peace", "relax", "quiet", "soothing", "sleep"],
+    "Romantic": ["love", "lover", "heart", "kiss", "romantic", "baby", "sweet", "darling", "mine", "forever"]
+}
+GENRE_MOOD = {
+    "lofi": "Calm", "lo-fi": "Calm", "lo fi": "Calm", "indie": "Calm",
+    "romantic": "Romantic", "pop": "Happy", "sad": "Sad", "classical": "Calm",
+    "edm": "Energetic", "dance": "Energetic", "rock": "Energetic",
+    "r&b": "Romantic", "soul": "Romantic"
+}
+FALLBACK_MOOD_MAP = {
+    "pop": "Happy", "dance": "Party", "edm": "Energetic", "rock": "Intense",
+    "indie": "Chill", "folk": "Calm", "ballad": "Romantic", "romantic": "Romantic",
+    "hip hop": "Confident", "r&b": "Smooth", "k-pop": "Energetic", "bollywood": "Romantic"
+}
+CONTRAST_MAP = {
+    "Happy": ["Sad", "Calm", "Romantic"],
+    "Sad": ["Happy", "Energetic"],
+    "Energetic": ["Calm", "Romantic"],
+    "Calm": ["Energetic", "Happy"],
+    "Romantic": ["Energetic", "Happy"],
+    "Mixed": ["Calm", "Happy"]
+}
+YEAR_RE = re.compile(r"(19|20)\d{2}")
+# Bump when the enrichment logic changes; the digest also covers edits to the maps above.
+ENRICHMENT_VERSION = 5
+MOOD_MAP_VERSION = hashlib.sha1(json.dumps(
+    [ENRICHMENT_VERSION, MOOD_KEYWORDS, GENRE_MOOD, FALLBACK_MOOD_MAP]).encode("utf-8")).hexdigest()[:12]
+# ----------------------- Data loading -----------------------
+def sample_catalog():
+    """Built-in sample so the program stays runnable when no catalog file exists."""
+    sample = [
+        {"Name": "Unstoppable", "Artist": "Sia", "Genre": "Pop", "Language": "English", "Duration": "03:02"},
+        {"Name": "Faded", "Artist": "Alan Walker", "Genre": "EDM", "Language": "English", "Duration": "03:32"},
+        {"Name": "LoFi Nights", "Artist": "Indie Cafe with a very very long name that was cutting off", "Genre": "Lofi", "Language": "Instrumental", "Duration": "02:45"},
+        {"Name": "Melancholy Ballad", "Artist": "Heartstring", "Genre": "Ballad", "Language": "English", "Duration": "04:10"},
+        {"Name": "Dancefloor Dream", "Artist": "Neon Beats", "Genre": "Dance", "Language": "English", "Duration": "03:21"},
+    ]
+    df_sample = pd.DataFrame(sample)
+    df_sample.attrs["sample_fallback"] = True
+    return df_sample
+def normalize_catalog(df_local):
+    df_local = df_local.fillna("")
+    if "index" in df_local.columns:
+        try:
+            df_local.set_index("index", inplace=True)
+        except Exception:
+            pass
+    df_local["Language"] = df_local.get("Language", "").astype(str).fillna("Unknown").str.strip()
+    df_local["Genre"] = df_local.get("Genre", "").astype(str).fillna("Unknown").str.strip()
+    df_local["Duration"] = df_local.get("Duration", "").astype(str).fillna("").str.strip()
+    return df_local
+# ----------------------- Enrichment -----------------------
+def parse_duration(duration_str):
+    """''''''Convert 'mm:ss' or 'hh:mm:ss' to minutes (float).''''''"""
+    if pd.isna(duration_str) or not str(duration_str).strip():
+        return 0.0
+    s = str(duration_str).strip()
+    parts = s.split(":")
+    try:
+        parts = [int(p) for p in parts]
+    except:
+        nums = re.findall(r"\d+", s)
+        if len(nums) >= 2:
+            parts = [int(n) for n in nums[-2:]]
+        else:
+            return 0.0
+    if len(parts) == 2:
+        minutes, seconds = parts
+        return minutes + seconds / 60.0
+    elif len(parts) == 3:
+        hours, minutes, seconds = parts
+        return hours * 60 + minutes + seconds / 60.0
+    else:
+        return 0.0
+def detect_mood(title, genre):
+    title = str(title or "").lower()
+    genre = str(genre or "").lower()
+    for g in GENRE_MOOD:
+        if g in genre:
+            return GENRE_MOOD[g]
+    for mood, words in MOOD_KEYWORDS.items():
+        for w in words:
+            if w in title:
+                return mood
+    return "Unknown"
+def infer_mood_fallback(genre):
+    genre_lower = str(genre).lower()
+    for key, mood in FALLBACK_MOOD_MAP.items():
+        if key in genre_lower:
+            return mood
+    return "Mixed"
+def detect_or_infer_mood(row):
+    mood = detect_mood(row.get("Name", ""), row.get("Genre", ""))
+    if mood == "Unknown":
+        return infer_mood_fallback(row.get("Genre", ""))
+    return mood
+# ----------------------- Batched enrichment (whole columns) -----------------------
+# These give exactly the same values as parse_duration / detect_or_infer_mood,
+# but work on the distinct values of a column instead of once per row.
+DURATION_RE = r"^\s*([0-9]+)\s*:\s*([0-9]+)\s*(?::\s*([0-9]+)\s*)?$"
+TITLE_KEYWORDS = [(mood, w) for mood, words in MOOD_KEYWORDS.items() for w in words]
+# A zero-width lookahead tries every start position, and at each position the
+# alternation picks the earliest keyword in MOOD_KEYWORDS order, so the lowest
+# priority seen over a title is the keyword detect_mood would have returned.
+# The leading first-letter class lets the scanner reject most positions cheaply.
+TITLE_KEYWORD_RE = re.compile(
+    "(?=[" + "".join(sorted({re.escape(w[0]) for _, w in TITLE_KEYWORDS})) + "])"
+    "(?=(" + "|".join(re.escape(w) for _, w in TITLE_KEYWORDS) + "))")
+TITLE_KEYWORD_PRIORITY = {}
+for _priority, (_mood, _word) in enumerate(TITLE_KEYWORDS):
+    TITLE_KEYWORD_PRIORITY.setdefault(_word, _priority)
+MOOD_CATEGORIES = sorted(set(MOOD_KEYWORDS) | set(GENRE_MOOD.values()) | set(FALLBACK_MOOD_MAP.values()) | {"Mixed"})
+def parse_duration_column(durations):
+    """Vectorized parse_duration: returns a float64 array of minutes."""
+    codes, uniques = pd.factorize(pd.Series(durations, copy=False))
+    parts = pd.Series(uniques, dtype=object).astype(str).str.extract(DURATION_RE)
+    matched = parts[0].notna().to_numpy()
+    first = pd.to_numeric(parts[0]).to_numpy(dtype=float)
+    second = pd.to_numeric(parts[1]).to_numpy(dtype=float)
+    third = pd.to_numeric(parts[2]).to_numpy(dtype=float)
+    has_hours = ~np.isnan(third)
+    minutes = np.where(has_hours, first * 60 + second + third / 60.0, first + second / 60.0)
+    # Anything outside the plain mm:ss / hh:mm:ss forms goes through the scalar parser
+    for i in np.flatnonzero(~matched):
+        minutes[i] = parse_duration(uniques[i])
+    minutes = np.append(minutes, 0.0)  # code -1 (missing) -> 0.0
+    return minutes[codes]
+def _title_moods(lowered_titles):
+    """Mood from title keywords for each lowered title, or None when nothing matches."""
+    lengths = np.fromiter((len(t) for t in lowered_titles), dtype=np.int64, count=len(lowered_titles))
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+    best = np.full(len(lowered_titles), len(TITLE_KEYWORDS), dtype=np.int64)
+    # Keywords never contain the separator, so no match can span two titles
+    blob = "\x00".join(lowered_titles)
+    positions, priorities = [], []
+    for m in TITLE_KEYWORD_RE.finditer(blob):
+        positions.append(m.start())
+        priorities.append(TITLE_KEYWORD_PRIORITY[m.group(1)])
+    if positions:
+        rows = np.searchsorted(starts, np.asarray(positions), side="right") - 1
+        np.minimum.at(best, rows, np.asarray(priorities, dtype=np.int64))
+    return [TITLE_KEYWORDS[b][0] if b < len(TITLE_KEYWORDS) else None for b in best]
+def _genre_moods(genre):
+    genre = str(genre or "").lower()
+    for g in GENRE_MOOD:
+        if g in genre:
+            return GENRE_MOOD[g], None
+    return None, infer_mood_fallback(genre)
+def detect_mood_column(names, genres):
+    """Vectorized detect_or_infer_mood: returns a categorical Mood column."""
+    genre_codes, genre_uniques = pd.factorize(pd.Series(genres, copy=False))
+    title_codes, title_uniques = pd.factorize(pd.Series(names, copy=False))
+    genre_info = [_genre_moods(g) for g in genre_uniques.tolist()] + [_genre_moods(np.nan)]
+    title_info = _title_moods([str(t or "").lower() for t in title_uniques.tolist()]) + [_title_moods(["nan"])[0]]
+    genre_mood = np.array([g for g, _ in genre_info], dtype=object)[genre_codes]
+    fallback = np.array([f for _, f in genre_info], dtype=object)[genre_codes]
+    title_mood = np.array(title_info, dtype=object)[title_codes]
+    mood = np.where(pd.isna(genre_mood), np.where(pd.isna(title_mood), fallback, title_mood), genre_mood)
+    return pd.Categorical(mood, categories=MOOD_CATEGORIES)
+# Simulate simple audio features so charts look interesting
+def simulate_audio_features(row):
+    genre = str(row["Genre"]).lower()
+    duration = row["Duration_min"]
+    energy = 0.7 if ("edm" in genre or "dance" in genre) else 0.5
+    danceability = 0.8 if ("pop" in genre or "dance" in genre) else 0.4
+    valence = 0.6 if ("happy" in str(row["Mood"]).lower() or "party" in str(row["Mood"]).lower()) else 0.4
+    tempo = max(60, int(np.random.normal(128 if energy > 0.6 else 100, 15)))
+    return pd.Series({"energy": energy, "danceability": danceability, "valence": valence, "tempo": tempo})
+FEATURE_COLUMNS = ["energy", "danceability", "valence", "tempo"]
+FEATURE_SEED = 1729
+FEATURE_BLOCK = 1 << 16
+def _tempo_noise(n, seed=FEATURE_SEED, start=0):
+    """Standard normals for catalog rows [start, start + n), or for the row positions in start if it is an array.
+
+    Draws come in fixed-size blocks, each from its own seeded generator, so a
+    row gets the same value no matter how the catalog was split into chunks.
+    """
+    if not np.isscalar(start):
+        rows = np.asarray(start, dtype=np.int64)
+        blocks = rows // FEATURE_BLOCK
+        out = np.empty(len(rows))
+        for block in np.unique(blocks).tolist():
+            mask = blocks == block
+            out[mask] = np.random.default_rng([seed, block]).standard_normal(FEATURE_BLOCK)[rows[mask] - block * FEATURE_BLOCK]
+        return out
+    out = np.empty(n)
+    pos = 0
+    for block in range(start // FEATURE_BLOCK, (start + n - 1) // FEATURE_BLOCK + 1 if n else 0):
+        rng = np.random.default_rng([seed, block])
+        draws = rng.standard_normal(FEATURE_BLOCK)
+        lo = max(start, block * FEATURE_BLOCK) - block * FEATURE_BLOCK
+        hi = min(start + n, (block + 1) * FEATURE_BLOCK) - block * FEATURE_BLOCK
+        out[pos:pos + hi - lo] = draws[lo:hi]
+        pos += hi - lo
+    return out
+def simulate_feature_columns(genres, moods, seed=FEATURE_SEED, start=0):
+    """Array version of simulate_audio_features: energy, danceability, valence (float32) and tempo (int16)."""
+    genre_codes, genre_uniques = pd.factorize(pd.Series(genres, copy=False))
+    lowered = [str(g).lower() for g in genre_uniques.tolist()] + ["nan"]
+    is_edm_dance = np.array([("edm" in g or "dance" in g) for g in lowered])[genre_codes]
+    is_pop_dance = np.array([("pop" in g or "dance" in g) for g in lowered])[genre_codes]
+    mood_codes, mood_uniques = pd.factorize(pd.Series(moods, copy=False))
+    upbeat = np.array([("happy" in str(m).lower() or "party" in str(m).lower()) for m in mood_uniques.tolist()] + [False])[mood_codes]
+    energy = np.where(is_edm_dance, 0.7, 0.5).astype(np.float32)
+    danceability = np.where(is_pop_dance, 0.8, 0.4).astype(np.float32)
+    valence = np.where(upbeat, 0.6, 0.4).astype(np.float32)
+    tempo_mean = np.where(is_edm_dance, 128.0, 100.0)
+    tempo = np.maximum(60, np.trunc(tempo_mean + 15 * _tempo_noise(len(genre_codes), seed, start))).astype(np.int16)
+    return {"energy": energy, "danceability": danceability, "valence": valence, "tempo": tempo}
+def apply_feature_columns(df_local, seed=FEATURE_SEED, start=0):
+    """Add the simulated features; real values from the source file win where present."""
+    simulated = simulate_feature_columns(df_local["Genre"], df_local["Mood"], seed, start)
+    for col in FEATURE_COLUMNS:
+        values = simulated[col]
+        if col in df_local.columns:
+            real = pd.to_numeric(df_local[col], errors="coerce").to_numpy(dtype=float)
+            has_real = ~np.isnan(real)
+            if col == "tempo":
+                real = np.round(real)
+            values = np.where(has_real, real, values).astype(values.dtype)
+        df_local[col] = values
+    return df_local
+def enrich_catalog(df_local, seed=FEATURE_SEED, start=0):
+    """Add Duration_min, Mood and audio features.
+
+    start is the catalog position of the first row, or an array with every row's position.
+    """
+    df_local["Duration_min"] = parse_duration_column(df_local["Duration"])
+    df_local["Mood"] = detect_mood_column(df_local["Name"], df_local["Genre"])
+    return apply_feature_columns(df_local, seed, start)
+# ----------------------- Compact layout -----------------------
+# Artist codes double as interned artist ids; Name is the only per-row string column left.
+CATEGORY_COLUMNS = ("Artist", "Genre", "Language", "Duration", "Mood")
+def compact_catalog(df_local):
+    """Store low-cardinality text columns as categoricals and Duration_min as float32."""
+    for col in CATEGORY_COLUMNS:
+        if col in df_local.columns and not isinstance(df_local[col].dtype, pd.CategoricalDtype):
+            df_local[col] = df_local[col].astype("category")
+    if "Duration_min" in df_local.columns:
+        df_local["Duration_min"] = df_local["Duration_min"].astype(np.float32)
+    return df_local
+def column_codes(col):
+    """Integer codes and the value of each code; categoricals hand back their stored codes without copying."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), [str(c) for c in col.cat.categories]
+    codes, uniques = pd.factorize(col)
+    return codes.astype(np.int32), [str(u) for u in uniques]
+def empty_catalog():
+    """A zero-row catalog with the enriched columns, for UIs that open before the real one loads."""
+    import audion_dedup
+    columns = ["Name", "Artist", "Genre", "Language", "Duration"]
+    return audion_dedup.add_track_ids(compact_catalog(enrich_catalog(normalize_catalog(pd.DataFrame(columns=columns)))))
+@timed()
+def load_catalog(path=CATALOG_PATH, on_chunk=None):
+    """Read, normalize, enrich and compact one catalog file (xlsx/CSV/Parquet) or a list of them, and add Track_id.
+
+    Sources are streamed in chunks by audion_ingest (on_chunk is passed on).
+    Chunks that fail are left out and listed in attrs["load_errors"]; if
+    nothing loads, CatalogLoadError is raised. Only a missing default catalog
+    falls back to the built-in sample.
+    """
+    import audion_ingest
+    import audion_dedup
+    if isinstance(path, (str, os.PathLike)) and os.fspath(path) == CATALOG_PATH and not os.path.exists(path):
+        print(f"Audion: {path} not found, using the built-in sample catalog", file=sys.stderr)
+        df_local = audion_dedup.add_track_ids(compact_catalog(enrich_catalog(normalize_catalog(sample_catalog()))))
+        df_local.attrs["sample_fallback"] = True
+        return df_local
+    df_local, errors = audion_ingest.ingest(path, on_chunk=on_chunk)
+    df_local.attrs["load_errors"] = [audion_ingest.format_chunk_error(e) for e in errors]
+    return df_local
+_catalog = None
+def get_catalog(path=CATALOG_PATH, reload=False, use_cache=True, rebuild_cache=False, on_chunk=None):
+    """Return the enriched catalog, loading it on first use.
+
+    With use_cache the enriched frame is read from (and written to) the
+    on-disk column cache in audion_cache; rebuild_cache forces a fresh build.
+    """
+    global _catalog
+    if _catalog is None or reload or rebuild_cache:
+        if use_cache:
+            import audion_cache
+            _catalog = audion_cache.load_catalog_cached(path, rebuild=rebuild_cache, on_chunk=on_chunk)
+        else:
+            _catalog = load_catalog(path, on_chunk)
+    return _catalog
+# ----------------------- Row-id helpers -----------------------
+TRACK_ID = "Track_id"   # canonical track label shared by duplicate rows (see audion_dedup)
+def distinct_tracks(frame):
+    """One row per canonical track (the first in frame order); frames without Track_id are returned as is."""
+    if TRACK_ID not in frame.columns:
+        return frame
+    return frame[~frame[TRACK_ID].duplicated()]
+def intersect_sorted(a, b):
+    """Intersection of two sorted, duplicate-free row-position arrays."""
+    small, large = (a, b) if len(a) <= len(b) else (b, a)
+    if not len(large):
+        return large
+    pos = np.searchsorted(large, small)
+    pos[pos == len(large)] = 0
+    return small[large[pos] == small]
+# ----------------------- Playlist summary -----------------------
+def format_minutes(mins_float):
+    if mins_float is None or (isinstance(mins_float, (float, np.floating)) and np.isnan(mins_float)):
+        return "0:00"
+    total_seconds = int(round(mins_float * 60))
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours > 0:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    else:
+        return f"{minutes}:{seconds:02d}"
+def format_minutes_column(mins):
+    """Vectorized format_minutes: an object array of display strings."""
+    codes, uniques = pd.factorize(pd.Series(mins, copy=False))
+    labels = [format_minutes(float(m)) for m in uniques] + ["0:00"]
+    return np.array(labels, dtype=object)[codes]
+class JoinedColumn:
+    """"Name | Artist" cells formatted when asked for, instead of one stored string per catalog row."""
+    def __init__(self, left, right, sep=" | "):
+        self.left = left
+        self.right = right
+        self.sep = sep
+    def __len__(self):
+        return len(self.left)
+    def __getitem__(self, pos):
+        return f"{self.left[pos]}{self.sep}{self.right[pos]}"
+def table_display_columns(catalog):
+    """Cell values for the song table, indexable by catalog row position, keyed by table column."""
+    artists = catalog["Artist"].array if "Artist" in catalog.columns else np.full(len(catalog), "", dtype=object)
+    return {
+        "Artist": JoinedColumn(catalog["Name"].array, artists),
+        "Genre": catalog["Genre"].to_numpy(dtype=object),
+        "Duration": format_minutes_column(catalog["Duration_min"]),
+    }
+@timed()
+def playlist_df(catalog, indices):
+    if not len(indices):
+        return pd.DataFrame(columns=catalog.columns)
+    # Some indices might not exist in the catalog if it was reloaded; filter
+    indices = [i for i in indices if i in catalog.index]
+    pl_df = catalog.loc[indices].copy()
+    pl_df.reset_index(drop=True, inplace=True)
+    # Playlist frames are small: decode categoricals so value_counts() ties keep playlist order
+    for col in pl_df.columns:
+        if isinstance(pl_df[col].dtype, pd.CategoricalDtype):
+            pl_df[col] = pl_df[col].astype(str)
+    return pl_df
+@timed()
+def compute_playlist_summary(pl_df):
+    if pl_df.empty:
+        return {"total_min": 0.0, "avg_min": 0.0, "top_artist": "N/A", "top_genre": "N/A", "top_language": "N/A"}
+    total_min = pl_df["Duration_min"].sum()
+    avg_min = pl_df["Duration_min"].mean()
+    # Two versions of one song count once towards the top artist / genre / language
+    tracks = distinct_tracks(pl_df)
+    top_artist = tracks["Artist"].value_counts().idxmax() if "Artist" in tracks.columns and not tracks["Artist"].isna().all() else "Unknown"
+    top_genre = tracks["Genre"].value_counts().idxmax() if "Genre" in tracks.columns and not tracks["Genre"].isna().all() else "Unknown"
+    top_language = tracks["Language"].value_counts().idxmax() if "Language" in tracks.columns and not tracks["Language"].isna().all() else "Unknown"
+    return {"total_min": total_min, "avg_min": avg_min, "top_artist": top_artist, "top_genre": top_genre, "top_language": top_language}
+def generate_text_insight(pl_df, summary):
+    if pl_df.empty:
+        return "No songs selected. Add some tracks to see a playlist summary and insights."
+    lines = []
+    lines.append(f"Total duration: {format_minutes(summary['total_min'])} • Avg length: {format_minutes(summary['avg_min'])}")
+    lines.append(f"Top artist: {summary['top_artist']} • Top genre: {summary['top_genre']} • Top language: {summary.get('top_language', 'N/A')}")
+    dominant_mood = distinct_tracks(pl_df)["Mood"].value_counts().idxmax() if "Mood" in pl_df.columns and not pl_df["Mood"].isna().all() else None
+    if dominant_mood:
+        lines.append(f"Dominant mood: {dominant_mood}. Try adding a contrasting track to vary the vibe.")
+    else:
+        lines.append("Mood info unavailable.")
+    return "\n".join(lines)
+# ----------------------- Recommendations -----------------------
+_recommender = None
+def get_recommender(catalog=None):
+    """The audion_recommend.Recommender for catalog (default: get_catalog()), built once per catalog."""
+    global _recommender
+    if catalog is None:
+        catalog = get_catalog()
+    if _recommender is None or _recommender.catalog is not catalog:
+        import audion_recommend
+        _recommender = audion_recommend.Recommender(catalog)
+    return _recommender
+def generate_mood_recommendations(playlist_labels, n=8, catalog=None, exclude=(), recommender=None):
+    """Up to n catalog rows closest to the playlist's contrast vector (opposite features, contrasting moods).
+
+    The playlist's songs are left out in every version and each song is offered once;
+    callers holding a Recommender pass it to skip the lookup.
+    """
+    if recommender is None:
+        recommender = get_recommender(catalog)
+    return recommender.recommend(list(playlist_labels), n=n, mode="contrast", exclude=exclude)
+# ----------------------- Export -----------------------
+def playlist_summary_header(pl_df, summary=None):
+    """The summary lines above the track list; with summary given, pl_df only has to have the playlist's length."""
+    if summary is None:
+        summary = compute_playlist_summary(pl_df)
+    text = []
+    text.append(f"Playlist Summary - {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    text.append(f"Tracks: {len(pl_df)}")
+    text.append(f"Total duration: {format_minutes(summary['total_min'])}")
+    text.append(f"Average track length: {format_minutes(summary['avg_min'])}")
+    text.append(f"Top artist: {summary['top_artist']}")
+    text.append(f"Top genre: {summary['top_genre']}")
+    text.append("")
+    text.append("Track list:")
+    return text
+def track_list_lines(rows, start=1):
+    """Numbered "Name | Artist (m:ss)" lines for a frame of tracks, built column-wise."""
+    blank = [""] * len(rows)
+    names = rows["Name"].tolist() if "Name" in rows.columns else blank
+    artists = rows["Artist"].tolist() if "Artist" in rows.columns else blank
+    lengths = format_minutes_column(rows["Duration_min"]) if "Duration_min" in rows.columns else ["0:00"] * len(rows)
+    return [f"{i}. {n} | {a} ({d})" for i, n, a, d in zip(range(start, start + len(rows)), names, artists, lengths)]
+def playlist_summary_text(pl_df, summary=None):
+    return "\n".join(playlist_summary_header(pl_df, summary) + track_list_lines(pl_df))
+def write_playlist_csv(pl_df, fname="audion_playlist.csv"):
+    pl_df.to_csv(fname, index=False)
+    return fname
+def write_playlist_summary_txt(pl_df, fname="audion_playlist_summary.txt"):
+    with open(fname, "w", encoding="utf-8") as f:
+        f.write(playlist_summary_text(pl_df))
+    return fname
@@ -0,0 +1,149 @@
+# Audion – Wrapped dashboard pipeline
+# Chart aggregates for a playlist are computed once, then each chart is
+# rendered with the Agg backend to PNG bytes on a worker thread. Finished
+# images are cached by a signature of the playlist contents, so reopening
+# the dashboard for an unchanged playlist draws nothing. No tkinter here:
+# the same renderer serves the GUI and headless report generation.
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from audion_instrument import timed
+from audion_core import TRACK_ID, compute_playlist_summary, generate_text_insight, distinct_tracks
+
+CHART_BG = "#0F172A"
+CHART_FG = "#E5E7EB"
+CHART_DPI = 100
+matplotlib.rcParams.update({
+    'text.color': CHART_FG,
+    'axes.labelcolor': CHART_FG,
+    'axes.titlecolor': CHART_FG,
+    'xtick.color': CHART_FG,
+    'ytick.color': CHART_FG,
+    'figure.facecolor': CHART_BG,
+    'axes.facecolor': CHART_BG,
+    'axes.edgecolor': '#334155'
+})
+# ----------------------- Aggregates -----------------------
+def _counts(pl_df, column):
+    if column not in pl_df.columns:
+        return {}
+    counts = pl_df[column].value_counts()
+    counts = counts[counts > 0]  # categorical columns also list unused categories
+    return dict(zip(counts.index.astype(str), counts.to_numpy().tolist()))
+def _head(counts, n):
+    return dict(list(counts.items())[:n])
+@timed()
+def dashboard_aggregates(pl_df):
+    """Everything the Wrapped view shows, computed with one value_counts per column."""
+    # Charts count songs, so duplicate versions of one track (same Track_id) count once
+    tracks = distinct_tracks(pl_df)
+    counts = {col: _counts(tracks, col) for col in ("Genre", "Artist", "Language", "Mood")}
+    summary = compute_playlist_summary(pl_df)
+    return {
+        "tracks": len(pl_df),
+        "total_min": float(pl_df["Duration_min"].sum()) if len(pl_df) else 0.0,
+        "primary_mood": next(iter(counts["Mood"]), "Mixed"),
+        "summary": summary,
+        "insight": generate_text_insight(pl_df, summary),
+        "charts": {
+            "genres": {"kind": "donut", "title": "Genres", "data": _head(counts["Genre"], 6)},
+            # top 8 artists to make space for names
+            "artists": {"kind": "barh", "title": "Top Artists", "data": _head(counts["Artist"], 8)},
+            "languages": {"kind": "pie", "title": "Languages", "data": _head(counts["Language"], 5)},
+            "moods": {"kind": "donut", "title": "Mood Distribution", "data": _head(counts["Mood"], 6)},
+            "lengths": {"kind": "hist", "title": "Song Lengths (min)", "data": pl_df["Duration_min"].dropna().to_numpy(dtype=float)},
+        },
+    }
+# Track_id is in because the charts count each song once: regrouping duplicates changes them
+SIGNATURE_COLUMNS = ("Genre", "Artist", "Language", "Mood", "Duration_min", TRACK_ID)
+def playlist_signature(pl_df):
+    """Content signature of a playlist: changes whenever a charted value of its tracks changes."""
+    cols = [c for c in SIGNATURE_COLUMNS if c in pl_df.columns]
+    hashed = pd.util.hash_pandas_object(pl_df[cols].astype(str), index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+# ----------------------- Chart rendering -----------------------
+def _draw_donut(fig, ax, data):
+    # Slightly nudge the pie right so labels (if long) don't overlap
+    if data:
+        ax.pie(list(data.values()), labels=list(data.keys()), autopct='%1.1f%%', startangle=90, wedgeprops=dict(width=0.4))
+        fig.subplots_adjust(left=0.18, right=0.98)
+def _draw_barh(fig, ax, data):
+    # wide figure with a large left margin so y-labels (artists) are fully visible
+    if data:
+        y_pos = np.arange(len(data))
+        ax.barh(y_pos, list(data.values()))
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels(list(data.keys()), fontsize=8)
+        ax.invert_yaxis()
+        fig.subplots_adjust(left=0.38, right=0.98, top=0.9, bottom=0.12)
+    else:
+        fig.subplots_adjust(left=0.12, right=0.98)
+def _draw_pie(fig, ax, data):
+    if data:
+        ax.pie(list(data.values()), labels=list(data.keys()), autopct='%1.1f%%')
+        fig.subplots_adjust(left=0.18, right=0.98)
+def _draw_hist(fig, ax, data):
+    ax.hist(data, bins=15)
+    # nudge histogram right a little so axis labels are not clipped
+    fig.subplots_adjust(left=0.12, right=0.98)
+CHART_KINDS = {
+    "donut": (_draw_donut, (4.2, 3.2)),
+    "barh": (_draw_barh, (6.5, 2.6)),
+    "pie": (_draw_pie, (4.2, 3.2)),
+    "hist": (_draw_hist, (8.6, 3.2)),
+}
+@timed()
+def render_chart_png(chart, dpi=CHART_DPI):
+    """Render one chart spec from dashboard_aggregates() to PNG bytes (thread-safe: no pyplot)."""
+    draw, figsize = CHART_KINDS[chart["kind"]]
+    fig = Figure(figsize=figsize, facecolor=CHART_BG)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    draw(fig, ax, chart["data"])
+    ax.set_title(chart["title"], fontsize=10, **({"pad": 12} if chart["kind"] == "donut" else {}))
+    fig.patch.set_facecolor(CHART_BG)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, facecolor=CHART_BG)
+    return buf.getvalue()
+class DashboardRenderer:
+    """Renders charts on a background thread and caches the PNGs per playlist signature."""
+    def __init__(self, max_playlists=8, workers=1):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audion-dashboard")
+        self.cache = OrderedDict()   # signature -> {chart key: png bytes}
+        self.max_playlists = max_playlists
+        self.lock = threading.Lock()
+    def _store(self, signature, key, png):
+        with self.lock:
+            self.cache.setdefault(signature, {})[key] = png
+            self.cache.move_to_end(signature)
+            while len(self.cache) > self.max_playlists:
+                self.cache.popitem(last=False)
+    def _render(self, signature, key, chart):
+        png = render_chart_png(chart)
+        self._store(signature, key, png)
+        return png
+    def submit(self, signature, charts):
+        """Return {chart key: Future of PNG bytes}; cached charts come back as finished futures."""
+        with self.lock:
+            cached = dict(self.cache.get(signature, {}))
+            if signature in self.cache:
+                self.cache.move_to_end(signature)
+        futures = {}
+        for key, chart in charts.items():
+            if key in cached:
+                done = Future()
+                done.set_result(cached[key])
+                futures[key] = done
+            else:
+                futures[key] = self.executor.submit(self._render, signature, key, chart)
+        return futures
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,90 @@
+# Audion – duplicate track detection
+# Merged catalogs list the same song several times ("Faded", "Faded (Remix)",
+# "faded ", "Faded - Radio Edit"). Titles and artists are normalized once per
+# distinct string, rows are blocked by (normalized title, primary artist),
+# and within a block rows whose Duration_min values chain within a tolerance
+# are one track. Everything is a sort over integer keys, never a pairwise
+# comparison. Each row gets Track_id: the catalog label of the first row of
+# its group, so unique tracks keep their own label.
+import re
+import sys
+import itertools
+import numpy as np
+import pandas as pd
+from audion_core import TRACK_ID, column_codes
+
+DURATION_TOLERANCE_MIN = 1.0   # neighbouring versions further apart than this are different recordings
+BRACKETED_RE = re.compile(r"[\(\[\{][^\)\]\}]*[\)\]\}]")
+VERSION_SUFFIX_RE = re.compile(r"\s+-\s+[^-]*\b(?:remix|mix|edit|version|remaster(?:ed)?|live|radio|mono|stereo|extended)\b.*$")
+FEATURING_RE = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s.*$")
+ARTIST_SPLIT_RE = re.compile(r"\s*(?:,|;|/|&|\s+x\s+|\s+feat\.?\s|\s+ft\.?\s|\s+featuring\s).*$")
+PUNCTUATION_RE = re.compile(r"[^\w\s]")
+# Millions of titles go through these, so each pattern only runs when a cheap substring test says it can match
+def _squash(text):
+    """Drop punctuation and collapse whitespace."""
+    if not text.replace(" ", "").isalnum():
+        text = PUNCTUATION_RE.sub(" ", text)
+    return " ".join(text.split())
+def normalize_title(title):
+    """Lower-cased title without bracketed qualifiers, version suffixes, featured artists or punctuation."""
+    raw = str(title).lower()
+    text = raw
+    if "(" in text or "[" in text or "{" in text:
+        text = BRACKETED_RE.sub(" ", text)
+    if " -" in text:
+        text = VERSION_SUFFIX_RE.sub("", text)
+    if "f" in text:
+        text = FEATURING_RE.sub("", text)
+    # A title that is all qualifier ("(Intro)") keeps its text
+    return _squash(text) or _squash(raw)
+def normalize_artist(artist):
+    """Lower-cased primary artist: the part before any featured or co-credited artists."""
+    return _squash(ARTIST_SPLIT_RE.sub("", str(artist).lower().strip()))
+def normalize_titles(values):
+    return np.array([normalize_title(v) for v in values], dtype=object)
+def normalize_artists(values):
+    return np.array([normalize_artist(v) for v in values], dtype=object)
+def _normalized_codes(col, normalize):
+    """Per-row codes of the normalized values; each distinct raw string is normalized once."""
+    codes, uniques = column_codes(col)
+    normalized, _ = pd.factorize(normalize(uniques))
+    normalized = np.append(normalized, normalized.max(initial=-1) + 1)  # code -1 (missing) gets a block of its own
+    return normalized[codes].astype(np.int64), int(normalized.max()) + 1
+def canonical_positions(catalog, tolerance_min=DURATION_TOLERANCE_MIN):
+    """For every row, the position of the first row of its duplicate group."""
+    n = len(catalog)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    names, _ = _normalized_codes(catalog["Name"].astype(str), normalize_titles)
+    if "Artist" in catalog.columns:
+        artists, n_artists = _normalized_codes(catalog["Artist"], normalize_artists)
+    else:
+        artists, n_artists = np.zeros(n, dtype=np.int64), 1
+    block = names * n_artists + artists
+    durations = catalog["Duration_min"].to_numpy(dtype=np.float64) if "Duration_min" in catalog.columns else np.zeros(n)
+    # Sort by block, then duration; unknown durations sort last and join the block's last group
+    order = np.lexsort((durations, block))
+    sorted_block, sorted_dur = block[order], durations[order]
+    starts = np.r_[True, (sorted_block[1:] != sorted_block[:-1]) | (np.diff(sorted_dur) > tolerance_min)]
+    first = np.flatnonzero(starts)
+    canonical = np.empty(n, dtype=np.int64)
+    canonical[order] = np.repeat(np.minimum.reduceat(order, first), np.diff(np.r_[first, n]))
+    return canonical
+def add_track_ids(catalog, tolerance_min=DURATION_TOLERANCE_MIN):
+    """Set the Track_id column (canonical label per row) and return the catalog."""
+    canonical = canonical_positions(catalog, tolerance_min)
+    catalog[TRACK_ID] = np.asarray(catalog.index)[canonical]
+    catalog.attrs["duplicate_rows"] = int((canonical != np.arange(len(catalog))).sum())
+    return catalog
+def duplicate_groups(catalog):
+    """Rows that share a Track_id with another row, sorted by group, as a frame."""
+    ids = catalog[TRACK_ID]
+    return catalog[ids.duplicated(keep=False)].sort_values(TRACK_ID, kind="stable")
+if __name__ == "__main__":
+    # python audion_dedup.py [catalog ...]: how many rows collapse, and the first groups
+    import audion_core
+    catalog = audion_core.load_catalog(sys.argv[1:] or audion_core.CATALOG_PATH)
+    groups = duplicate_groups(catalog)
+    print(f"{len(catalog)} rows, {catalog[TRACK_ID].nunique()} distinct tracks, {catalog.attrs['duplicate_rows']} duplicate rows")
+    for track, rows in itertools.islice(groups.groupby(TRACK_ID, sort=False), 20):
+        print(f"{track}: " + " · ".join(f"{r.Name} | {getattr(r, 'Artist', '')} ({r.Duration_min:.2f})" for r in rows.itertuples()))
@@ -0,0 +1,180 @@
+# Audion – streaming playlist export
+# Playlists are written straight from catalog row positions: CHUNK_ROWS rows
+# are sliced out of the catalog at a time, written, and dropped, so exporting
+# a huge playlist never builds a copy of it. Writers exist for CSV/TSV,
+# Parquet (through pyarrow when it is installed), JSON Lines, M3U and the text
+# summary. Every file is written to a temporary name in the target directory
+# and renamed over the target only once complete, so a failed or interrupted
+# export never replaces a good file.
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+import audion_core
+import audion_playlist
+
+CHUNK_ROWS = 50000
+LABEL_COLUMN = "index"   # catalog ids go out under the column name audion_batch reads back
+LOCATION_COLUMNS = ("Path", "File", "Location", "URL")   # used for M3U entries when the catalog has one
+def playlist_positions(catalog, labels):
+    """Catalog row positions of labels, in playlist order.
+
+    Playlists are ordered sets, as in the queue and the store: repeats after the
+    first and labels not in the catalog are dropped.
+    """
+    positions = catalog.index.get_indexer(pd.Index(list(dict.fromkeys(labels))))
+    return positions[positions >= 0]
+def iter_rows(catalog, positions, columns=None, chunk_rows=CHUNK_ROWS):
+    """Chunks of the given rows with the label as the first column and categoricals decoded.
+
+    An empty playlist still yields one empty chunk, so writers can emit a header or schema.
+    """
+    columns = list(catalog.columns) if columns is None else [c for c in columns if c in catalog.columns]
+    for start in range(0, max(len(positions), 1), chunk_rows):
+        chunk = catalog.iloc[positions[start:start + chunk_rows]][columns]
+        out = {LABEL_COLUMN: np.asarray(chunk.index)}
+        for col in columns:
+            values = chunk[col]
+            out[col] = values.to_numpy(dtype=object) if isinstance(values.dtype, pd.CategoricalDtype) else values.to_numpy()
+        yield pd.DataFrame(out, copy=False)
+# ----------------------- Writers -----------------------
+# Each writer takes (open temp path, catalog, positions, columns, chunk_rows, on_rows) and calls on_rows(n) per chunk.
+def write_csv(path, catalog, positions, columns, chunk_rows, on_rows, sep=","):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        header = True
+        for chunk in iter_rows(catalog, positions, columns, chunk_rows):
+            chunk.to_csv(f, sep=sep, index=False, header=header)
+            header = False
+            on_rows(len(chunk))
+def write_tsv(path, catalog, positions, columns, chunk_rows, on_rows):
+    write_csv(path, catalog, positions, columns, chunk_rows, on_rows, sep="\t")
+def write_jsonl(path, catalog, positions, columns, chunk_rows, on_rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in iter_rows(catalog, positions, columns, chunk_rows):
+            if len(chunk):
+                # Seven decimals: float32 columns (Duration_min, features) would otherwise print float noise
+                chunk.to_json(f, orient="records", lines=True, force_ascii=False, double_precision=7)
+            on_rows(len(chunk))
+def write_parquet(path, catalog, positions, columns, chunk_rows, on_rows):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("writing Parquet needs pyarrow (pip install pyarrow)") from None
+    writer = None
+    try:
+        for chunk in iter_rows(catalog, positions, columns, chunk_rows):
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            on_rows(len(chunk))
+    finally:
+        if writer is not None:
+            writer.close()
+def write_m3u(path, catalog, positions, columns, chunk_rows, on_rows):
+    """Extended M3U: #EXTINF with length and "Artist - Name", then the track's location.
+
+    The location comes from a Path / File / Location / URL column; catalogs
+    without one get "Artist - Name" as the entry, for players that search by title.
+    """
+    location = next((c for c in LOCATION_COLUMNS if c in catalog.columns), None)
+    wanted = ["Name", "Artist", "Duration_min"] + ([location] if location else [])
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("#EXTM3U\n")
+        for chunk in iter_rows(catalog, positions, wanted, chunk_rows):
+            names = chunk["Name"].astype(str).tolist()
+            artists = chunk["Artist"].astype(str).tolist() if "Artist" in chunk.columns else [""] * len(chunk)
+            minutes = chunk["Duration_min"].to_numpy(dtype=np.float64) if "Duration_min" in chunk.columns else np.full(len(chunk), np.nan)
+            seconds = np.where(np.isnan(minutes), -1, np.round(np.nan_to_num(minutes) * 60)).astype(np.int64).tolist()
+            titles = [f"{a} - {n}" if a else n for n, a in zip(names, artists)]
+            targets = chunk[location].astype(str).tolist() if location else titles
+            f.write("".join(f"#EXTINF:{s},{t}\n{u}\n" for s, t, u in zip(seconds, titles, targets)))
+            on_rows(len(chunk))
+def write_summary(path, catalog, positions, columns, chunk_rows, on_rows):
+    """The text summary: header from the playlist's column codes, then the track list chunk by chunk."""
+    stats = audion_playlist.PlaylistStats(catalog, columns=("Artist", "Genre", "Language"))
+    stats.replace(catalog.index[positions])
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(audion_core.playlist_summary_header(positions, stats.summary())))
+        start = 1
+        for chunk in iter_rows(catalog, positions, ["Name", "Artist", "Duration_min"], chunk_rows):
+            if len(chunk):
+                f.write("\n" + "\n".join(audion_core.track_list_lines(chunk, start)))
+            start += len(chunk)
+            on_rows(len(chunk))
+WRITERS = {
+    ".csv": write_csv,
+    ".tsv": write_tsv,
+    ".parquet": write_parquet,
+    ".pq": write_parquet,
+    ".jsonl": write_jsonl,
+    ".ndjson": write_jsonl,
+    ".m3u": write_m3u,
+    ".m3u8": write_m3u,
+    ".txt": write_summary,
+}
+def writer_for(path):
+    ext = os.path.splitext(os.fspath(path))[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"unsupported export file type '{ext}' (expected one of {', '.join(sorted(WRITERS))})")
+    return WRITERS[ext]
+# ----------------------- Export -----------------------
+def export_playlist(catalog, labels, path, columns=None, chunk_rows=CHUNK_ROWS, on_rows=None):
+    """Write one playlist to path (format from the extension); returns the number of rows written."""
+    path = os.fspath(path)
+    writer = writer_for(path)
+    positions = playlist_positions(catalog, labels)
+    # Same directory as the target, so the final rename never crosses filesystems
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        writer(tmp, catalog, positions, columns, chunk_rows, on_rows or (lambda n: None))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return len(positions)
+def export_playlists(catalog, exports, columns=None, chunk_rows=CHUNK_ROWS, on_progress=None):
+    """Write several playlists: exports maps output path -> labels in play order.
+
+    on_progress(rows written, rows in total) is called after every chunk.
+    A playlist that fails is reported and the others are still written.
+    Returns ({path: rows written}, [(path, error message)]).
+    """
+    totals = {path: len(playlist_positions(catalog, labels)) for path, labels in exports.items()}
+    total, done = sum(totals.values()), 0
+    def on_rows(n):
+        nonlocal done
+        done += n
+        if on_progress is not None:
+            on_progress(done, total)
+    written, errors = {}, []
+    for path, labels in exports.items():
+        before = done
+        try:
+            written[path] = export_playlist(catalog, labels, path, columns, chunk_rows, on_rows)
+        except Exception as e:
+            errors.append((path, f"{type(e).__name__}: {e}"))
+            # Count the failed playlist as done so progress still reaches the total
+            on_rows(totals[path] - (done - before))
+    return written, errors
+if __name__ == "__main__":
+    # python audion_export.py ids.csv out.jsonl [more_ids.csv out2.m3u ...]: export playlists of catalog ids
+    import audion_batch
+    args = sys.argv[1:]
+    if not args or len(args) % 2:
+        sys.exit("usage: python audion_export.py PLAYLIST OUTPUT [PLAYLIST OUTPUT ...]")
+    catalog = audion_core.get_catalog()
+    resolver = audion_batch.TrackResolver(catalog)
+    exports = {out: resolver.resolve(audion_batch.read_playlist_file(src))[0] for src, out in zip(args[::2], args[1::2])}
+    written, errors = export_playlists(catalog, exports, on_progress=lambda d, t: print(f"\r{d}/{t} rows", end="", file=sys.stderr))
+    print(file=sys.stderr)
+    for path, rows in written.items():
+        print(f"{path}: {rows} tracks")
+    for path, message in errors:
+        print(f"{path}: {message}", file=sys.stderr)
+    sys.exit(1 if errors else 0)
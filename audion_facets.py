@@ -0,0 +1,136 @@
+# Audion – facet index for Language / Genre / Mood filtering
+# Built once per catalog: every facet column becomes integer codes plus one
+# sorted row-position array per value, so a combination of selections is
+# resolved by walking the smallest list instead of scanning the catalog.
+import pandas as pd
+import numpy as np
+from audion_instrument import timed
+from audion_core import intersect_sorted
+
+FACET_COLUMNS = ("Language", "Genre", "Mood")
+class FacetIndex:
+    def __init__(self, df_local, columns=FACET_COLUMNS):
+        self.n = len(df_local)
+        self.columns = [c for c in columns if c in df_local.columns]
+        self.codes = {}
+        self.values = {}
+        self.lookup = {}
+        self.value_rows = {}
+        for col in self.columns:
+            codes, uniques = pd.factorize(df_local[col], sort=True)
+            codes = codes.astype(np.int32)
+            values = [str(v) for v in uniques]
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(values)))))
+            self.codes[col] = codes
+            self.values[col] = values
+            self.lookup[col] = {v: i for i, v in enumerate(values)}
+            self.value_rows[col] = [order[bounds[i]:bounds[i + 1]] for i in range(len(values))]
+        durations = df_local["Duration_min"].to_numpy(dtype=float) if "Duration_min" in df_local.columns else np.zeros(self.n)
+        self.duration_order = np.argsort(durations, kind="stable").astype(np.int32)
+        self.durations_sorted = durations[self.duration_order]
+    def with_changes(self, df_new, row_map, fresh_rows):
+        """A new index for an edited catalog: unchanged rows are renumbered, only fresh rows are looked up.
+
+        row_map and fresh_rows are as in SearchIndex.with_changes.
+        """
+        row_map = np.asarray(row_map, dtype=np.int64)
+        fresh_rows = np.asarray(fresh_rows, dtype=np.int64)
+        out = object.__new__(type(self))
+        out.n = len(df_new)
+        out.columns = list(self.columns)
+        out.codes, out.values, out.lookup, out.value_rows = {}, {}, {}, {}
+        kept_old = np.flatnonzero(row_map >= 0)
+        kept_new = row_map[kept_old]
+        for col in self.columns:
+            fresh_values = [str(v) for v in df_new[col].iloc[fresh_rows].tolist()]
+            # Codes over old values + newcomers first, then renumbered into sorted order
+            extra = sorted(set(fresh_values) - set(self.lookup[col]))
+            all_values = self.values[col] + extra
+            temp_lookup = dict(self.lookup[col], **{v: len(self.values[col]) + i for i, v in enumerate(extra)})
+            temp = np.empty(out.n, dtype=np.int32)
+            temp[kept_new] = self.codes[col][kept_old]
+            fresh_codes = np.array([temp_lookup[v] for v in fresh_values], dtype=np.int32)
+            temp[fresh_rows] = fresh_codes
+            counts = np.bincount(temp, minlength=len(all_values))
+            order = sorted((i for i in range(len(all_values)) if counts[i]), key=all_values.__getitem__)
+            remap = np.full(len(all_values), -1, dtype=np.int32)
+            remap[order] = np.arange(len(order), dtype=np.int32)
+            out.codes[col] = remap[temp]
+            out.values[col] = [all_values[i] for i in order]
+            out.lookup[col] = {v: i for i, v in enumerate(out.values[col])}
+            fresh_by_code = {}
+            for row, code in zip(fresh_rows.tolist(), remap[fresh_codes].tolist()):
+                fresh_by_code.setdefault(code, []).append(row)
+            value_rows = []
+            for code, temp_code in enumerate(order):
+                rows = np.empty(0, dtype=np.int64)
+                if temp_code < len(self.values[col]):
+                    rows = row_map[self.value_rows[col][temp_code]]
+                    rows = rows[rows >= 0]
+                add = np.sort(np.asarray(fresh_by_code.get(code, []), dtype=np.int64))
+                if len(add):
+                    rows = np.insert(rows, np.searchsorted(rows, add), add)
+                value_rows.append(rows.astype(np.int32))
+            out.value_rows[col] = value_rows
+        durations = df_new["Duration_min"].to_numpy(dtype=float) if "Duration_min" in df_new.columns else np.zeros(out.n)
+        order = row_map[self.duration_order]
+        order = order[order >= 0]
+        sorted_d = durations[order]
+        # Fresh rows go in by (duration, row), matching the stable argsort of a full build
+        fresh = fresh_rows[np.lexsort((fresh_rows, durations[fresh_rows]))]
+        at = np.empty(len(fresh), dtype=np.int64)
+        for i, row in enumerate(fresh.tolist()):
+            lo = np.searchsorted(sorted_d, durations[row], side="left")
+            hi = np.searchsorted(sorted_d, durations[row], side="right")
+            at[i] = lo + np.searchsorted(order[lo:hi], row)
+        out.duration_order = np.insert(order, at, fresh).astype(np.int32)
+        out.durations_sorted = durations[out.duration_order]
+        return out
+    def rows_for(self, col, value):
+        code = self.lookup.get(col, {}).get(value)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        return self.value_rows[col][code]
+    def duration_rows(self, lo=None, hi=None):
+        """Sorted row positions with lo <= Duration_min <= hi."""
+        start = 0 if lo is None else np.searchsorted(self.durations_sorted, lo, side="left")
+        stop = self.n if hi is None else np.searchsorted(self.durations_sorted, hi, side="right")
+        return np.sort(self.duration_order[start:stop])
+    @timed()
+    def resolve(self, selections, rows=None, duration_range=None):
+        """Sorted row positions matching every selection, or None when nothing narrows the catalog.
+
+        selections maps a facet column to a value ("All"/None/"" are ignored);
+        rows is an already-narrowed sorted position array, e.g. search hits.
+        """
+        active = {col: v for col, v in selections.items() if col in self.codes and v not in (None, "", "All")}
+        for col, value in active.items():
+            if value not in self.lookup[col]:
+                return np.empty(0, dtype=np.int32)
+        ranges = [] if rows is None else [rows]
+        if duration_range is not None:
+            ranges.append(self.duration_rows(*duration_range))
+        lists = ranges + [self.rows_for(col, v) for col, v in active.items()]
+        if not lists:
+            return None
+        # Start from the smallest list; facet values are then checked through their codes
+        result = min(lists, key=len)
+        for other in ranges:
+            if other is not result:
+                result = intersect_sorted(result, other)
+        for col, value in active.items():
+            result = result[self.codes[col][result] == self.lookup[col][value]]
+        return result
+    def counts(self, col, rows=None):
+        """Row count per value of col, over rows (or the whole catalog)."""
+        codes = self.codes[col] if rows is None else self.codes[col][rows]
+        return dict(zip(self.values[col], np.bincount(codes, minlength=len(self.values[col])).tolist()))
+    @timed()
+    def facet_counts(self, selections, rows=None, duration_range=None):
+        """Counts for every facet given the other facets' selections (a facet never narrows its own counts)."""
+        out = {}
+        for col in self.columns:
+            others = {c: v for c, v in selections.items() if c != col}
+            out[col] = self.counts(col, self.resolve(others, rows, duration_range))
+        return out
@@ -0,0 +1,145 @@
+# Audion – streaming catalog ingestion
+# Source files are read in fixed-size chunks (xlsx through openpyxl's
+# read-only mode, CSV through pandas, Parquet through pyarrow when it is
+# installed). Each chunk is normalized and enriched as it arrives and the
+# chunks of every source are appended into one catalog. A chunk that fails
+# is skipped and reported; it never turns into a silent fallback.
+import os
+import sys
+from collections import namedtuple
+import pandas as pd
+import audion_core
+import audion_dedup
+
+CHUNK_ROWS = 50000
+ChunkError = namedtuple("ChunkError", "source chunk first_row message")
+def format_chunk_error(err):
+    where = err.source if err.chunk is None else f"{err.source}, chunk {err.chunk} (rows from {err.first_row})"
+    return f"{where}: {err.message}"
+class CatalogLoadError(Exception):
+    """No rows could be loaded; errors lists what went wrong per source / chunk."""
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(format_chunk_error(e) for e in self.errors) or "no catalog rows")
+# ----------------------- Chunk readers -----------------------
+def read_xlsx_chunks(path, chunksize=CHUNK_ROWS):
+    """First worksheet, first row as header; columns without a header and empty rows are dropped."""
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        keep = [i for i, h in enumerate(header) if h is not None]
+        columns = [str(header[i]) for i in keep]
+        batch = []
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in keep]
+            if all(v is None for v in values):
+                continue
+            batch.append(values)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        wb.close()
+def read_csv_chunks(path, chunksize=CHUNK_ROWS):
+    sep = "\t" if path.lower().endswith(".tsv") else ","
+    with pd.read_csv(path, sep=sep, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk.dropna(how="all")
+def read_parquet_chunks(path, chunksize=CHUNK_ROWS):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("reading Parquet catalogs needs pyarrow (pip install pyarrow)") from None
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas().dropna(how="all")
+CHUNK_READERS = {
+    ".xlsx": read_xlsx_chunks,
+    ".xlsm": read_xlsx_chunks,
+    ".csv": read_csv_chunks,
+    ".tsv": read_csv_chunks,
+    ".parquet": read_parquet_chunks,
+    ".pq": read_parquet_chunks,
+}
+def iter_chunks(path, chunksize=CHUNK_ROWS):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in CHUNK_READERS:
+        raise ValueError(f"unsupported catalog file type '{ext}' (expected one of {', '.join(sorted(CHUNK_READERS))})")
+    return CHUNK_READERS[ext](path, chunksize)
+# ----------------------- Ingestion -----------------------
+def enrich_chunk(raw, start, seed=audion_core.FEATURE_SEED, enrich=True):
+    if "Name" not in raw.columns:
+        raise ValueError("missing required 'Name' column")
+    df_local = audion_core.normalize_catalog(raw)
+    return audion_core.enrich_catalog(df_local, seed, start) if enrich else df_local
+def ingest(sources, chunksize=CHUNK_ROWS, seed=audion_core.FEATURE_SEED, on_chunk=None, enrich=True):
+    """Load and enrich one or more catalog files chunk by chunk.
+
+    Returns (catalog, errors). Failed chunks are left out and listed in
+    errors; CatalogLoadError is raised only when no rows load at all.
+    on_chunk(source, chunk, rows_loaded_so_far) is called with every enriched chunk.
+    With enrich=False the rows are only normalized (no derived columns, no compaction,
+    no Track_id). Duplicates are detected over the whole catalog once every chunk is in.
+    """
+    sources = [sources] if isinstance(sources, (str, os.PathLike)) else list(sources)
+    frames, errors = [], []
+    loaded = 0
+    for source in map(os.fspath, sources):
+        number, first_row = 0, 0
+        try:
+            chunks = iter_chunks(source, chunksize)
+        except ValueError as e:
+            errors.append(ChunkError(source, None, None, str(e)))
+            continue
+        while True:
+            try:
+                raw = next(chunks)
+            except StopIteration:
+                break
+            except Exception as e:
+                # The reader itself broke: the rest of this file cannot be read
+                errors.append(ChunkError(source, number, first_row, f"{type(e).__name__}: {e}"))
+                break
+            try:
+                frames.append(enrich_chunk(raw, loaded, seed, enrich))
+                loaded += len(raw)
+                if on_chunk is not None:
+                    on_chunk(source, frames[-1], loaded)
+            except Exception as e:
+                errors.append(ChunkError(source, number, first_row, f"{type(e).__name__}: {e}"))
+            number += 1
+            first_row += len(raw)
+    if not frames:
+        raise CatalogLoadError(errors)
+    # normalize_catalog names the index after the id column; contiguous ids still come back as a RangeIndex
+    has_ids = [f.index.name == "index" for f in frames]
+    df_local = pd.concat(frames, ignore_index=not any(has_ids))
+    if not df_local.index.is_unique:
+        errors.append(ChunkError(", ".join(map(os.fspath, sources)), None, None, "track ids repeat across chunks or files; rows were renumbered"))
+        df_local = df_local.reset_index(drop=True)
+    if not enrich:
+        return df_local, errors
+    return audion_dedup.add_track_ids(audion_core.compact_catalog(df_local)), errors
+if __name__ == "__main__":
+    # python audion_ingest.py catalog.xlsx more.csv ... [--chunksize N]
+    args = sys.argv[1:]
+    size = CHUNK_ROWS
+    if "--chunksize" in args:
+        i = args.index("--chunksize")
+        size = int(args[i + 1])
+        del args[i:i + 2]
+    try:
+        catalog, problems = ingest(args or [audion_core.CATALOG_PATH], size,
+                                   on_chunk=lambda src, chunk, n: print(f"{src}: {n} rows", file=sys.stderr))
+    except CatalogLoadError as e:
+        for err in e.errors:
+            print(format_chunk_error(err), file=sys.stderr)
+        sys.exit(1)
+    for err in problems:
+        print(format_chunk_error(err), file=sys.stderr)
+    print(f"{len(catalog)} tracks loaded, {len(problems)} problem(s)")
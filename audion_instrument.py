@@ -0,0 +1,159 @@
+# Audion – hot-path instrumentation
+# @timed wraps Tk callbacks and core functions. While instrumentation is on,
+# every call's wall time goes into a rolling window per (operation, catalog
+# size class), from which p50 / p95 / max are read on demand. While it is off
+# the wrapper costs one flag check. A single interaction can also be captured
+# under cProfile or tracemalloc: arm a capture and the next outermost timed
+# call on the UI thread runs under the profiler.
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import threading
+import functools
+import tracemalloc
+import numpy as np
+
+WINDOW = 512                   # samples kept per (operation, size class)
+DUMP_PATH = "audion_latency.json"
+PROFILE_DIR = "audion_profiles"
+ENABLED = os.environ.get("AUDION_INSTRUMENT", "") not in ("", "0")
+_lock = threading.Lock()
+_local = threading.local()
+_size_class = "-"
+_histograms = {}
+_capture = {"armed": None, "last": None}
+def size_class(n):
+    """Catalog size bucket: '≤1k', '≤10k', … so latencies at different scales are kept apart."""
+    for limit, label in ((1000, "≤1k"), (10000, "≤10k"), (100000, "≤100k"), (1000000, "≤1M"), (10000000, "≤10M")):
+        if n <= limit:
+            return label
+    return ">10M"
+def set_catalog_size(n):
+    global _size_class
+    _size_class = size_class(n)
+def set_enabled(on):
+    global ENABLED
+    ENABLED = bool(on)
+class Histogram:
+    """Rolling window of the latest WINDOW durations (seconds) plus lifetime count and max."""
+    __slots__ = ("samples", "count", "max", "total")
+    def __init__(self):
+        self.samples = [0.0] * WINDOW   # a list: item assignment is cheaper than on an ndarray
+        self.count = 0
+        self.max = 0.0
+        self.total = 0.0
+    def add(self, seconds):
+        self.samples[self.count % WINDOW] = seconds
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+    def stats(self):
+        window = np.asarray(self.samples[:min(self.count, WINDOW)])
+        p50, p95 = np.percentile(window, [50, 95]) if len(window) else (0.0, 0.0)
+        return {"count": self.count, "p50_ms": p50 * 1000, "p95_ms": p95 * 1000,
+                "max_ms": self.max * 1000, "mean_ms": self.total / max(self.count, 1) * 1000}
+def record(name, seconds, size=None):
+    key = (name, _size_class if size is None else size)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.add(seconds)
+def snapshot():
+    """{operation: {size class: stats}} for everything recorded so far."""
+    with _lock:
+        items = [(key, hist.stats()) for key, hist in _histograms.items()]
+    out = {}
+    for (name, size), stats in sorted(items):
+        out.setdefault(name, {})[size] = stats
+    return out
+def reset():
+    with _lock:
+        _histograms.clear()
+def report_lines(sort="p95_ms"):
+    """One text line per (operation, size class), slowest first."""
+    rows = [(stats[sort], name, size, stats) for name, sizes in snapshot().items() for size, stats in sizes.items()]
+    rows.sort(key=lambda r: r[0], reverse=True)
+    lines = [f"{'operation':<34}{'size':>7}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+    for _, name, size, s in rows:
+        lines.append(f"{name[:33]:<34}{size:>7}{s['count']:>8}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['max_ms']:>10.2f}")
+    return lines
+def dump(path=DUMP_PATH):
+    data = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "window": WINDOW, "operations": snapshot()}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+    return path
+# ----------------------- One-shot capture -----------------------
+def arm_capture(kind="cprofile"):
+    """Profile the next outermost timed call on the main thread ('cprofile' or 'tracemalloc')."""
+    if kind not in ("cprofile", "tracemalloc"):
+        raise ValueError("kind must be 'cprofile' or 'tracemalloc'")
+    _capture["armed"] = kind
+def last_capture():
+    """(operation, report path, short text summary) of the latest capture, or None."""
+    return _capture["last"]
+def _run_captured(kind, name, fn, args, kwargs):
+    _capture["armed"] = None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    safe = "".join(ch if ch.isalnum() else "_" for ch in name)
+    if kind == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn, *args, **kwargs)
+        finally:
+            path = os.path.join(PROFILE_DIR, f"{safe}-{stamp}.prof")
+            profiler.dump_stats(path)
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(15)
+            _capture["last"] = (name, path, text.getvalue())
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(10)
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        peak = tracemalloc.get_traced_memory()[1]
+        stats = tracemalloc.take_snapshot().compare_to(before, "lineno")
+        if started:
+            tracemalloc.stop()
+        lines = [f"peak traced memory: {peak / 2**20:.2f} MiB", "top allocations (net):"]
+        lines += [str(s) for s in stats[:15]]
+        path = os.path.join(PROFILE_DIR, f"{safe}-{stamp}.tracemalloc.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        _capture["last"] = (name, path, "\n".join(lines))
+# ----------------------- Wrapper -----------------------
+def timed(name=None):
+    """Decorator: record the call's latency under name (default: the function's qualified name)."""
+    def wrap(fn):
+        key = name or fn.__qualname__
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED and _capture["armed"] is None:
+                return fn(*args, **kwargs)
+            depth = getattr(_local, "depth", 0)
+            kind = _capture["armed"]
+            _local.depth = depth + 1
+            try:
+                if kind is not None and depth == 0 and threading.current_thread() is threading.main_thread():
+                    # Profiler overhead would skew the histogram, so a captured call is not recorded
+                    return _run_captured(kind, key, fn, args, kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    if ENABLED:
+                        record(key, time.perf_counter() - start)
+            finally:
+                _local.depth = depth
+        return wrapper
+    return wrap
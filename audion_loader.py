@@ -0,0 +1,108 @@
+# Audion – background catalog loading
+# The catalog is loaded (from the cache, or streamed chunk by chunk) on a
+# worker thread, which also builds the search, facet and recommendation
+# structures. Results travel to the UI as messages on a queue; the UI thread
+# polls it and swaps the finished objects in, so nothing the UI owns is ever
+# touched from the worker. Reloads after the source file changed go through
+# the same path, with audion_refresh applying only the rows that differ.
+# Playlist exports run on a worker of the same kind.
+import queue
+import threading
+import audion_core
+import audion_export
+import audion_search
+import audion_facets
+import audion_recommend
+import audion_refresh
+import audion_store
+
+def build_catalog_state(df_local, fingerprint=True):
+    """Everything the UI derives from a catalog, built without touching Tk.
+
+    fingerprint=False leaves out the snapshot hash (the first-chunk preview skips it).
+    """
+    return {
+        "df": df_local,
+        "search_index": audion_search.SearchIndex.from_frame(df_local),
+        "facet_index": audion_facets.FacetIndex(df_local),
+        "recommender": audion_recommend.Recommender(df_local),
+        "display": audion_core.table_display_columns(df_local),
+        "fingerprint": audion_store.catalog_fingerprint(df_local) if fingerprint else None,
+    }
+class _Worker:
+    """A daemon thread reporting through a message queue the UI polls."""
+    name = "audion-worker"
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+    def start(self):
+        self.thread.start()
+        return self
+    def poll(self):
+        """Messages posted since the last call, oldest first (never blocks)."""
+        out = []
+        while True:
+            try:
+                out.append(self.messages.get_nowait())
+            except queue.Empty:
+                return out
+class CatalogLoader(_Worker):
+    """Loads a catalog on a daemon thread and reports through messages.
+
+    Messages are (kind, payload) tuples:
+      ("progress", rows loaded so far)
+      ("partial", state)  the first chunk, so the UI can be used early
+      ("ready", state)    the full catalog
+      ("failed", exception)
+    """
+    name = "audion-catalog-loader"
+    def __init__(self, path=audion_core.CATALOG_PATH, rebuild_cache=False):
+        super().__init__()
+        self.path = path
+        self.rebuild_cache = rebuild_cache
+        self._sent_partial = False
+    def _on_chunk(self, source, chunk, loaded):
+        self.messages.put(("progress", loaded))
+        if not self._sent_partial:
+            self._sent_partial = True
+            self.messages.put(("partial", build_catalog_state(audion_core.compact_catalog(chunk.copy()), fingerprint=False)))
+    def _run(self):
+        try:
+            df_local = audion_core.get_catalog(self.path, reload=True, rebuild_cache=self.rebuild_cache, on_chunk=self._on_chunk)
+            self.messages.put(("ready", build_catalog_state(df_local)))
+        except Exception as e:
+            self.messages.put(("failed", e))
+class CatalogRefresher(_Worker):
+    """Re-reads the source and applies only what changed (see audion_refresh).
+
+    Messages: ("ready", (state, changes)) or ("failed", exception).
+    """
+    name = "audion-catalog-refresh"
+    def __init__(self, state, path=audion_core.CATALOG_PATH):
+        super().__init__()
+        self.state = state
+        self.path = path
+    def _run(self):
+        try:
+            self.messages.put(("ready", audion_refresh.refresh_state(self.state, self.path)))
+        except Exception as e:
+            self.messages.put(("failed", e))
+class PlaylistExporter(_Worker):
+    """Writes playlists with audion_export.export_playlists ({output path: labels}).
+
+    Messages: ("progress", (rows written, rows in total)),
+    ("ready", (written, errors)) or ("failed", exception).
+    """
+    name = "audion-export"
+    def __init__(self, catalog, exports, columns=None):
+        super().__init__()
+        self.catalog = catalog
+        self.exports = exports
+        self.columns = columns
+    def _run(self):
+        try:
+            result = audion_export.export_playlists(self.catalog, self.exports, self.columns,
+                                                    on_progress=lambda done, total: self.messages.put(("progress", (done, total))))
+            self.messages.put(("ready", result))
+        except Exception as e:
+            self.messages.put(("failed", e))
@@ -0,0 +1,201 @@
+# Audion – incremental playlist statistics
+# Keeps running totals and per-column tallies for the playlist so adding or
+# removing a track updates the stats cards without rebuilding a playlist
+# frame. Top values come from lazily-invalidated max-heaps. Versions of one
+# song (rows sharing a Track_id) count once: only the first queued version is
+# tallied, as in audion_core.compute_playlist_summary.
+import heapq
+from collections import Counter
+import pandas as pd
+import numpy as np
+from audion_core import TRACK_ID, column_codes
+
+TALLY_COLUMNS = ("Artist", "Genre", "Language", "Mood")
+class PlaylistStats:
+    def __init__(self, catalog, columns=TALLY_COLUMNS):
+        self.columns = [c for c in columns if c in catalog.columns]
+        self._index = catalog.index
+        self._codes = {}         # per column: int32 code per catalog row, and the value of each code
+        self._labels = {}
+        for c in self.columns:
+            self._codes[c], self._labels[c] = column_codes(catalog[c])
+        self._durations = catalog["Duration_min"].to_numpy()
+        # Song of every catalog row; without Track_id each row is a song of its own
+        self._tracks = column_codes(catalog[TRACK_ID])[0] if TRACK_ID in catalog.columns else np.arange(len(catalog))
+        n_tracks = int(self._tracks.max(initial=-1)) + 1
+        self._refs = np.zeros(n_tracks, dtype=np.int32)              # queued versions per song
+        self._first_version = np.full(n_tracks, -1, dtype=np.int64)  # queue number of each song's tallied version
+        self.queue = {}          # catalog label -> queue number, in play order
+        self.total_min = 0.0
+        self.tallies = {c: Counter() for c in self.columns}
+        self._first_seen = {c: {} for c in self.columns}   # per column: value -> queue number of its earliest tallied row
+        self._heaps = {c: [] for c in self.columns}
+        self._seq = 0
+    def __len__(self):
+        return len(self.queue)
+    def __contains__(self, label):
+        return label in self.queue
+    def _bump(self, col, key, delta, seq):
+        """Count delta more rows of key, seq being the earliest queue number among them.
+
+        Returns True when a removal took the key's earliest tallied row and the
+        key is still tallied; its first-seen number must then be recomputed.
+        """
+        tally = self.tallies[col]
+        first_seen = self._first_seen[col]
+        count = tally[key] + delta
+        if count <= 0:
+            del tally[key]
+            del first_seen[key]
+            return False
+        tally[key] = count
+        if delta > 0:
+            first_seen[key] = min(first_seen.get(key, seq), seq)
+        elif first_seen[key] == seq:
+            return True
+        self._push(col, key)
+        return False
+    def _push(self, col, key):
+        # Ties go to the value whose first row comes earliest in the queue, as value_counts().idxmax() does
+        heap = self._heaps[col]
+        tally = self.tallies[col]
+        first_seen = self._first_seen[col]
+        heapq.heappush(heap, (-tally[key], first_seen[key], key))
+        if len(heap) > 4 * len(tally) + 64:
+            # Too many stale entries: rebuild from the live tallies
+            heap[:] = [(-c, first_seen[k], k) for k, c in tally.items()]
+            heapq.heapify(heap)
+    def _queued(self):
+        """Catalog positions and queue numbers of the queued rows, in play order."""
+        return (self._index.get_indexer(list(self.queue)),
+                np.fromiter(self.queue.values(), dtype=np.int64, count=len(self.queue)))
+    def _refresh_first_seen(self, col, codes, positions, seqs):
+        """Recompute first-seen numbers of the values with these codes from the tallied rows (in play order)."""
+        labels = self._labels[col]
+        values = self._codes[col][positions]
+        wanted = np.isin(values, codes)
+        found, first = np.unique(values[wanted], return_index=True)
+        for code, seq in zip(found.tolist(), seqs[wanted][first].tolist()):
+            self._first_seen[col][labels[code]] = seq
+            self._push(col, labels[code])
+    def _resolve(self, labels):
+        """Unique catalog labels (first occurrence order) and their row positions; unknown labels are dropped."""
+        labels = pd.unique(pd.Series(list(labels), dtype=object if self._index.dtype == object else None))
+        positions = self._index.get_indexer(labels)
+        known = positions >= 0
+        return labels[known].tolist(), positions[known]
+    def _tally(self, positions, seqs, sign):
+        """Count (sign=1) or uncount (sign=-1) the rows at positions, queued under the numbers seqs.
+
+        Returns {column: codes whose first-seen number must be recomputed}.
+        """
+        moved = {}
+        for col in self.columns:
+            codes = self._codes[col][positions]
+            order = np.argsort(codes, kind="stable")
+            codes = codes[order]
+            starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.empty(0, dtype=np.intp)
+            counts = np.diff(np.r_[starts, len(codes)])
+            earliest = np.minimum.reduceat(seqs[order], starts) if len(codes) else starts
+            labels = self._labels[col]
+            moved[col] = [code for code, count, seq in zip(codes[starts].tolist(), counts.tolist(), earliest.tolist())
+                          if self._bump(col, labels[code], sign * count, seq)]
+        return moved
+    def _enter(self, positions, seqs):
+        """Tally newly queued rows: a song's first queued version only."""
+        tracks = self._tracks[positions]
+        _, first = np.unique(tracks, return_index=True)
+        first = first[self._refs[tracks[first]] == 0]
+        np.add.at(self._refs, tracks, 1)
+        self._first_version[tracks[first]] = seqs[first]
+        self._tally(positions[first], seqs[first], 1)
+    def _leave(self, positions, seqs):
+        """Untally rows that left the queue; a song's next queued version takes over its tally."""
+        tracks = self._tracks[positions]
+        np.subtract.at(self._refs, tracks, 1)
+        tallied = self._first_version[tracks] == seqs
+        moved = self._tally(positions[tallied], seqs[tallied], -1)
+        orphaned = tracks[tallied]
+        self._first_version[orphaned] = -1
+        orphaned = orphaned[self._refs[orphaned] > 0]
+        if not len(orphaned) and not any(moved.values()):
+            return
+        queued, queued_seqs = self._queued()
+        queued_tracks = self._tracks[queued]
+        if len(orphaned):
+            rows = np.flatnonzero(np.isin(queued_tracks, orphaned))
+            _, first = np.unique(queued_tracks[rows], return_index=True)
+            rows = rows[first]
+            self._first_version[queued_tracks[rows]] = queued_seqs[rows]
+            self._tally(queued[rows], queued_seqs[rows], 1)
+        tallied = self._first_version[queued_tracks] == queued_seqs
+        for col, codes in moved.items():
+            if codes:
+                self._refresh_first_seen(col, codes, queued[tallied], queued_seqs[tallied])
+    def add_many(self, labels):
+        """Append tracks not already queued; returns the queue position of the first one added, or None."""
+        labels, positions = self._resolve(labels)
+        fresh = np.fromiter((label not in self.queue for label in labels), dtype=bool, count=len(labels))
+        if not fresh.any():
+            return None
+        start = len(self.queue)
+        seqs = np.arange(self._seq, self._seq + int(fresh.sum()), dtype=np.int64)
+        self._seq += len(seqs)
+        self.queue.update(zip((label for label, f in zip(labels, fresh) if f), seqs.tolist()))
+        self.total_min += float(self._durations[positions[fresh]].sum())
+        self._enter(positions[fresh], seqs)
+        return start
+    def remove_many(self, labels):
+        """Drop queued tracks; returns the smallest queue position that changed, or None."""
+        labels, positions = self._resolve(labels)
+        queued = np.fromiter((label in self.queue for label in labels), dtype=bool, count=len(labels))
+        if not queued.any():
+            return None
+        gone = [label for label, q in zip(labels, queued) if q]
+        first = min(self.queue[label] for label in gone)
+        first = next(i for i, seq in enumerate(self.queue.values()) if seq == first)
+        seqs = np.fromiter((self.queue.pop(label) for label in gone), dtype=np.int64, count=len(gone))
+        self.total_min -= float(self._durations[positions[queued]].sum())
+        self._leave(positions[queued], seqs)
+        if not self.queue:
+            self.total_min = 0.0  # don't let float error accumulate across empty playlists
+        return first
+    def replace(self, labels):
+        """Make the playlist exactly labels (in order); returns 0."""
+        self.queue.clear()
+        self.total_min = 0.0
+        self._seq = 0
+        self._refs[:] = 0
+        self._first_version[:] = -1
+        for col in self.columns:
+            self.tallies[col].clear()
+            self._first_seen[col].clear()
+            self._heaps[col].clear()
+        self.add_many(labels)
+        return 0
+    def add(self, label):
+        """Append a track; returns its queue position, or None if it was already queued."""
+        return self.add_many([label])
+    def remove(self, label):
+        """Drop a track; returns the queue position it had, or None if it was not queued."""
+        return self.remove_many([label])
+    def top(self, col, default="N/A"):
+        if col not in self._heaps:
+            return "Unknown" if self.queue else default
+        heap = self._heaps[col]
+        tally = self.tallies[col]
+        first_seen = self._first_seen[col]
+        while heap:
+            neg_count, seen, key = heap[0]
+            if tally.get(key) == -neg_count and first_seen.get(key) == seen:
+                return key
+            heapq.heappop(heap)  # stale entry from an earlier count
+        return default
+    def distinct(self, col):
+        return len(self.tallies.get(col, ()))
+    def summary(self):
+        """Same keys and values as audion_core.compute_playlist_summary for the queued tracks."""
+        if not self.queue:
+            return {"total_min": 0.0, "avg_min": 0.0, "top_artist": "N/A", "top_genre": "N/A", "top_language": "N/A"}
+        return {"total_min": self.total_min, "avg_min": self.total_min / len(self.queue),
+                "top_artist": self.top("Artist"), "top_genre": self.top("Genre"), "top_language": self.top("Language")}
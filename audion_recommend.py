@@ -0,0 +1,119 @@
+# Audion – vector-similarity recommendations
+# Every track is a vector of standardized audio features plus one-hot Genre,
+# Language and Mood blocks. The numeric block is a contiguous float32 matrix
+# built once; the one-hot blocks are kept as category codes, since a one-hot
+# row dotted with a centroid block is just the centroid's weight for that
+# row's category. Candidates are scored by cosine similarity to the playlist
+# centroid and the top k are picked with argpartition. Rows sharing a
+# Track_id are versions of one song: the playlist's songs are excluded in
+# every version, and at most one version of each song is recommended.
+import numpy as np
+from audion_instrument import timed
+from audion_core import CONTRAST_MAP, TRACK_ID, column_codes
+
+NUMERIC_FEATURES = ("energy", "danceability", "valence", "tempo")
+CATEGORY_WEIGHTS = {"Genre": 1.0, "Language": 1.0, "Mood": 1.0}
+class Recommender:
+    def __init__(self, catalog, category_weights=CATEGORY_WEIGHTS):
+        self.catalog = catalog
+        self.index = catalog.index
+        cols = [c for c in NUMERIC_FEATURES if c in catalog.columns]
+        X = catalog[cols].to_numpy(dtype=np.float32) if cols else np.zeros((len(catalog), 0), dtype=np.float32)
+        mean = X.mean(axis=0) if len(X) else np.zeros(X.shape[1], dtype=np.float32)
+        std = X.std(axis=0) if len(X) else np.ones(X.shape[1], dtype=np.float32)
+        std[std == 0] = 1.0
+        self.features = np.ascontiguousarray((X - mean) / std, dtype=np.float32)
+        self.weights = {c: np.float32(w) for c, w in category_weights.items() if c in catalog.columns}
+        self.codes = {}
+        self.categories = {}
+        for col in self.weights:
+            self.codes[col], self.categories[col] = column_codes(catalog[col])
+        # |row|^2: numeric part plus one active slot (weight^2) per one-hot block
+        sq = np.einsum("ij,ij->i", self.features, self.features) + sum(w * w for w in self.weights.values())
+        norms = np.sqrt(sq).astype(np.float32)
+        norms[norms == 0] = 1.0
+        self.inv_row_norms = (1.0 / norms).astype(np.float32)
+        if TRACK_ID in catalog.columns:
+            self.track_codes, _ = column_codes(catalog[TRACK_ID])
+            self.n_tracks = int(self.track_codes.max(initial=-1)) + 1
+        else:
+            self.track_codes, self.n_tracks = None, 0
+    def positions(self, labels):
+        pos = self.index.get_indexer(list(labels))
+        return pos[pos >= 0]
+    def centroid(self, positions):
+        """Mean vector of the given rows: numeric centroid and per-block category shares."""
+        numeric = self.features[positions].mean(axis=0)
+        blocks = {col: np.bincount(self.codes[col][positions], minlength=len(self.categories[col])) / len(positions)
+                  for col in self.weights}
+        return numeric, blocks
+    def contrast_moods(self, blocks):
+        """Codes of the moods CONTRAST_MAP pairs with the dominant mood of a centroid's blocks."""
+        moods = self.categories["Mood"]
+        dominant = moods[int(np.argmax(blocks["Mood"]))]
+        return [moods.index(m) for m in CONTRAST_MAP.get(dominant, ["Calm", "Happy"]) if m in moods]
+    def contrast(self, numeric, blocks):
+        """Flip the playlist's vibe: opposite audio features and the contrasting moods for its dominant mood."""
+        if "Mood" in blocks:
+            moods = self.categories["Mood"]
+            targets = self.contrast_moods(blocks)
+            mood_block = np.zeros(len(moods))
+            if targets:
+                mood_block[targets] = 1.0 / len(targets)
+            blocks = dict(blocks, Mood=mood_block)
+        return -numeric, blocks
+    def scores(self, numeric, blocks):
+        """Cosine similarity of every catalog row to the (numeric, blocks) vector."""
+        scores = self.features @ numeric.astype(np.float32)
+        centroid_sq = float(numeric @ numeric)
+        for col, w in self.weights.items():
+            block = (w * blocks[col]).astype(np.float32)
+            scores += block[self.codes[col]]
+            centroid_sq += float(block @ block)
+        scores *= self.inv_row_norms
+        scores *= np.float32(1.0 / (np.sqrt(centroid_sq) or 1.0))
+        return scores
+    def recommend_positions(self, playlist_labels, n=8, mode="similar", exclude=()):
+        positions = self.positions(playlist_labels)
+        if not len(positions):
+            return np.empty(0, dtype=np.int64)
+        numeric, blocks = self.centroid(positions)
+        targets = self.contrast_moods(blocks) if mode == "contrast" and "Mood" in blocks else None
+        if mode == "contrast":
+            numeric, blocks = self.contrast(numeric, blocks)
+        scores = self.scores(numeric, blocks)
+        # Exclude the playlist (and anything else asked for) through the score vector, not a catalog copy
+        scores[positions] = -np.inf
+        extra = self.positions(exclude)
+        if len(extra):
+            scores[extra] = -np.inf
+        if self.track_codes is not None:
+            # Other versions of the playlist's songs are excluded too
+            in_playlist = np.zeros(self.n_tracks, dtype=bool)
+            in_playlist[self.track_codes[positions]] = True
+            scores[in_playlist[self.track_codes]] = -np.inf
+        if targets is not None:
+            # Contrast picks come from the contrasting moods; the flipped features only rank them.
+            # Any mood is offered only when none of those moods has a track left.
+            allowed = np.isin(self.codes["Mood"], targets)
+            if np.isfinite(scores[allowed]).any():
+                scores[~allowed] = -np.inf
+        available = int(np.isfinite(scores).sum())
+        k = min(n, available)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        # Widen the candidate set until it holds k distinct songs (or every available row)
+        m = k if self.track_codes is None else min(4 * k, available)
+        while True:
+            top = np.argpartition(scores, len(scores) - m)[len(scores) - m:]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            if self.track_codes is None:
+                return top
+            _, first = np.unique(self.track_codes[top], return_index=True)
+            if len(first) >= k or m == available:
+                return top[np.sort(first)][:k]
+            m = min(2 * m, available)
+    @timed()
+    def recommend(self, playlist_labels, n=8, mode="similar", exclude=()):
+        """Top-n catalog rows for the playlist; mode is "similar" or "contrast"."""
+        return self.catalog.iloc[self.recommend_positions(playlist_labels, n, mode, exclude)]
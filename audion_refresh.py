@@ -0,0 +1,199 @@
+# Audion – incremental catalog refresh
+# Re-reads the source file and diffs it against the loaded catalog by a stable
+# track key: the id column when the source has one. Otherwise rows are matched
+# on every source column first (copies identical in every column are
+# interchangeable), and the rows left over are paired within their Name +
+# Artist by nearest duration: those are the edited rows. Only inserted and
+# edited rows are enriched; unchanged rows keep their derived columns and are
+# merely renumbered in the search and facet indexes. Existing rows keep their
+# place and their label, so playlist / queue ids stay valid; new rows are appended.
+import os
+import sys
+import numpy as np
+import pandas as pd
+import audion_core
+import audion_dedup
+import audion_ingest
+import audion_recommend
+import audion_store
+
+DERIVED_COLUMNS = ["Duration_min", "Mood"] + audion_core.FEATURE_COLUMNS
+NAME_COLUMNS = ("Name", "Artist")
+def _row_keys(old, new, columns):
+    """Integer keys for the rows of old and of new; equal keys mean equal text in every column."""
+    key = np.zeros(len(old) + len(new), dtype=np.int64)
+    for col in columns:
+        if col in old.columns and col in new.columns:
+            codes, uniques = pd.factorize(np.concatenate((old[col].astype(str).to_numpy(dtype=object),
+                                                          new[col].astype(str).to_numpy(dtype=object))))
+            key, _ = pd.factorize(key * len(uniques) + codes)
+    return key[:len(old)], key[len(old):]
+def _numbered(key):
+    """Make keys unique by pairing repeats with their occurrence number."""
+    occurrence = pd.Series(key).groupby(key, sort=False).cumcount().to_numpy()
+    return key * (int(occurrence.max(initial=0)) + 1) + occurrence
+def _durations(frame):
+    if "Duration_min" in frame.columns:
+        values = frame["Duration_min"].to_numpy(dtype=np.float64)
+    elif "Duration" in frame.columns:
+        values = audion_core.parse_duration_column(frame["Duration"])
+    else:
+        values = np.zeros(len(frame))
+    return np.nan_to_num(values, nan=-1.0)
+def has_ids(frame):
+    """True when the source had an id column (normalize_catalog makes it the index)."""
+    return frame.index.name == "index"
+def source_columns(old, new):
+    """Source columns of the re-read file that the loaded catalog also has."""
+    return [c for c in new.columns if c not in DERIVED_COLUMNS and c in old.columns]
+def _match_nearest(old, new, match):
+    """Pair old and new rows left unmatched that share Name + Artist, nearest duration first."""
+    new_free = np.ones(len(new), dtype=bool)
+    new_free[match[match >= 0]] = False
+    old_rows, new_rows = np.flatnonzero(match < 0), np.flatnonzero(new_free)
+    if not len(old_rows) or not len(new_rows):
+        return match
+    old_groups, new_groups = _row_keys(old, new, NAME_COLUMNS)
+    left = pd.DataFrame({"group": new_groups[new_rows], "duration": _durations(new)[new_rows], "new_row": new_rows})
+    right = pd.DataFrame({"group": old_groups[old_rows], "duration": _durations(old)[old_rows], "old_row": old_rows})
+    right["old_duration"] = right["duration"]
+    while len(left) and len(right):
+        # Each free new row's nearest free old row; an old row wanted by several new rows goes to the closest
+        pairs = pd.merge_asof(left.sort_values("duration"), right.sort_values("duration"), on="duration",
+                              by="group", direction="nearest").dropna(subset=["old_row"])
+        if pairs.empty:
+            break
+        pairs["gap"] = (pairs["duration"] - pairs["old_duration"]).abs()
+        pairs = pairs.sort_values(["gap", "new_row"], kind="stable").drop_duplicates("old_row")
+        match[pairs["old_row"].to_numpy(dtype=np.int64)] = pairs["new_row"].to_numpy(dtype=np.int64)
+        left = left[~left["new_row"].isin(pairs["new_row"])]
+        right = right[~right["old_row"].isin(pairs["old_row"])]
+    return match
+def match_rows(old, new):
+    """For every row of the loaded catalog, its row in the re-read source, or -1 if it was deleted."""
+    if has_ids(new):
+        return pd.Index(np.asarray(new.index.astype(str))).get_indexer(np.asarray(old.index.astype(str)))
+    old_keys, new_keys = _row_keys(old, new, source_columns(old, new))
+    match = pd.Index(_numbered(new_keys)).get_indexer(_numbered(old_keys))
+    # Never pair rows by occurrence rank alone: edited rows are matched by content
+    return _match_nearest(old, new, match)
+def _as_text(frame, col, rows):
+    return frame[col].astype(str).to_numpy()[rows]
+def changed_rows(old, new, old_rows, new_rows):
+    """Mask over matched row pairs whose source values differ."""
+    changed = np.zeros(len(old_rows), dtype=bool)
+    # Track_id is recomputed over the whole refreshed catalog, so it is not a source column either
+    old_source = [c for c in old.columns if c not in DERIVED_COLUMNS and c != audion_core.TRACK_ID]
+    new_source = [c for c in new.columns if c not in DERIVED_COLUMNS]
+    if set(old_source) != set(new_source):
+        # Columns were added or dropped: every row is re-enriched
+        changed[:] = True
+        return changed
+    for col in new_source:
+        changed |= _as_text(old, col, old_rows) != _as_text(new, col, new_rows)
+    for col in audion_core.FEATURE_COLUMNS:
+        if col in new.columns:
+            # Real feature values from the source; blanks keep the simulated value
+            real = pd.to_numeric(new[col], errors="coerce").to_numpy(dtype=float)[new_rows]
+            if col == "tempo":
+                real = np.round(real)
+            current = old[col].to_numpy(dtype=float)[old_rows] if col in old.columns else np.full(len(old_rows), np.nan)
+            changed |= ~np.isnan(real) & ~np.isclose(real, current, rtol=1e-6)
+    return changed
+def _new_labels(old, count):
+    numeric = pd.to_numeric(pd.Series(old.index, dtype=object), errors="coerce")
+    start = int(numeric.max()) + 1 if numeric.notna().any() else len(old)
+    return list(range(start, start + count))
+def refresh_catalog(old, path=audion_core.CATALOG_PATH, seed=audion_core.FEATURE_SEED):
+    """Diff the source file against the loaded catalog.
+
+    Returns (catalog, changes). changes holds the inserted / modified /
+    deleted labels and, for the index updates, row_map (each old row's new
+    position, -1 for deleted or modified rows) and fresh_rows (positions of
+    the rows that were enriched). Raises CatalogLoadError if any part of the
+    source fails to load, so a broken read never looks like mass deletion.
+    """
+    new, errors = audion_ingest.ingest(path, seed=seed, enrich=False)
+    if errors:
+        raise audion_ingest.CatalogLoadError(errors)
+    match = match_rows(old, new)
+    kept_old = np.flatnonzero(match >= 0)
+    modified = changed_rows(old, new, kept_old, match[kept_old])
+    matched_new = np.zeros(len(new), dtype=bool)
+    matched_new[match[kept_old]] = True
+    inserted_new = np.flatnonzero(~matched_new)
+    # Surviving rows in their old order, then inserted rows in file order
+    source_rows = np.concatenate((match[kept_old], inserted_new)).astype(np.int64)
+    row_map = np.full(len(old), -1, dtype=np.int64)
+    row_map[kept_old] = np.arange(len(kept_old))
+    row_map[kept_old[modified]] = -1
+    fresh_rows = np.concatenate((np.flatnonzero(modified), np.arange(len(kept_old), len(source_rows)))).astype(np.int64)
+    if has_ids(new):
+        labels = new.index[source_rows].tolist()
+    else:
+        labels = old.index[kept_old].tolist() + _new_labels(old, len(inserted_new))
+    df_local = new.iloc[source_rows].copy()
+    index = pd.Index(labels, name=new.index.name if has_ids(new) else old.index.name)
+    df_local.index = pd.RangeIndex(len(index), name=index.name) if index.equals(pd.RangeIndex(len(index))) else index
+    fresh = audion_core.enrich_catalog(df_local.iloc[fresh_rows].copy(), seed, fresh_rows)
+    unchanged_old = np.flatnonzero(row_map >= 0)
+    for col in DERIVED_COLUMNS:
+        values = np.empty(len(df_local), dtype=fresh[col].dtype if col != "Mood" else object)
+        if col in old.columns and len(unchanged_old):
+            values[row_map[unchanged_old]] = np.asarray(old[col])[unchanged_old]
+        values[fresh_rows] = fresh[col].to_numpy()
+        if isinstance(fresh[col].dtype, pd.CategoricalDtype):
+            # Keep the enrichment's category list (e.g. every known mood), not just the values present
+            extra = [c for c in getattr(old[col], "cat", fresh[col].cat).categories if c not in fresh[col].cat.categories]
+            values = pd.Categorical(values, categories=list(fresh[col].cat.categories) + extra)
+        df_local[col] = values
+    # Duplicate groups can span old and new rows, so Track_id is recomputed over the whole catalog
+    df_local = audion_dedup.add_track_ids(audion_core.compact_catalog(df_local))
+    df_local.attrs["load_errors"] = []
+    changes = {
+        "inserted": df_local.index[len(kept_old):].tolist(),
+        "modified": old.index[kept_old[modified]].tolist(),
+        "deleted": old.index[match < 0].tolist(),
+        "row_map": row_map,
+        "fresh_rows": fresh_rows,
+    }
+    return df_local, changes
+def refresh_state(state, path=audion_core.CATALOG_PATH, save_cache=True):
+    """Refresh a loader state (see audion_loader.build_catalog_state) in place of a full reload.
+
+    Returns (new state, changes). The search and facet indexes are updated
+    from the diff; the recommender and table columns are vectorized rebuilds.
+    """
+    old = state["df"]
+    df_local, changes = refresh_catalog(old, path)
+    row_map, fresh_rows = changes["row_map"], changes["fresh_rows"]
+    # Edits that leave Name and Artist alone keep their search postings
+    mod_old = old.index.get_indexer(changes["modified"])
+    mod_new = df_local.index.get_indexer(changes["modified"])
+    same_text = np.ones(len(mod_old), dtype=bool)
+    for col in ("Name", "Artist"):
+        if col in df_local.columns:
+            same_text &= _as_text(old, col, mod_old) == _as_text(df_local, col, mod_new)
+    text_map = row_map.copy()
+    text_map[mod_old[same_text]] = mod_new[same_text]
+    text_rows = np.setdiff1d(fresh_rows, mod_new[same_text])
+    names = df_local["Name"].to_numpy()[text_rows].tolist()
+    artists = df_local["Artist"].astype(str).to_numpy()[text_rows].tolist() if "Artist" in df_local.columns else [""] * len(text_rows)
+    new_state = {
+        "df": df_local,
+        "search_index": state["search_index"].with_changes(text_map, text_rows, names, artists),
+        "facet_index": state["facet_index"].with_changes(df_local, row_map, fresh_rows),
+        "recommender": audion_recommend.Recommender(df_local),
+        "display": audion_core.table_display_columns(df_local),
+        "fingerprint": audion_store.catalog_fingerprint(df_local),
+    }
+    if save_cache and isinstance(path, (str, os.PathLike)) and os.path.exists(path):
+        import audion_cache
+        try:
+            audion_cache.save_cache(df_local, audion_cache.cache_path_for(path), audion_cache.source_key(path))
+        except (OSError, ValueError) as e:
+            print(f"Audion: could not write catalog cache: {e}", file=sys.stderr)
+    return new_state, changes
+def describe_changes(changes):
+    parts = [f"{len(changes[k])} {k}" for k in ("inserted", "modified", "deleted")]
+    return ", ".join(parts) if any(changes[k] for k in ("inserted", "modified", "deleted")) else "no changes"
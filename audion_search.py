@@ -0,0 +1,256 @@
+# Audion – search index for the library filter
+# Name and Artist are lowercased and accent-folded once, and every trigram is
+# mapped to the sorted row positions that contain it (CSR layout in numpy).
+# A query extending the previous one only re-checks the previous hits.
+import unicodedata
+import numpy as np
+from audion_instrument import timed
+from audion_core import intersect_sorted
+
+FIELD_SEP = "\x1f"
+RECORD_SEP = "\x1e"
+NARROW_LIMIT = 20000
+def fold_text(s):
+    """Lowercase and strip accents, so 'Beyoncé' matches 'beyonce'."""
+    s = "" if s is None else str(s)
+    if s.isascii():
+        return s.lower()
+    s = unicodedata.normalize("NFKD", s)
+    return "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+def _clean_query(query):
+    return fold_text(query).strip().replace(FIELD_SEP, "").replace(RECORD_SEP, "")
+def _trigram_codes(cps):
+    cps = cps.astype(np.uint64)
+    return (cps[:-2] << np.uint64(42)) | (cps[1:-1] << np.uint64(21)) | cps[2:]
+def _text_trigrams(cps, lengths, row_ids):
+    """Distinct (trigram, row) pairs of RECORD_SEP-terminated texts, sorted by trigram then row."""
+    if len(cps) < 3:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int32)
+    row_of = np.repeat(np.asarray(row_ids, dtype=np.int32), lengths)
+    is_sep = (cps == ord(FIELD_SEP)) | (cps == ord(RECORD_SEP))
+    valid = ~(is_sep[:-2] | is_sep[1:-1] | is_sep[2:])
+    codes = _trigram_codes(cps)[valid]
+    rows = row_of[:-2][valid]
+    del row_of, is_sep, valid
+    # Stable sort keeps rows ascending within each trigram
+    order = np.argsort(codes, kind="stable")
+    codes, rows = codes[order], rows[order]
+    keep = np.ones(len(codes), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    return codes[keep], rows[keep]
+class SearchIndex:
+    def __init__(self, names, artists):
+        texts = [fold_text(n) + FIELD_SEP + fold_text(a) for n, a in zip(names, artists)]
+        self.n = len(texts)
+        self._build_trigrams(texts)
+        self._last_query = ""
+        self._last_rows = None
+    @classmethod
+    def from_frame(cls, df_local):
+        artists = df_local["Artist"] if "Artist" in df_local.columns else [""] * len(df_local)
+        return cls(df_local["Name"].tolist(), list(artists))
+    def _build_trigrams(self, texts):
+        blob = RECORD_SEP.join(texts) + RECORD_SEP
+        cps = np.frombuffer(blob.encode("utf-32-le"), dtype=np.uint32)
+        lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=self.n)
+        self.text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        # The folded texts live on only as code points: one- and two-character queries scan
+        # them directly and substring checks decode just the candidate rows
+        self.codepoints = cps.astype(np.uint16) if len(cps) and cps.max() < 0x10000 else cps
+        self._codec = "utf-16-le" if self.codepoints.dtype == np.uint16 else "utf-32-le"
+        self.gram_codes = np.empty(0, dtype=np.uint64)
+        self.gram_starts = np.zeros(1, dtype=np.int64)
+        self.postings = np.empty(0, dtype=np.int32)
+        codes, rows = _text_trigrams(cps, lengths, np.arange(self.n))
+        if not len(codes):
+            return
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        self.gram_codes = codes[np.concatenate(([0], boundaries))]
+        self.gram_starts = np.concatenate(([0], boundaries, [len(codes)])).astype(np.int64)
+        self.postings = rows
+    def with_changes(self, row_map, fresh_rows, names, artists):
+        """A new index for an edited catalog, reusing this one's postings.
+
+        row_map gives every old row's new position, or -1 if it was deleted or
+        its text changed; fresh_rows are the sorted new positions whose texts
+        (names / artists) must be indexed. Unchanged rows are only renumbered.
+        """
+        row_map = np.asarray(row_map, dtype=np.int32)
+        fresh_rows = np.asarray(fresh_rows, dtype=np.int64)
+        n_new = int(max(row_map.max(initial=-1), fresh_rows.max(initial=-1))) + 1
+        texts = [fold_text(nm) + FIELD_SEP + fold_text(a) + RECORD_SEP for nm, a in zip(names, artists)]
+        fresh_cps = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+        fresh_lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        out = object.__new__(type(self))
+        out.n = n_new
+        out._last_query, out._last_rows = "", None
+        # Code points: copy runs of unchanged rows, then write the fresh texts
+        old_lengths = np.diff(np.append(self.text_starts, len(self.codepoints)))
+        lengths = np.zeros(n_new, dtype=np.int64)
+        kept_old = np.flatnonzero(row_map >= 0)
+        kept_new = row_map[kept_old].astype(np.int64)
+        lengths[kept_new] = old_lengths[kept_old]
+        lengths[fresh_rows] = fresh_lengths
+        out.text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        wide = self.codepoints.dtype == np.uint32 or (len(fresh_cps) and fresh_cps.max() >= 0x10000)
+        out.codepoints = np.empty(int(lengths.sum()), dtype=np.uint32 if wide else np.uint16)
+        out._codec = "utf-32-le" if wide else "utf-16-le"
+        if len(kept_old):
+            breaks = np.flatnonzero((np.diff(kept_old) != 1) | (np.diff(kept_new) != 1)) + 1
+            for lo, hi in zip(np.concatenate(([0], breaks)).tolist(), np.concatenate((breaks, [len(kept_old)])).tolist()):
+                src = self.text_starts[kept_old[lo]]
+                size = self.text_starts[kept_old[hi - 1]] + old_lengths[kept_old[hi - 1]] - src
+                dst = out.text_starts[kept_new[lo]]
+                out.codepoints[dst:dst + size] = self.codepoints[src:src + size]
+        pos = 0
+        for row, size in zip(fresh_rows.tolist(), fresh_lengths.tolist()):
+            out.codepoints[out.text_starts[row]:out.text_starts[row] + size] = fresh_cps[pos:pos + size]
+            pos += size
+        # Postings: renumber (order is kept, row_map is increasing), drop stale rows ...
+        postings = row_map[self.postings]
+        alive = postings >= 0
+        counts = np.add.reduceat(alive, self.gram_starts[:-1]) if len(postings) else np.zeros(0, dtype=np.int64)
+        postings = postings[alive]
+        gram_codes = self.gram_codes
+        # ... and merge in the fresh rows' trigrams
+        codes, rows = _text_trigrams(fresh_cps, fresh_lengths, fresh_rows)
+        if len(codes):
+            starts = np.concatenate(([0], np.cumsum(counts)))
+            gi = np.searchsorted(gram_codes, codes)
+            known = np.zeros(len(codes), dtype=bool)
+            known[gi < len(gram_codes)] = gram_codes[gi[gi < len(gram_codes)]] == codes[gi < len(gram_codes)]
+            at = starts[gi].copy()
+            for i in np.flatnonzero(known).tolist():
+                lo, hi = starts[gi[i]], starts[gi[i] + 1]
+                at[i] = lo + np.searchsorted(postings[lo:hi], rows[i])
+            postings = np.insert(postings, at, rows)
+            np.add.at(counts, gi[known], 1)
+            new_codes, new_counts = np.unique(codes[~known], return_counts=True)
+            where = np.searchsorted(gram_codes, new_codes)
+            gram_codes = np.insert(gram_codes, where, new_codes)
+            counts = np.insert(counts, where, new_counts)
+        live = counts > 0
+        out.gram_codes = gram_codes[live]
+        out.gram_starts = np.concatenate(([0], np.cumsum(counts[live]))).astype(np.int64)
+        out.postings = postings.astype(np.int32)
+        return out
+    def _posting(self, code):
+        i = np.searchsorted(self.gram_codes, code)
+        if i >= len(self.gram_codes) or self.gram_codes[i] != code:
+            return None
+        return self.postings[self.gram_starts[i]:self.gram_starts[i + 1]]
+    def text(self, row):
+        """Folded "name<FIELD_SEP>artist" text of one row."""
+        start = self.text_starts[row]
+        stop = self.text_starts[row + 1] - 1 if row + 1 < self.n else len(self.codepoints) - 1
+        return self.codepoints[start:stop].tobytes().decode(self._codec)
+    def _verify(self, q, rows):
+        """The rows (sorted) whose text contains q, by comparing code points at every offset with numpy."""
+        cps = self.codepoints
+        chars = [ord(ch) for ch in q]
+        if not len(rows) or max(chars) > np.iinfo(cps.dtype).max:
+            return np.empty(0, dtype=np.int32)
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) > self.n // 8:
+            # Much of the text is in play: one scan over all of it is cheaper than gathering offsets
+            return rows[self._scan(chars)[rows]].astype(np.int32)
+        starts = self.text_starts[rows]
+        ends = np.where(rows + 1 < self.n, self.text_starts[np.minimum(rows + 1, self.n - 1)], len(cps)) - 1
+        # Offsets where q can start without running into the record separator
+        counts = np.maximum(ends - starts - len(chars) + 1, 0)
+        total = int(counts.sum())
+        if total > len(cps) // 8:
+            return rows[self._scan(chars)[rows]].astype(np.int32)
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(total)
+        hits = offsets[cps[offsets] == chars[0]]
+        # Each further character keeps only the offsets still matching
+        for j, ch in enumerate(chars[1:], 1):
+            hits = hits[cps[hits + j] == ch]
+        found = np.searchsorted(self.text_starts, hits, side="right") - 1
+        # Hits are in text order, so repeats of a row are adjacent
+        return found[np.r_[True, found[1:] != found[:-1]]].astype(np.int32) if len(found) else np.empty(0, dtype=np.int32)
+    def _scan(self, chars):
+        """Per-row mask: does the row's text contain the code points chars?"""
+        cps = self.codepoints
+        m, size = len(chars), len(cps)
+        mask = np.zeros(self.n, dtype=bool)
+        if not self.n or size < m:
+            return mask
+        if m <= 2 or cps.dtype != np.uint16:
+            # Short queries hit most rows: mark matching offsets, then OR them per row
+            hit = np.zeros(size, dtype=bool)
+            run = hit[:size - m + 1]
+            np.equal(cps[:len(run)], chars[0], out=run)
+            for j, ch in enumerate(chars[1:], 1):
+                run &= cps[j:j + len(run)] == ch
+            return np.logical_or.reduceat(hit, self.text_starts)
+        # Compare two characters per step: the text viewed as uint32 pairs, once from each parity
+        pairs = [chars[i] | (chars[i + 1] << 16) for i in range(0, m - 1, 2)]
+        starts = []
+        for parity in (0, 1):
+            packed = cps[parity:parity + 2 * ((size - parity) // 2)].view(np.uint32)
+            count = len(packed) - len(pairs) + 1
+            if count <= 0:
+                continue
+            run = packed[:count] == pairs[0]
+            for j, pair in enumerate(pairs[1:], 1):
+                run &= packed[j:j + count] == pair
+            at = np.flatnonzero(run) * 2 + parity
+            if m % 2:
+                at = at[at + m - 1 < size]
+                at = at[cps[at + m - 1] == chars[-1]]
+            starts.append(at)
+        if sum(len(at) for at in starts) > size // 4:
+            # Very dense hits: one pass over the text beats a binary search per hit
+            hit = np.zeros(size, dtype=bool)
+            for at in starts:
+                hit[at] = True
+            return np.logical_or.reduceat(hit, self.text_starts)
+        for at in starts:
+            mask[np.searchsorted(self.text_starts, at, side="right") - 1] = True
+        return mask
+    def _scan_short(self, q):
+        chars = [ord(ch) for ch in q]
+        if max(chars) > np.iinfo(self.codepoints.dtype).max:
+            return np.empty(0, dtype=np.int32)
+        return np.flatnonzero(self._scan(chars)).astype(np.int32)
+    def _candidates(self, q):
+        """Rows containing every trigram of q (a superset of the matches)."""
+        codes = np.unique(_trigram_codes(np.frombuffer(q.encode("utf-32-le"), dtype=np.uint32)))
+        lists = []
+        for code in codes:
+            posting = self._posting(code)
+            if posting is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(posting)
+        lists.sort(key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            rows = intersect_sorted(rows, other)
+            if not len(rows):
+                break
+        return rows
+    @timed()
+    def search(self, query):
+        """Sorted row positions whose Name or Artist contains query, or None for an empty query."""
+        q = _clean_query(query)
+        narrow = self._last_rows is not None and self._last_query and self._last_query in q
+        if not q:
+            rows = None
+        elif len(q) < 3:
+            # Every row matching q also matches the previous, shorter query; past a
+            # few thousand hits one vectorized scan is cheaper than re-checking them
+            if narrow and len(self._last_rows) <= NARROW_LIMIT:
+                rows = self._verify(q, self._last_rows)
+            else:
+                rows = self._scan_short(q)
+        elif narrow and len(q) > 3:
+            # Every match of q is among the previous hits, so only those are checked
+            rows = self._verify(q, self._last_rows)
+        else:
+            rows = self._candidates(q)
+            # A single trigram is matched exactly; longer queries need a substring check
+            if len(q) > 3:
+                rows = self._verify(q, rows)
+        self._last_query, self._last_rows = q, rows
+        return rows
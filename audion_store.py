@@ -0,0 +1,226 @@
+# Audion – SQLite playlist store
+# Named playlists with ordered membership, play history and catalog
+# snapshots in one local database. A snapshot records which catalog a
+# playlist was saved against, plus the metadata of the tracks playlists
+# actually use, so aggregates such as the top artist across every playlist
+# run in SQL without loading the catalog.
+import time
+import sqlite3
+import hashlib
+import numpy as np
+import pandas as pd
+
+STORE_PATH = "audion_playlists.db"
+SCHEMA_VERSION = 1
+# track_id has no declared type, so catalog ids keep their own type (ints stay ints, text ids stay text)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_snapshots (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    source TEXT,
+    track_count INTEGER NOT NULL,
+    taken_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    snapshot_id INTEGER NOT NULL REFERENCES catalog_snapshots(id) ON DELETE CASCADE,
+    track_id NOT NULL,
+    name TEXT, artist TEXT, genre TEXT, language TEXT, mood TEXT, duration_min REAL,
+    PRIMARY KEY (snapshot_id, track_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS playlists (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    snapshot_id INTEGER REFERENCES catalog_snapshots(id),
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    playlist_id INTEGER NOT NULL REFERENCES playlists(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    track_id NOT NULL,
+    PRIMARY KEY (playlist_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_playlist_tracks_track ON playlist_tracks(track_id);
+CREATE TABLE IF NOT EXISTS play_history (
+    id INTEGER PRIMARY KEY,
+    track_id NOT NULL,
+    playlist_id INTEGER REFERENCES playlists(id) ON DELETE SET NULL,
+    snapshot_id INTEGER REFERENCES catalog_snapshots(id),
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_play_history_track ON play_history(track_id);
+CREATE INDEX IF NOT EXISTS idx_play_history_playlist ON play_history(playlist_id);
+CREATE INDEX IF NOT EXISTS idx_play_history_time ON play_history(played_at);
+"""
+# Catalog column -> tracks column
+TRACK_COLUMNS = {"Name": "name", "Artist": "artist", "Genre": "genre", "Language": "language", "Mood": "mood", "Duration_min": "duration_min"}
+AGGREGATE_COLUMNS = ("artist", "genre", "language", "mood")
+def _plain(labels):
+    """Catalog labels as Python scalars sqlite3 can bind."""
+    return [x.item() if isinstance(x, np.generic) else x for x in labels]
+def _as_text(col):
+    """col.astype(str) as an object array, converting each distinct value once."""
+    codes, uniques = pd.factorize(col)
+    return np.append(np.asarray(uniques).astype(str).astype(object), np.nan)[codes]
+def catalog_fingerprint(catalog):
+    """Content hash of the ids and stored metadata; equal catalogs share one snapshot.
+
+    Hashing a large catalog takes a while: the GUI has its loader thread compute
+    it and passes it in as fingerprint=.
+    """
+    cols = [c for c in TRACK_COLUMNS if c in catalog.columns]
+    h = hashlib.sha1(str(len(catalog)).encode("ascii"))
+    text = pd.DataFrame({c: _as_text(catalog[c]) for c in cols}, columns=cols)
+    h.update(pd.util.hash_pandas_object(text, index=False).to_numpy().tobytes())
+    h.update(pd.util.hash_pandas_object(pd.Series(catalog.index.astype(str)), index=False).to_numpy().tobytes())
+    return h.hexdigest()
+class PlaylistStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{path} was written by a newer Audion (schema {version}, this one reads {SCHEMA_VERSION})")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._snapshot = (None, None)   # (catalog, snapshot id): fingerprinting is only redone for a new catalog
+    def close(self):
+        self.conn.close()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+    # ---- Catalog snapshots ----
+    def snapshot_id(self, catalog, source=None, fingerprint=None):
+        """Id of the snapshot for this catalog, created on first use; fingerprint skips hashing the catalog."""
+        if self._snapshot[0] is catalog:
+            return self._snapshot[1]
+        if fingerprint is None:
+            fingerprint = catalog_fingerprint(catalog)
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO catalog_snapshots (fingerprint, source, track_count, taken_at) VALUES (?, ?, ?, ?)",
+                              (fingerprint, source, len(catalog), time.time()))
+        sid = self.conn.execute("SELECT id FROM catalog_snapshots WHERE fingerprint = ?", (fingerprint,)).fetchone()[0]
+        self._snapshot = (catalog, sid)
+        return sid
+    def _store_tracks(self, sid, catalog, labels):
+        """Metadata rows for labels not yet in the snapshot (caller holds the transaction)."""
+        labels = pd.unique(pd.Series(labels, dtype=object))
+        positions = catalog.index.get_indexer(pd.Index(list(labels)))
+        known = positions >= 0
+        labels, positions = labels[known], positions[known]
+        cols = [c for c in TRACK_COLUMNS if c in catalog.columns]
+        rows = catalog.iloc[positions]
+        values = [np.asarray(rows[c]).tolist() for c in cols]
+        sql = (f"INSERT OR IGNORE INTO tracks (snapshot_id, track_id, {', '.join(TRACK_COLUMNS[c] for c in cols)}) "
+               f"VALUES (?, ?{', ?' * len(cols)})")
+        self.conn.executemany(sql, ((sid, label, *row) for label, *row in zip(_plain(labels), *values)))
+    # ---- Playlists ----
+    def save_many(self, playlists, catalog=None, source=None, fingerprint=None):
+        """Write {name: labels in play order} in one transaction (replacing playlists of the same name).
+
+        With a catalog, each playlist is tied to its snapshot and its tracks' metadata is stored.
+        Returns {name: playlist id}.
+        """
+        sid = self.snapshot_id(catalog, source, fingerprint) if catalog is not None else None
+        now = time.time()
+        ids = {}
+        used = []
+        with self.conn:
+            for name, labels in playlists.items():
+                labels = _plain(dict.fromkeys(labels))
+                self.conn.execute("INSERT INTO playlists (name, snapshot_id, created_at, updated_at) VALUES (?, ?, ?, ?) "
+                                  "ON CONFLICT(name) DO UPDATE SET snapshot_id = excluded.snapshot_id, updated_at = excluded.updated_at",
+                                  (name, sid, now, now))
+                pid = self.conn.execute("SELECT id FROM playlists WHERE name = ?", (name,)).fetchone()[0]
+                self.conn.execute("DELETE FROM playlist_tracks WHERE playlist_id = ?", (pid,))
+                self.conn.executemany("INSERT INTO playlist_tracks (playlist_id, position, track_id) VALUES (?, ?, ?)",
+                                      ((pid, i, label) for i, label in enumerate(labels)))
+                used.extend(labels)
+                ids[name] = pid
+            if sid is not None:
+                self._store_tracks(sid, catalog, used)
+        return ids
+    def save_playlist(self, name, labels, catalog=None, source=None, fingerprint=None):
+        return self.save_many({name: labels}, catalog, source, fingerprint)[name]
+    def load_playlist(self, name):
+        """Track ids in play order; KeyError if there is no such playlist."""
+        row = self.conn.execute("SELECT id FROM playlists WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return [r[0] for r in self.conn.execute("SELECT track_id FROM playlist_tracks WHERE playlist_id = ? ORDER BY position", row)]
+    def list_playlists(self):
+        """(name, track count, updated_at) for every playlist, most recently saved first."""
+        return self.conn.execute(
+            "SELECT p.name, (SELECT COUNT(*) FROM playlist_tracks pt WHERE pt.playlist_id = p.id), p.updated_at "
+            "FROM playlists p ORDER BY p.updated_at DESC, p.name").fetchall()
+    def rename_playlist(self, old, new):
+        with self.conn:
+            if self.conn.execute("UPDATE playlists SET name = ?, updated_at = ? WHERE name = ?", (new, time.time(), old)).rowcount == 0:
+                raise KeyError(old)
+    def delete_playlist(self, name):
+        with self.conn:
+            if self.conn.execute("DELETE FROM playlists WHERE name = ?", (name,)).rowcount == 0:
+                raise KeyError(name)
+    def playlists_with_track(self, track_id):
+        return [r[0] for r in self.conn.execute(
+            "SELECT p.name FROM playlist_tracks pt JOIN playlists p ON p.id = pt.playlist_id WHERE pt.track_id = ? ORDER BY p.name",
+            (_plain([track_id])[0],))]
+    # ---- Play history ----
+    def record_plays(self, labels, playlist=None, catalog=None, played_at=None):
+        """Append one history row per label (in one transaction)."""
+        labels = _plain(labels)
+        sid = self.snapshot_id(catalog) if catalog is not None else None
+        played_at = time.time() if played_at is None else played_at
+        with self.conn:
+            pid = None
+            if playlist is not None:
+                row = self.conn.execute("SELECT id FROM playlists WHERE name = ?", (playlist,)).fetchone()
+                pid = row[0] if row else None
+            self.conn.executemany("INSERT INTO play_history (track_id, playlist_id, snapshot_id, played_at) VALUES (?, ?, ?, ?)",
+                                  ((label, pid, sid, played_at) for label in labels))
+            if sid is not None:
+                self._store_tracks(sid, catalog, labels)
+    def recent_plays(self, limit=50):
+        return self.conn.execute("SELECT track_id, played_at FROM play_history ORDER BY played_at DESC, id DESC LIMIT ?", (limit,)).fetchall()
+    # ---- Aggregates ----
+    def top_values(self, column="artist", limit=10, playlist=None, source="playlists"):
+        """Most frequent artist / genre / language / mood, as [(value, count)].
+
+        source="playlists" counts playlist memberships (optionally of one
+        playlist), source="plays" counts play history.
+        """
+        if column not in AGGREGATE_COLUMNS:
+            raise ValueError(f"column must be one of {', '.join(AGGREGATE_COLUMNS)}")
+        if source == "plays":
+            sql = (f"SELECT t.{column}, COUNT(*) AS n FROM play_history h "
+                   f"JOIN tracks t ON t.snapshot_id = h.snapshot_id AND t.track_id = h.track_id ")
+            args = ()
+        elif source == "playlists":
+            sql = (f"SELECT t.{column}, COUNT(*) AS n FROM playlist_tracks pt JOIN playlists p ON p.id = pt.playlist_id "
+                   f"JOIN tracks t ON t.snapshot_id = p.snapshot_id AND t.track_id = pt.track_id ")
+            args = ()
+            if playlist is not None:
+                sql += "WHERE p.name = ? "
+                args = (playlist,)
+        else:
+            raise ValueError("source must be 'playlists' or 'plays'")
+        return self.conn.execute(sql + f"GROUP BY t.{column} ORDER BY n DESC, t.{column} LIMIT ?", (*args, limit)).fetchall()
+    def playlist_totals(self):
+        """(name, tracks, total minutes) per playlist, computed in SQL."""
+        return self.conn.execute(
+            "SELECT p.name, COUNT(pt.track_id), COALESCE(SUM(t.duration_min), 0) FROM playlists p "
+            "LEFT JOIN playlist_tracks pt ON pt.playlist_id = p.id "
+            "LEFT JOIN tracks t ON t.snapshot_id = p.snapshot_id AND t.track_id = pt.track_id "
+            "GROUP BY p.id ORDER BY p.name").fetchall()
+if __name__ == "__main__":
+    # python audion_store.py [store.db]: list playlists and the top artists across them
+    import sys
+    with PlaylistStore(sys.argv[1] if len(sys.argv) > 1 else STORE_PATH) as store:
+        for name, count, updated in store.list_playlists():
+            print(f"{name}\t{count} tracks\t{time.strftime('%Y-%m-%d %H:%M', time.localtime(updated))}")
+        for artist, n in store.top_values("artist"):
+            print(f"{n:6d}  {artist}")
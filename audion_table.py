@@ -0,0 +1,96 @@
+# Audion – virtualized song table
+# The Treeview only ever holds the rows around the viewport (plus a buffer);
+# the full result set is a row-position array and the cell strings come from
+# precomputed display columns. Filter changes and scrolling diff the window
+# against the items already in the tree instead of rebuilding it.
+import numpy as np
+from audion_instrument import timed
+
+class VirtualTable:
+    def __init__(self, tree, scrollbar, display, labels, rowheight=28, buffer=40):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rowheight = rowheight
+        self.buffer = buffer
+        self.set_data(display, labels)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.offset = 0          # position (in self.rows) of the first row in view
+        self.start = 0           # self.rows[start:stop] are the rows held by the tree
+        self.stop = 0
+        self._rendering = False
+        scrollbar.configure(command=self.on_scrollbar)
+        # Native wheel / keyboard scrolling moves inside the window; on_tree_scroll slides the window along
+        tree.configure(yscrollcommand=self.on_tree_scroll)
+        tree.bind("<Configure>", lambda e: self.render(), add="+")
+    def set_data(self, display, labels):
+        """display: tree column -> cell values indexable by catalog row; labels: catalog index labels."""
+        # Items already in the tree may belong to the previous data
+        self.tree.delete(*self.tree.get_children())
+        self.display = display
+        self.iids = np.asarray([str(label) for label in labels], dtype=object)
+    def viewport(self):
+        return max(1, self.tree.winfo_height() // self.rowheight)
+    @timed()
+    def set_rows(self, rows):
+        """Show the given sorted catalog row positions, keeping the current top row in view."""
+        rows = np.asarray(rows, dtype=np.int64)
+        offset = 0
+        if 0 <= self.offset < len(self.rows):
+            # Result sets are sorted positions, so the old top row is found by bisection
+            offset = np.searchsorted(rows, self.rows[self.offset])
+        self.rows = rows
+        self.offset = int(min(offset, max(0, len(rows) - self.viewport())))
+        self.render()
+    def item_values(self, pos):
+        return tuple(self.display[col][pos] for col in self.tree["columns"])
+    def render(self):
+        if self._rendering:
+            return
+        self._rendering = True
+        try:
+            n = len(self.rows)
+            self.start = max(0, self.offset - self.buffer)
+            self.stop = min(n, self.offset + self.viewport() + self.buffer)
+            window_rows = self.rows[self.start:self.stop]
+            wanted = self.iids[window_rows].tolist()
+            wanted_set = set(wanted)
+            current = self.tree.get_children()
+            stale = [iid for iid in current if iid not in wanted_set]
+            if stale:
+                self.tree.delete(*stale)
+            present = set(current) - set(stale)
+            for i, (iid, pos) in enumerate(zip(wanted, window_rows.tolist())):
+                if iid not in present:
+                    self.tree.insert("", i, iid=iid, values=self.item_values(pos))
+                elif self.tree.index(iid) != i:
+                    self.tree.move(iid, "", i)
+            if wanted:
+                self.tree.yview_moveto((self.offset - self.start) / len(wanted))
+            self._update_scrollbar()
+        finally:
+            self._rendering = False
+    def _update_scrollbar(self):
+        n = len(self.rows)
+        if not n:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(self.offset / n, min(1.0, (self.offset + self.viewport()) / n))
+    def scroll_to(self, offset):
+        self.offset = int(max(0, min(offset, len(self.rows) - self.viewport())))
+        self.render()
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.rows)))
+        elif action == "scroll":
+            step = self.viewport() if unit == "pages" else 1
+            self.scroll_to(self.offset + int(amount) * step)
+    def on_tree_scroll(self, first, last):
+        if self._rendering or self.stop <= self.start:
+            return
+        self.offset = self.start + int(round(float(first) * (self.stop - self.start)))
+        near_top = self.start > 0 and self.offset - self.start < self.buffer // 2
+        near_bottom = self.stop < len(self.rows) and self.stop - (self.offset + self.viewport()) < self.buffer // 2
+        if near_top or near_bottom:
+            self.render()
+        else:
+            self._update_scrollbar()
@@ -0,0 +1,5 @@
+# Tests import the top-level audion_* modules, so the repo root must be importable from any working directory
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import audion_core
+import audion_dedup
+import audion_facets
+import audion_autoplaylist
+
+def make_catalog(n_calm=120, n_romantic=3, seed=0):
+    rng = np.random.default_rng(seed)
+    moods = ["Calm"] * n_calm + ["Romantic"] * n_romantic
+    n = len(moods)
+    catalog = pd.DataFrame({"Name": [f"Song {i}" for i in range(n)], "Artist": [f"Artist {i % 40}" for i in range(n)],
+                            "Genre": rng.choice(["Pop", "Lofi"], n), "Language": "English", "Mood": moods,
+                            "Duration_min": rng.uniform(2.0, 4.5, n).round(2)})
+    return audion_dedup.add_track_ids(catalog)
+def build(catalog, target, **kwargs):
+    return audion_autoplaylist.build_playlist(catalog, audion_facets.FacetIndex(catalog), target, **kwargs)
+def test_scarce_mood_still_reaches_target():
+    # Romantic cannot fill its share; the gap is longer than every free Calm track
+    catalog = make_catalog()
+    result = build(catalog, 60, moods=["Calm", "Romantic"], seed=0)
+    assert result["ok"]
+    assert abs(result["total_min"] - 60) <= 2.0
+    assert abs(catalog.loc[result["labels"], "Duration_min"].sum() - result["total_min"]) < 1e-6
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), audion_core.CATALOG_PATH)
+@pytest.mark.skipif(not os.path.exists(WORKBOOK), reason="bundled workbook not present")
+@pytest.mark.parametrize("moods", [["Calm", "Romantic"], ["Sad", "Happy"], ["Smooth", "Happy"]])
+def test_readme_example_on_bundled_workbook(moods):
+    catalog = audion_core.load_catalog(WORKBOOK)
+    result = build(catalog, 60, moods=moods, seed=0)
+    assert abs(result["total_min"] - 60) <= 2.0
+def duplicated_catalog(seed=1):
+    # Every song comes in three versions ("X", "X (Remix)", "X - Radio Edit") of near-equal length
+    rng = np.random.default_rng(seed)
+    base = pd.DataFrame({"Name": [f"Song {i}" for i in range(150)], "Artist": [f"Artist {i % 60}" for i in range(150)],
+                         "Mood": rng.choice(["Calm", "Happy", "Romantic"], 150), "Duration_min": rng.uniform(2.0, 5.0, 150).round(2)})
+    versions = [base, base.assign(Name=base["Name"] + " (Remix)"), base.assign(Name=base["Name"] + " - Radio Edit")]
+    catalog = pd.concat(versions, ignore_index=True).assign(Genre="Pop", Language="English")
+    return audion_dedup.add_track_ids(catalog)
+@pytest.mark.parametrize("target", [15, 45, 90])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_total_within_tolerance(target, seed):
+    catalog = make_catalog(n_calm=200, n_romantic=80, seed=seed)
+    result = build(catalog, target, moods={"Calm": 2, "Romantic": 1}, tolerance_min=1.5, seed=seed)
+    assert result["ok"]
+    assert abs(result["total_min"] - target) <= 1.5
+def test_picks_only_requested_moods():
+    catalog = duplicated_catalog()
+    result = build(catalog, 40, moods=["Calm", "Romantic"], seed=3)
+    assert result["labels"]
+    assert set(catalog.loc[result["labels"], "Mood"]) <= {"Calm", "Romantic"}
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_no_song_twice(seed):
+    catalog = duplicated_catalog(seed)
+    assert catalog[audion_core.TRACK_ID].nunique() == 150
+    result = build(catalog, 120, artist_cap=3, seed=seed)
+    tracks = catalog.loc[result["labels"], audion_core.TRACK_ID]
+    assert len(result["labels"]) == len(set(result["labels"]))
+    assert not tracks.duplicated().any()
+def test_excluding_a_version_excludes_the_song():
+    catalog = duplicated_catalog()
+    remixes = catalog.index[catalog["Name"].str.endswith("(Remix)")]
+    result = build(catalog, 30, exclude=list(remixes[:100]), seed=0)
+    excluded_songs = set(catalog.loc[remixes[:100], audion_core.TRACK_ID])
+    assert not excluded_songs & set(catalog.loc[result["labels"], audion_core.TRACK_ID])
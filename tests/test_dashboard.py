@@ -0,0 +1,12 @@
+import pandas as pd
+import audion_core
+import audion_dashboard
+
+def test_signature_changes_with_duplicate_grouping():
+    pl_df = pd.DataFrame({"Name": ["Faded", "Faded (Remix)"], "Artist": "Alan Walker", "Genre": "EDM",
+                          "Language": "English", "Mood": "Energetic", "Duration_min": [3.5, 3.6], audion_core.TRACK_ID: [0, 0]})
+    regrouped = pl_df.assign(**{audion_core.TRACK_ID: [0, 1]})
+    assert audion_dashboard.playlist_signature(pl_df) != audion_dashboard.playlist_signature(regrouped)
+    # ...because the charts differ: one song before, two after
+    assert audion_dashboard.dashboard_aggregates(pl_df)["charts"]["genres"]["data"] == {"EDM": 1}
+    assert audion_dashboard.dashboard_aggregates(regrouped)["charts"]["genres"]["data"] == {"EDM": 2}
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+import audion_core
+
+DURATIONS = ["03:30", "3:05", " 4 : 07 ", "1:02:03", "00:59", "10:00:00", "", "   ", None, np.nan,
+             "abc", "3.45", "3m 20s", "12", ":", "4:5:6:7", "2:xx", "3:30 min", "-3:10", "٣:٤٥", 3.5, 200, "03:30"]
+NAMES = ["Summer Love", "Night Drive", "Sad Rain", "Dil Se", "Party Anthem", "LOVE & PARTY", "sunshine", "untitled",
+         "", None, np.nan, "Blue Moon (Remix)", "Happy Birthday", "Broken heart", "Fire Dance", "Calm Waters"]
+GENRES = ["", None, np.nan, "Pop", "EDM", "Dance Pop", "Hip Hop", "Indie Folk", "Bollywood", "Ballad", "Unknown genre", "k-pop"]
+def test_parse_duration_column_matches_scalar():
+    expected = [audion_core.parse_duration(d) for d in DURATIONS]
+    got = audion_core.parse_duration_column(pd.Series(DURATIONS, dtype=object))
+    assert got.tolist() == expected
+@pytest.mark.parametrize("genre", GENRES)
+def test_detect_mood_column_matches_scalar(genre):
+    # Blank genres leave the title keywords (name-only detection) and the fallback to decide
+    genres = [genre] * len(NAMES)
+    expected = [audion_core.detect_or_infer_mood({"Name": n, "Genre": g}) for n, g in zip(NAMES, genres)]
+    got = audion_core.detect_mood_column(pd.Series(NAMES, dtype=object), pd.Series(genres, dtype=object))
+    assert list(got.astype(str)) == expected
+def test_mixed_genres_match_scalar():
+    rng = np.random.default_rng(0)
+    names = [NAMES[i] for i in rng.integers(0, len(NAMES), 400)]
+    genres = [GENRES[i] for i in rng.integers(0, len(GENRES), 400)]
+    expected = [audion_core.detect_or_infer_mood({"Name": n, "Genre": g}) for n, g in zip(names, genres)]
+    got = audion_core.detect_mood_column(pd.Series(names, dtype=object), pd.Series(genres, dtype=object))
+    assert list(got.astype(str)) == expected
+def test_tempo_noise_does_not_depend_on_chunking():
+    full = audion_core._tempo_noise(3 * audion_core.FEATURE_BLOCK + 17)
+    for start, n in ((0, 10), (audion_core.FEATURE_BLOCK - 5, 10), (2 * audion_core.FEATURE_BLOCK + 3, audion_core.FEATURE_BLOCK)):
+        assert np.array_equal(audion_core._tempo_noise(n, start=start), full[start:start + n])
+    rows = np.array([5, audion_core.FEATURE_BLOCK + 1, 3 * audion_core.FEATURE_BLOCK + 16, 7])
+    assert np.array_equal(audion_core._tempo_noise(len(rows), start=rows), full[rows])
+def test_feature_columns_match_scalar():
+    frame = pd.DataFrame({"Genre": GENRES * 2, "Mood": ["Happy", "Party", "Calm", "Sad"] * 6, "Duration_min": 3.0})
+    got = audion_core.simulate_feature_columns(frame["Genre"], frame["Mood"])
+    for i, row in frame.iterrows():
+        expected = audion_core.simulate_audio_features(row)
+        for col in ("energy", "danceability", "valence"):
+            assert got[col][i] == pytest.approx(expected[col])
+    assert (got["tempo"] >= 60).all()
@@ -0,0 +1,48 @@
+import os
+import re
+import pandas as pd
+import pytest
+import audion_core
+import audion_dedup
+import audion_export
+from audion_playlist import PlaylistStats
+
+@pytest.fixture
+def catalog():
+    frame = pd.DataFrame({"Name": ["Faded", "Hello", "Skyfall", "Rain", "Dil Se", "Halo"],
+                          "Artist": ["Alan Walker", "Adele", "Adele", "Sia", "A. R. Rahman", "Beyoncé"],
+                          "Genre": "Pop", "Language": "English", "Mood": "Happy",
+                          "Duration_min": [3.5, 4.9, 4.7, 3.0, 5.2, 3.7]})
+    return audion_dedup.add_track_ids(frame)
+def test_summary_counts_a_repeated_label_once(catalog, tmp_path):
+    labels = [1, 2, 1, 0]
+    path = tmp_path / "summary.txt"
+    assert audion_export.export_playlist(catalog, labels, path) == 3
+    text = path.read_text(encoding="utf-8")
+    stats = PlaylistStats(catalog)
+    stats.replace(labels)
+    summary = stats.summary()
+    assert "Tracks: 3" in text
+    assert f"Total duration: {audion_core.format_minutes(summary['total_min'])}" in text
+    assert f"Average track length: {audion_core.format_minutes(summary['avg_min'])}" in text
+    assert "Top artist: Adele" in text
+    assert re.findall(r"^\d+\. (.*) \|", text, flags=re.M) == ["Hello", "Skyfall", "Faded"]
+def test_failed_export_keeps_the_previous_file(catalog, tmp_path, monkeypatch):
+    path = tmp_path / "playlist.csv"
+    audion_export.export_playlist(catalog, [0, 1], path)
+    before = path.read_bytes()
+    iter_rows = audion_export.iter_rows
+    def failing_rows(*args, **kwargs):
+        for i, chunk in enumerate(iter_rows(*args, **kwargs)):
+            if i == 1:
+                raise OSError("disk full")
+            yield chunk
+    monkeypatch.setattr(audion_export, "iter_rows", failing_rows)
+    with pytest.raises(OSError, match="disk full"):
+        audion_export.export_playlist(catalog, list(catalog.index), path, chunk_rows=2)
+    assert path.read_bytes() == before
+    assert os.listdir(tmp_path) == ["playlist.csv"]
+    written, errors = audion_export.export_playlists(catalog, {str(path): list(catalog.index)}, chunk_rows=2)
+    assert written == {} and errors == [(str(path), "OSError: disk full")]
+    assert path.read_bytes() == before
+    assert os.listdir(tmp_path) == ["playlist.csv"]
@@ -0,0 +1,65 @@
+import random
+import pandas as pd
+import audion_core
+import audion_dedup
+from audion_playlist import PlaylistStats
+
+def make_catalog(artists, genres=None, names=None):
+    n = len(artists)
+    return pd.DataFrame({"Name": names or [f"Song {i}" for i in range(n)], "Artist": artists,
+                         "Genre": genres or ["Pop"] * n, "Language": ["English"] * n,
+                         "Duration_min": [3.0 + i / 10 for i in range(n)]})
+def core_summary(catalog, labels):
+    return audion_core.compute_playlist_summary(audion_core.playlist_df(catalog, labels))
+def test_removing_first_row_moves_tie_break():
+    catalog = make_catalog(["X", "Y", "Y", "X", "X"])
+    stats = PlaylistStats(catalog)
+    stats.replace(catalog.index)
+    assert stats.summary()["top_artist"] == core_summary(catalog, list(catalog.index))["top_artist"] == "X"
+    stats.remove(0)
+    assert core_summary(catalog, list(stats.queue))["top_artist"] == "Y"
+    assert stats.summary()["top_artist"] == "Y"
+def test_random_edits_match_compute_playlist_summary():
+    rng = random.Random(7)
+    catalog = make_catalog([rng.choice("ABCD") for _ in range(60)], [rng.choice(["Pop", "Rock", "Jazz"]) for _ in range(60)])
+    stats = PlaylistStats(catalog)
+    for _ in range(300):
+        labels = rng.sample(range(60), rng.randint(1, 4))
+        if rng.random() < 0.55:
+            stats.add_many(labels)
+        else:
+            stats.remove_many(labels)
+        expected = core_summary(catalog, list(stats.queue))
+        got = stats.summary()
+        for key in ("top_artist", "top_genre", "top_language"):
+            assert got[key] == expected[key]
+        assert abs(got["total_min"] - expected["total_min"]) < 1e-9
+def test_versions_of_one_song_count_once():
+    names = ["Faded", "Faded (Remix)", "Faded - Radio Edit", "Hello", "Skyfall"]
+    catalog = audion_dedup.add_track_ids(make_catalog(["Alan Walker"] * 3 + ["Adele"] * 2, names=names))
+    stats = PlaylistStats(catalog)
+    stats.replace(catalog.index)
+    assert core_summary(catalog, list(catalog.index))["top_artist"] == "Adele"
+    assert stats.summary()["top_artist"] == "Adele"
+    assert stats.distinct("Artist") == 2
+def test_random_edits_with_duplicates_match_compute_playlist_summary():
+    rng = random.Random(11)
+    names = [rng.choice(["Faded", "Faded (Live)", "Hello", "Hello - Remastered", "Rain"]) for _ in range(60)]
+    catalog = make_catalog([rng.choice("AB") for _ in range(60)], [rng.choice(["Pop", "Rock"]) for _ in range(60)], names)
+    catalog["Duration_min"] = 3.0
+    catalog = audion_dedup.add_track_ids(catalog)
+    assert catalog.attrs["duplicate_rows"] > 0
+    stats = PlaylistStats(catalog)
+    for step in range(300):
+        if step % 100 == 0:
+            stats.replace(rng.sample(range(60), 10))
+        labels = rng.sample(range(60), rng.randint(1, 4))
+        if rng.random() < 0.55:
+            stats.add_many(labels)
+        else:
+            stats.remove_many(labels)
+        expected = core_summary(catalog, list(stats.queue))
+        got = stats.summary()
+        for key in ("top_artist", "top_genre", "top_language"):
+            assert got[key] == expected[key]
+        assert stats.distinct("Genre") == audion_core.distinct_tracks(audion_core.playlist_df(catalog, list(stats.queue)))["Genre"].nunique()
@@ -0,0 +1,29 @@
+import pytest
+import audion_bench
+import audion_core
+import audion_dedup
+from audion_recommend import Recommender
+
+@pytest.fixture(scope="module")
+def catalog():
+    raw = audion_bench.synthetic_catalog(3000, 5)
+    return audion_dedup.add_track_ids(audion_core.compact_catalog(audion_core.enrich_catalog(audion_core.normalize_catalog(raw))))
+@pytest.mark.parametrize("mood", sorted(audion_core.CONTRAST_MAP))
+def test_contrast_picks_come_from_contrast_moods(catalog, mood):
+    playlist = list(catalog.index[catalog["Mood"] == mood][:10])
+    if not playlist:
+        pytest.skip(f"no {mood} tracks in the synthetic catalog")
+    recs = audion_core.generate_mood_recommendations(playlist, n=8, catalog=catalog)
+    assert len(recs) == 8
+    assert set(recs["Mood"].astype(str)) <= set(audion_core.CONTRAST_MAP[mood])
+def test_contrast_falls_back_when_no_contrast_mood_is_left(catalog):
+    calm = catalog[catalog["Mood"] == "Calm"].index[:5].tolist()
+    targets = catalog.index[catalog["Mood"].isin(audion_core.CONTRAST_MAP["Calm"])].tolist()
+    recs = Recommender(catalog).recommend(calm, n=5, mode="contrast", exclude=targets)
+    assert len(recs) == 5
+def test_recommendations_skip_the_playlists_songs(catalog):
+    playlist = catalog.index[:20].tolist()
+    songs = set(catalog.loc[playlist, audion_core.TRACK_ID])
+    recs = Recommender(catalog).recommend(playlist, n=8)
+    assert not songs & set(recs[audion_core.TRACK_ID])
+    assert not recs[audion_core.TRACK_ID].duplicated().any()
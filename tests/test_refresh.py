@@ -0,0 +1,62 @@
+import pandas as pd
+import audion_core
+import audion_refresh
+
+def write_source(path, rows):
+    pd.DataFrame(rows, columns=["Name", "Artist", "Genre", "Language", "Duration"]).to_csv(path, index=False)
+def catalog_rows():
+    rows = [("City", "Billie Singh", "Pop", "English", f"0{m}:1{m}") for m in range(2, 7)]
+    rows += [("Faded", "Alan Walker", "EDM", "English", "03:32"), ("Hello", "Adele", "Pop", "English", "04:55")]
+    return rows
+def load(path, rows):
+    write_source(path, rows)
+    return audion_core.load_catalog(str(path))
+def assert_same_songs(old, new, labels):
+    for label in labels:
+        assert new.loc[label, "Duration"] == old.loc[label, "Duration"]
+        assert new.loc[label, "Name"] == old.loc[label, "Name"]
+def test_delete_inside_duplicate_group_keeps_labels(tmp_path):
+    path = tmp_path / "catalog.csv"
+    rows = catalog_rows()
+    old = load(path, rows)
+    write_source(path, rows[:1] + rows[2:])
+    new, changes = audion_refresh.refresh_catalog(old, str(path))
+    assert changes["deleted"] == [old.index[1]]
+    assert changes["modified"] == [] and changes["inserted"] == []
+    assert_same_songs(old, new, [l for l in old.index if l != old.index[1]])
+def test_insert_and_edit_inside_duplicate_group(tmp_path):
+    path = tmp_path / "catalog.csv"
+    rows = catalog_rows()
+    old = load(path, rows)
+    edited = list(rows)
+    edited.insert(1, ("City", "Billie Singh", "Pop", "English", "09:00"))
+    edited[3] = ("City", "Billie Singh", "Rock", "English", "04:14")  # old row 2, re-genred
+    write_source(path, edited)
+    new, changes = audion_refresh.refresh_catalog(old, str(path))
+    assert changes["deleted"] == []
+    assert changes["modified"] == [old.index[2]]
+    assert len(changes["inserted"]) == 1
+    assert new.loc[changes["inserted"][0], "Duration"] == "09:00"
+    assert new.loc[old.index[2], "Genre"] == "Rock"
+    assert_same_songs(old, new, old.index)
+def test_random_edits_keep_every_label_on_its_song(tmp_path):
+    import random
+    rng = random.Random(3)
+    path = tmp_path / "catalog.csv"
+    rows = [(rng.choice(["City", "Rain", "Home"]), rng.choice(["Billie Singh", "Adele"]), rng.choice(["Pop", "Rock"]),
+             "English", f"0{rng.randint(2, 5)}:{rng.randint(10, 59)}") for _ in range(80)]
+    old = load(path, rows)
+    kept = [i for i in range(len(rows)) if rng.random() > 0.2]
+    edited = [rows[i] for i in kept]
+    for i in rng.sample(range(len(edited)), 8):
+        edited[i] = edited[i][:2] + ("Jazz",) + edited[i][3:]
+    for _ in range(6):
+        edited.insert(rng.randrange(len(edited) + 1), rows[rng.randrange(len(rows))])
+    write_source(path, edited)
+    new, changes = audion_refresh.refresh_catalog(old, str(path))
+    survivors = [l for l in old.index if l not in changes["deleted"]]
+    assert len(survivors) + len(changes["inserted"]) == len(edited)
+    for label in survivors:
+        assert (new.loc[label, "Name"], new.loc[label, "Artist"]) == (old.loc[label, "Name"], old.loc[label, "Artist"])
+        if label not in changes["modified"]:
+            assert new.loc[label, ["Genre", "Duration"]].tolist() == old.loc[label, ["Genre", "Duration"]].tolist()
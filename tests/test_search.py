@@ -0,0 +1,69 @@
+import random
+import numpy as np
+import pytest
+import audion_search
+from audion_search import SearchIndex, fold_text
+
+WORDS = ["sing", "singh", "Singer", "love", "Lovely", "glove", "taylor", "Beyoncé", "café", "naïve", "x",
+         "ab", "aba", "abab", "rain", "Rainbow", "🎵 song", "mañana", "o'neil", "AC/DC"]
+def make_texts(n, seed, astral=True):
+    # astral=False keeps every code point below U+10000, so the index stores them as uint16
+    words = WORDS if astral else [w for w in WORDS if w.isascii() or max(map(ord, w)) < 0x10000]
+    rng = random.Random(seed)
+    # Mostly filler words, so most queries hit few rows and take the per-row offset check, not the full scan
+    def word():
+        return rng.choice(words) if rng.random() < 0.3 else f"w{rng.randint(0, 9999)}"
+    names = [" ".join(word() for _ in range(rng.randint(1, 3))) for _ in range(n)]
+    artists = [rng.choice(words + ["", "Billie Singh", "Arijit Singh"]) for _ in range(n)]
+    return names, artists
+def brute_force(names, artists, query):
+    q = fold_text(query).strip()
+    if not q:
+        return None
+    return [i for i, (n, a) in enumerate(zip(names, artists)) if q in fold_text(n) or q in fold_text(a)]
+QUERIES = ["s", "si", "sin", "sing", "singh", "sing", "si", "", "l", "lo", "lov", "love", "lovely", "love", "o",
+           "ab", "aba", "abab", "ababa", "b", "beyonce", "BEYONCÉ", "caf", "café", "🎵", "🎵 s", "ac/dc", "zzz", "zzzz", "rain", "w1", "w12", "w123", "w1234", "w12"]
+@pytest.mark.parametrize("astral", [True, False])
+@pytest.mark.parametrize("n, narrow_limit", [(40, audion_search.NARROW_LIMIT), (600, audion_search.NARROW_LIMIT), (600, 5)])
+def test_queries_match_brute_force(monkeypatch, n, narrow_limit, astral):
+    monkeypatch.setattr(audion_search, "NARROW_LIMIT", narrow_limit)
+    names, artists = make_texts(n, n, astral)
+    index = SearchIndex(names, artists)
+    assert index.codepoints.dtype == (np.uint32 if astral else np.uint16)
+    # Typed in sequence, so the narrowing path (q extends the previous query) and widening both run
+    for query in QUERIES:
+        rows = index.search(query)
+        expected = brute_force(names, artists, query)
+        if expected is None:
+            assert rows is None
+        else:
+            assert np.asarray(rows).tolist() == expected, query
+def test_with_changes_matches_a_fresh_index():
+    names, artists = make_texts(300, 1)
+    index = SearchIndex(names, artists)
+    rng = random.Random(2)
+    deleted = set(rng.sample(range(300), 30))
+    edited = set(rng.sample(sorted(set(range(300)) - deleted), 20))
+    new_names, new_artists, row_map, fresh_rows = [], [], np.full(300, -1, dtype=np.int64), []
+    extra_names, extra_artists = make_texts(25, 3)
+    for i in range(300):
+        if i in deleted:
+            continue
+        if i in edited:
+            fresh_rows.append(len(new_names))
+            new_names.append(names[i] + " love")
+            new_artists.append(artists[i])
+        else:
+            row_map[i] = len(new_names)
+            new_names.append(names[i])
+            new_artists.append(artists[i])
+    for name, artist in zip(extra_names, extra_artists):
+        fresh_rows.append(len(new_names))
+        new_names.append(name)
+        new_artists.append(artist)
+    fresh_rows = np.array(fresh_rows, dtype=np.int64)
+    updated = index.with_changes(row_map, fresh_rows, [new_names[r] for r in fresh_rows], [new_artists[r] for r in fresh_rows])
+    for query in QUERIES:
+        rows = updated.search(query)
+        expected = brute_force(new_names, new_artists, query)
+        assert (rows is None) if expected is None else np.asarray(rows).tolist() == expected, query